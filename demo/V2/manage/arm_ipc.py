@@ -20,20 +20,184 @@ Usage example:
 The proxy forwards *any* attribute access (method call) to the background
 `ArmWorkerProcess`. Therefore you can call the same public API methods that
 `PiperTerminal` exposes (`cmd_play`, `cmd_record`, `play_tracks`, ...).
+
+Calls are multiplexed: ``call_async()`` returns a Future (``acall()`` is the
+asyncio flavour), a dispatcher thread routes replies by id, and the worker
+answers read-only queries (``QUERY_METHODS``) while a motion command runs::
+
+    fut = left.call_async("cmd_play", "left__wave")
+    print(left.cmd_get())          # answered during playback
+    fut.result(timeout=120)
+
+Besides the request/reply pipe every worker has a one-way *control* pipe
+served by its own listener thread, so `stop_play()`, `pause()`, `resume()`
+and `set_speed()` reach the arm within one control tick even while a
+blocking `cmd_play` occupies the main pipe.
+
+Each worker also publishes its live state (joints, gripper, motor telemetry,
+play state, track progress, loop jitter) into a shared-memory block owned by
+the proxy; ``live_state()`` reads it locally without any IPC round trip::
+
+    st = left.live_state()
+    print(st["track"], st["progress"], "/", st["total"])
+
+Plans compiled centrally are handed over through shared memory as well –
+only a small handle crosses the Pipe (see ``shared_plan.py``)::
+
+    plan = compile_plan(trk)
+    left.play_plans(("left__wave", plan)).result()
+
+Messages are framed with a pluggable codec (``ipc_codec.py``): msgpack by
+default, with NumPy arrays passed as raw bytes; ``ArmProxy(codec="pickle")``
+restores the previous encoding.
+
+The same publisher feeds a telemetry stream: any number of subscribers
+(dashboards, loggers, recorders) pick their channels and rate, and the
+worker pushes decimated samples read over its own CAN connection::
+
+    sub = left.subscribe_telemetry(["foc_temp_c", "motor_temp_c"], hz=1)
+    print(sub.get(timeout=2))
+    sub.close()
+
+Workers send a heartbeat every ``HEARTBEAT_S`` from their dispatch loop;
+each beat also reports how long the oldest SDK call in flight has been
+running, so a hung SDK call inside a motion command is seen even though the
+dispatch loop keeps beating. ``ArmSupervisor`` watches them and, when a
+worker dies, misses ``HEARTBEAT_MISSED`` beats in a row or has an SDK call
+stuck for ``SDK_STALL_TIMEOUT_S``, kills it and activates the proxy's pre-spawned
+*standby* worker (already imported, waiting to open the CAN interface), so
+failover takes a fraction of a second and the other arm keeps running::
+
+    left = ArmProxy(CAN_LEFT, "left", standby=True)
+    sup = ArmSupervisor({"left": left})
+    sup.start()
+    print(sup.stats())
 """
 
+import asyncio
 import logging
+import os
+import queue
+import threading
+import time
 import traceback
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 from multiprocessing import Process, Pipe
 from multiprocessing.connection import Connection
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from demo.V2.manage.ipc_codec import DEFAULT_CODEC, get_codec
+from demo.V2.manage.live_state import LivePublisher, LiveStateBlock
+from demo.V2.manage.plan import SetpointPlan
+from demo.V2.manage.rate import sleep_until
+from demo.V2.manage.shared_plan import SharedPlanBuffer
+from demo.V2.manage.telemetry import (
+    SUBSCRIPTION_QUEUE,
+    TelemetryHub,
+    TelemetrySubscription,
+    decimation_for,
+    validate_channels,
+)
+
+# Control-channel ops → PiperTerminal methods (executed in the listener thread)
+_CONTROL_OPS = {
+    "stop": "stop_play",
+    "pause": "pause_play",
+    "resume": "resume_play",
+    "speed": "set_speed_override",
+}
+
+# Read-only worker methods answered immediately, even while a motion command
+# (play, record, move…) is still running on the executor thread.
+QUERY_METHODS = frozenset({
+    "cmd_get",
+    "is_playing",
+    "is_recording",
+    "is_hybrid_recording",
+    "list_tracks",
+})
+
+# Max time the reply dispatcher blocks before re-checking call timeouts.
+DISPATCH_POLL_S = 0.1
+
+# Supervision: beat period; beats missed in a row before a worker counts as
+# dead (well above the parent's scheduling jitter – a GIL-busy orchestrator or
+# a backed-up pipe delays beats by hundreds of ms); how long one SDK call may
+# run before the worker counts as hung; time a new worker gets to import +
+# connect before its first beat is expected.
+HEARTBEAT_S = 0.1
+HEARTBEAT_MISSED = 15
+HEARTBEAT_TIMEOUT_S = HEARTBEAT_S * HEARTBEAT_MISSED
+SDK_STALL_TIMEOUT_S = 2.0
+STARTUP_TIMEOUT_S = 20.0
+ACTIVATE_TIMEOUT_S = 5.0
+
+
+class _SdkWatch:
+    """Wraps an SDK interface and times every call in flight (per thread)."""
+
+    def __init__(self, target: Any) -> None:
+        self._target = target
+        self._inflight: Dict[int, Tuple[str, float]] = {}  # thread id → (method, started)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+        inflight = self._inflight
+
+        def _call(*args, **kwargs):
+            key = threading.get_ident()
+            inflight[key] = (name, time.monotonic())
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                inflight.pop(key, None)
+
+        return _call
+
+    def stall(self) -> Tuple[str, float]:
+        """(method, seconds) of the longest-running call in flight; ("", 0) if none."""
+        now = time.monotonic()
+        return max(((m, now - t0) for m, t0 in tuple(self._inflight.values())), key=lambda x: x[1], default=("", 0.0))
+
+
+def _watch_sdk(term: Any, watches: Optional[Dict[str, _SdkWatch]] = None) -> Dict[str, _SdkWatch]:
+    """Route the terminal's SDK interfaces through ``_SdkWatch``.
+
+    Call again with the returned dict after anything that may have replaced
+    an SDK object (``cmd_reset*`` re-creates them): new objects are wrapped
+    by the existing watch of that slot.
+    """
+    watches = {} if watches is None else watches
+    for attr in ("left_arm", "right_arm"):
+        arm = getattr(term, attr, None)
+        if arm is None or isinstance(arm, _SdkWatch):
+            continue
+        watch = watches.get(attr)
+        if watch is None:
+            watch = watches[attr] = _SdkWatch(arm)
+        else:
+            watch._target = arm
+        setattr(term, attr, watch)
+    return watches
+
+
+def _send(conn: Connection, codec, msg: Any) -> None:
+    conn.send_bytes(codec.dumps(msg))
+
+
+def _recv(conn: Connection, codec) -> Any:
+    return codec.loads(conn.recv_bytes())
 
 
 class _ArmWorkerProcess(Process):
     """Background process hosting a *single-arm* PiperTerminal.
 
     It listens on a *Connection* for JSON-serialisable command dictionaries and
-    executes them sequentially. Designed to be started only via *ArmProxy*.
+    executes them sequentially on an executor thread; read-only queries
+    (``QUERY_METHODS``) are answered immediately. Designed to be started only
+    via *ArmProxy*.
 
     Parameters
     ----------
@@ -42,22 +206,93 @@ class _ArmWorkerProcess(Process):
     conn
         End of *multiprocessing.Pipe* for IPC.
     side
-        Which logical arm this worker controls: ``"left"`` or ``"right"``.
+        Which logical arm this worker controls: ``"left"``, ``"right"`` or any
+        other arm name of the registry (``arm_registry.py``).
         This is required because :class:`demo.V2.manage.terminal_v2.PiperTerminal`
         expects the CAN for the left and right arm separately. When we launch a
         *single-arm* worker we must make sure the provided CAN is passed to the
         correct parameter and the other one is *None* so that internal helper
         methods (``_arm_from_name`` etc.) work as expected for track names like
-        ``left__*`` / ``right__*``.
+        ``left__*`` / ``right__*``. Other arms use the left slot and answer to
+        ``<side>__*``.
+    live_name
+        Name of the shared-memory live state block (created by the proxy).
+    standby
+        Pre-import everything but do not touch the CAN interface until an
+        ``activate`` message arrives (warm spare for failover).
+    codec
+        Wire codec name (see ``ipc_codec.py``); must match the proxy's.
+    cpu
+        Pin the worker to this core (Linux), None – leave it to the scheduler.
     """
 
-    def __init__(self, can_name: str, conn: Connection, side: str = "left"):
+    def __init__(
+        self,
+        can_name: str,
+        conn: Connection,
+        side: str = "left",
+        ctrl: Optional[Connection] = None,
+        live_name: Optional[str] = None,
+        standby: bool = False,
+        codec: str = DEFAULT_CODEC,
+        cpu: Optional[int] = None,
+    ):
         super().__init__(daemon=True)
-        if side not in {"left", "right"}:
-            raise ValueError("side must be 'left' or 'right'")
         self._can_name = can_name
         self._conn = conn
+        self._ctrl = ctrl
         self._side = side
+        self._live_name = live_name
+        self._standby = standby
+        self._codec_name = codec
+        self._cpu = cpu
+        self._codec = None  # created in the child (run)
+
+    # ---------------------------------------------------------------------
+    # Control channel (runs next to the command loop)
+    # ---------------------------------------------------------------------
+    def _control_loop(self, term) -> None:
+        assert self._ctrl is not None
+        while True:
+            try:
+                msg: Dict[str, Any] = _recv(self._ctrl, self._codec)
+            except (EOFError, OSError):
+                break
+            op = msg.get("op")
+            method = _CONTROL_OPS.get(op)  # type: ignore[arg-type]
+            if method is None:
+                logging.warning("Unknown control op: %s", msg)
+                continue
+            if term is None:
+                continue
+            try:
+                if "value" in msg:
+                    getattr(term, method)(msg["value"])
+                else:
+                    getattr(term, method)()
+            except Exception:  # noqa: BLE001
+                logging.exception("control op %s failed", op)
+
+    def _await_activation(self) -> bool:
+        """Standby: beat until told to take over (True) or to exit (False)."""
+        logging.info("Standby worker ready – CAN=%s", self._can_name)
+        beat = 0
+        while True:
+            try:
+                if not self._conn.poll(HEARTBEAT_S):
+                    beat += 1
+                    _send(self._conn, self._codec, {"hb": beat})  # single writer until activation
+                    continue
+                msg: Dict[str, Any] = _recv(self._conn, self._codec)
+            except (EOFError, OSError, BrokenPipeError):
+                return False
+            cmd_type = msg.get("cmd")
+            if cmd_type == "activate":
+                logging.info("Standby worker taking over – CAN=%s", self._can_name)
+                return True
+            if cmd_type == "shutdown":
+                return False
+            logging.warning("Standby worker ignores %s", msg)
 
     # ---------------------------------------------------------------------
     # Process entry-point
@@ -69,31 +304,174 @@ class _ArmWorkerProcess(Process):
             format="%(asctime)s [%(levelname)s] %(processName)s:%(lineno)d - %(message)s",
         )
 
+        codec = self._codec = get_codec(self._codec_name)
+        if self._cpu is not None:
+            try:
+                os.sched_setaffinity(0, {self._cpu})
+            except (AttributeError, OSError) as exc:
+                logging.warning("cannot pin %s worker to CPU %s: %s", self._side, self._cpu, exc)
+
+        # Time-to-ready per phase, reported to the proxy with the "ready" message
+        phases: Dict[str, float] = {}
+        t_phase = time.perf_counter()
         try:
             # Import locally to keep fork-safety (SDK may init on import).
-            from demo.V2.manage.terminal_v2 import PiperTerminal
+            from demo.V2.manage.terminal_v2 import PiperTerminal, _sdk
+        except Exception as exc:  # noqa: BLE001 – inside child
+            logging.exception("FAILED to import PiperTerminal: %s", exc)
+            PiperTerminal = None  # type: ignore[assignment,misc]
+        phases["import"] = time.perf_counter() - t_phase
 
-            # Pass the CAN name to the appropriate argument according to *side*
-            if self._side == "left":
-                term = PiperTerminal(left_can=self._can_name, right_can=None)
-            else:  # "right"
+        if self._standby:
+            # Warm spare: pay for the SDK import now, open CAN only on activation
+            try:
+                _sdk()
+            except Exception:  # noqa: BLE001 – reported again on activation
+                pass
+            if not self._await_activation():
+                self._conn.close()
+                return
+
+        t_phase = time.perf_counter()
+        try:
+            if PiperTerminal is None:
+                raise RuntimeError("terminal_v2 import failed")
+            # Pass the CAN name to the appropriate argument according to *side*;
+            # arms other than left/right run in the left slot under their own prefix
+            if self._side == "right":
                 term = PiperTerminal(left_can=None, right_can=self._can_name)
+            elif self._side == "left":
+                term = PiperTerminal(left_can=self._can_name, right_can=None)
+            else:
+                term = PiperTerminal(left_can=self._can_name, right_can=None, arm_names={"left": self._side})
             logging.info("Arm worker started – CAN=%s", self._can_name)
         except Exception as exc:  # noqa: BLE001 – inside child
             logging.exception("FAILED to initialise PiperTerminal: %s", exc)
             # We stay alive to send back error explanations, but many commands
             # will obviously fail.
             term = None  # type: ignore[assignment]
+        phases["terminal"] = time.perf_counter() - t_phase
+        if term is not None:
+            phases.update(getattr(term, "startup_phases", {}))
+
+        watches = _watch_sdk(term) if term is not None else {}
+
+        if self._ctrl is not None:
+            threading.Thread(target=self._control_loop, args=(term,), name="ctrl", daemon=True).start()
+
+        # Replies come from several threads (executor, queries, telemetry) – one writer at a time
+        send_lock = threading.Lock()
+
+        def _reply(payload: Dict[str, Any]) -> None:
+            with send_lock:
+                try:
+                    _send(self._conn, codec, payload)
+                except (BrokenPipeError, EOFError, OSError):
+                    pass
 
+        # Telemetry subscribers are fed from the live publisher's SDK reads
+        hub = TelemetryHub(_reply)
+        live_block: Optional[LiveStateBlock] = None
+        publisher: Optional[LivePublisher] = None
+        if term is not None and self._live_name:
+            try:
+                live_block = LiveStateBlock(self._live_name)
+                publisher = LivePublisher(term, live_block, hub=hub)
+                publisher.start()
+            except Exception:  # noqa: BLE001 – live state is optional
+                logging.exception("live state block unavailable")
+
+        # Cancelled call ids (the proxy has already dropped their futures) and
+        # the id on the executor right now; a cancel stops motion only for that one
+        run_lock = threading.Lock()
+        cancelled: Set[int] = set()
+        running: List[Optional[int]] = [None]
+
+        def _cancel(call_id: int) -> None:
+            with run_lock:
+                cancelled.add(call_id)
+                current = running[0] == call_id
+            if current and term is not None:
+                term.stop_play()
+
+        def _execute(msg: Dict[str, Any]) -> None:
+            method_name: str = msg.get("method")  # type: ignore[assignment]
+            call_id = msg.get("id")
+            if term is None:
+                _reply({"ok": False, "error": "terminal init failed", "id": call_id})
+                return
+            extra: Dict[str, Any] = {}
+            start_at = msg.get("start_at")
+            if start_at is not None:
+                # Barrier start: every arm of a fan-out begins on the same monotonic instant
+                extra["late_s"] = sleep_until(start_at)
+                extra["started"] = time.monotonic()
+                if call_id in cancelled:
+                    return  # cancelled while waiting for its start
+            try:
+                result = getattr(term, method_name)(*msg.get("args", []), **msg.get("kwargs", {}))
+                _reply({"ok": True, "result": result, "id": call_id, **extra})
+            except Exception as exc:  # noqa: BLE001
+                tb = traceback.format_exc()
+                logging.error("Exception in worker method %s: %s", method_name, exc)
+                _reply({"ok": False, "error": repr(exc), "trace": tb, "id": call_id, **extra})
+
+        # Everything except read-only queries runs strictly in arrival order on
+        # one executor thread; queries are answered right away from here.
+        jobs: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+
+        def _executor() -> None:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                call_id = job.get("id")
+                with run_lock:
+                    # jobs run in id order: lower cancelled ids are settled
+                    cancelled.difference_update([i for i in cancelled if i < call_id])
+                    if call_id in cancelled:
+                        continue
+                    running[0] = call_id
+                try:
+                    _execute(job)
+                finally:
+                    with run_lock:
+                        running[0] = None
+                    if term is not None:
+                        _watch_sdk(term, watches)  # a reset command re-creates the SDK objects
+
+        executor = threading.Thread(target=_executor, name="exec", daemon=True)
+        executor.start()
+        _reply({"ready": True, "phases": phases})
+
+        # Heartbeats come from this loop (not a side thread): a worker whose
+        # dispatch loop is stuck stops beating. Motion runs on the executor,
+        # so every beat also carries the oldest SDK call in flight – a hung
+        # JointCtrl in the middle of a track shows up as a growing stall.
+        beat = 0
+        last_beat = 0.0
         while True:
+            now = time.monotonic()
+            if now - last_beat >= HEARTBEAT_S:
+                beat += 1
+                last_beat = now
+                stall_in, stall_s = max((w.stall() for w in watches.values()), key=lambda x: x[1], default=("", 0.0))
+                _reply({"hb": beat, "stall_s": stall_s, "stall_in": stall_in})
             try:
-                msg: Dict[str, Any] = self._conn.recv()
-            except EOFError:
+                if not self._conn.poll(HEARTBEAT_S):
+                    continue
+                msg: Dict[str, Any] = _recv(self._conn, codec)
+            except (EOFError, OSError):
                 break  # parent side closed
 
             # ------------------------------------------------------------
             cmd_type = msg.get("cmd")
             if cmd_type == "shutdown":
+                jobs.put(None)
+                executor.join()
+                if publisher is not None:
+                    publisher.stop()
+                    publisher.join(timeout=1)
                 if term:
                     try:
                         term.shutdown()
@@ -102,29 +480,97 @@ class _ArmWorkerProcess(Process):
                 break
 
             if cmd_type == "call":
-                method_name: str = msg.get("method")  # type: ignore[arg-type]
-                args = msg.get("args", [])
-                kwargs = msg.get("kwargs", {})
-                call_id = msg.get("id")
-
-                if term is None:
-                    self._conn.send({"ok": False, "error": "terminal init failed", "id": call_id})
-                    continue
-
+                if msg.get("method") in QUERY_METHODS and msg.get("start_at") is None:
+                    _execute(msg)
+                else:
+                    jobs.put(msg)
+            elif cmd_type == "cancel":
+                _cancel(msg.get("id"))
+            elif cmd_type == "subscribe":
                 try:
-                    result = getattr(term, method_name)(*args, **kwargs)
-                    self._conn.send({"ok": True, "result": result, "id": call_id})
-                except Exception as exc:  # noqa: BLE001
-                    tb = traceback.format_exc()
-                    logging.error("Exception in worker method %s: %s", method_name, exc)
-                    self._conn.send({"ok": False, "error": repr(exc), "trace": tb, "id": call_id})
+                    hub.subscribe(msg["sub"], msg.get("channels") or (), msg.get("hz", 1.0))
+                except ValueError as exc:
+                    logging.warning("telemetry subscribe rejected: %s", exc)
+            elif cmd_type == "unsubscribe":
+                hub.unsubscribe(msg.get("sub"))
             else:
                 logging.warning("Unknown message: %s", msg)
 
+        if live_block is not None:
+            live_block.close()
         self._conn.close()
         logging.info("Arm worker stopped – CAN=%s", self._can_name)
 
 
+class _WorkerLink:
+    """One worker process with its pipes, pending calls and heartbeat state."""
+
+    def __init__(
+        self, can_name: str, side: str, live_name: Optional[str], standby: bool, codec, cpu: Optional[int] = None
+    ) -> None:
+        parent, child = Pipe()
+        self.codec = codec
+        self.conn = parent
+        # One-way priority channel: parent writes, worker's listener reads
+        ctrl_recv, ctrl_send = Pipe(duplex=False)
+        self.ctrl = ctrl_send
+        self.standby = standby
+        self.started = time.monotonic()
+        self.last_beat: Optional[float] = None
+        self.sdk_stall: Tuple[str, float] = ("", 0.0)  # from the last beat: (method, seconds)
+        self.ready = threading.Event()
+        self.ready_s: Optional[float] = None       # spawn/activation → ready
+        self.phases: Dict[str, float] = {}         # worker-side startup phases
+        # Calls are multiplexed: many in flight, replies routed by id
+        self.pending: Dict[int, Tuple[Future, Optional[float], str]] = {}
+        self.pending_lock = threading.Lock()
+        # Pyright may complain about generic variance; safe to ignore.
+        self.proc = _ArmWorkerProcess(
+            can_name, child, side, ctrl_recv, live_name, standby=standby, codec=codec.name, cpu=cpu  # type: ignore[arg-type]
+        )
+        self.proc.start()
+
+    def activate(self) -> None:
+        _send(self.conn, self.codec, {"cmd": "activate"})
+        self.standby = False
+        # Building the terminal (CAN connect) happens now – give it the startup grace
+        self.last_beat = None
+        self.sdk_stall = ("", 0.0)
+        self.started = time.monotonic()
+
+    def health(self) -> Optional[str]:
+        """``None`` if alive and beating, otherwise the reason it is considered dead."""
+        if not self.proc.is_alive():
+            return f"worker exited (code {self.proc.exitcode})"
+        now = time.monotonic()
+        if self.last_beat is None:
+            if now - self.started > STARTUP_TIMEOUT_S:
+                return f"no heartbeat {STARTUP_TIMEOUT_S:.0f}s after start"
+            return None
+        silent = now - self.last_beat
+        if silent > HEARTBEAT_TIMEOUT_S:
+            return f"no heartbeat for {silent:.2f}s ({int(silent / HEARTBEAT_S)} beats missed)"
+        method, stall = self.sdk_stall
+        if stall > SDK_STALL_TIMEOUT_S:
+            return f"SDK call {method} hung for {stall:.1f}s"
+        return None
+
+    def fail_pending(self, reason: str) -> None:
+        with self.pending_lock:
+            pending, self.pending = self.pending, {}
+        for fut, _, method in pending.values():
+            if not fut.done():
+                fut.set_exception(RuntimeError(f"{reason} before replying to {method}"))
+
+    def kill(self) -> None:
+        """Hard stop – a hung SDK call must not keep driving the arm."""
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join(timeout=1)
+        self.conn.close()
+        self.ctrl.close()
+
+
 class ArmProxy:
     """Client-side proxy that talks to an *ArmWorkerProcess* via Pipe.
 
@@ -133,7 +579,14 @@ class ArmProxy:
    -воркер и выполняются там.
     """
 
-    def __init__(self, can_name: str, side: str = "left"):
+    def __init__(
+        self,
+        can_name: str,
+        side: str = "left",
+        standby: bool = False,
+        codec: str = DEFAULT_CODEC,
+        cpu: Optional[int] = None,
+    ):
         """Create proxy controlling a single arm.
 
         Parameters
@@ -141,56 +594,422 @@ class ArmProxy:
         can_name
             CAN-interface associated with the arm (e.g. ``"can0"``).
         side
-            Logical side of the robot this proxy controls – ``"left"`` or
-            ``"right"``. Defaults to ``"left"`` to preserve backward
-            compatibility. Supplying the correct side ensures that track names
-            like ``right__*`` are accepted by the underlying
-            :pyclass:`PiperTerminal`.
+            Logical arm this proxy controls – ``"left"``, ``"right"`` or any
+            arm name of the registry (``arm_registry.py``). Defaults to
+            ``"left"`` to preserve backward compatibility. Supplying the
+            correct side ensures that track names like ``right__*`` (or
+            ``<side>__*``) are accepted by the underlying :pyclass:`PiperTerminal`.
+        standby
+            Keep a pre-spawned spare worker for fast ``failover()``.
+        codec
+            Wire codec: ``"msgpack"`` (default) or ``"pickle"``.
+        cpu
+            Pin the worker (and its replacements) to this core.
         """
 
-        if side not in {"left", "right"}:
-            raise ValueError("side must be 'left' or 'right'")
+        if not side or "__" in side:
+            raise ValueError("side must be an arm name without '__'")
 
-        parent, child = Pipe()
-        self._conn = parent
-        # Pyright may complain about generic variance; safe to ignore.
-        self._proc = _ArmWorkerProcess(can_name, child, side)  # type: ignore[arg-type]
-        self._proc.start()
-        self._req_id = 0  # simple incremental correlation id
+        self.can_name = can_name
+        self.side = side
+        self.cpu = cpu
+        self._codec = get_codec(codec)
+        self._ctrl_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._req_id = 0
+        # Guards the active link: calls register on it, failover swaps it
+        self._link_lock = threading.Lock()
+        # Telemetry subscriptions by id – replayed on a replacement worker
+        self._subscriptions: Dict[int, TelemetrySubscription] = {}
+        # Live state block: created (and unlinked) here, the worker only writes
+        self._live: Optional[LiveStateBlock] = LiveStateBlock(create=True)
+        self._link: Optional[_WorkerLink] = self._spawn(standby=False)
+        self._use_standby = standby
+        self._standby: Optional[_WorkerLink] = None
+        # Supervision counters (see worker_stats)
+        self.restarts = 0
+        self.standby_respawns = 0
+        self.last_restart_reason: Optional[str] = None
+        self.last_failover_s: Optional[float] = None
+        self._standby_lock = threading.Lock()
+        if standby:
+            # The spare is forked once the active worker is up, so that it does
+            # not compete with it for CPU during a cold start
+            threading.Thread(target=self._standby_after_ready, name=f"standby-{side}", daemon=True).start()
+
+    # ------------------------- worker links -----------------------------
+    def _spawn(self, standby: bool) -> _WorkerLink:
+        link = _WorkerLink(
+            self.can_name, self.side, self._live.name if self._live else None, standby, self._codec, self.cpu
+        )
+        threading.Thread(
+            target=self._dispatch_replies, args=(link,), name=f"ipc-{self.side}-{link.proc.pid}", daemon=True
+        ).start()
+        return link
+
+    def _active(self) -> _WorkerLink:
+        link = self._link
+        if link is None:
+            raise RuntimeError("proxy is shut down")
+        return link
 
     # ------------------------- low-level helpers -------------------------
+    def _dispatch_replies(self, link: _WorkerLink) -> None:
+        """Route worker replies to their futures, record heartbeats, expire timed-out calls."""
+        while True:
+            try:
+                ready = link.conn.poll(self._next_expiry(link))
+                resp = _recv(link.conn, link.codec) if ready else None
+            except (EOFError, OSError):
+                break
+            if resp is not None:
+                if "hb" in resp:
+                    link.last_beat = time.monotonic()
+                    link.sdk_stall = (resp.get("stall_in", ""), resp.get("stall_s", 0.0))
+                    continue
+                if "telemetry" in resp:
+                    sub = self._subscriptions.get(resp["telemetry"])
+                    if sub is not None:
+                        sub._deliver(resp)
+                    continue
+                if resp.get("ready"):
+                    link.phases = resp.get("phases") or {}
+                    link.ready_s = time.monotonic() - link.started
+                    link.ready.set()
+                    continue
+                with link.pending_lock:
+                    entry = link.pending.pop(resp.get("id"), None)
+                if entry is not None and not entry[0].done():
+                    fut = entry[0]
+                    if "started" in resp:
+                        fut.ipc_started = resp["started"]  # type: ignore[attr-defined]
+                        fut.ipc_late_s = resp.get("late_s")  # type: ignore[attr-defined]
+                    if resp.get("ok"):
+                        fut.set_result(resp.get("result"))
+                    else:
+                        fut.set_exception(
+                            RuntimeError(f"Worker error: {resp.get('error')}\n{resp.get('trace', '')}")
+                        )
+            self._expire(link)
+        # Worker gone – nobody will answer the calls still waiting
+        link.fail_pending("worker exited")
+
+    @staticmethod
+    def _next_expiry(link: _WorkerLink) -> float:
+        with link.pending_lock:
+            deadlines = [d for _, d, _ in link.pending.values() if d is not None]
+        if not deadlines:
+            return DISPATCH_POLL_S
+        return max(0.0, min(DISPATCH_POLL_S, min(deadlines) - time.monotonic()))
+
+    @staticmethod
+    def _expire(link: _WorkerLink) -> None:
+        now = time.monotonic()
+        with link.pending_lock:
+            expired = [cid for cid, (fut, d, _) in link.pending.items() if fut.done() or (d is not None and d <= now)]
+            entries = [link.pending.pop(cid) for cid in expired]
+        for fut, _, method in entries:
+            if not fut.done():
+                fut.set_exception(FutureTimeout(f"{method}: no reply within timeout"))
+
+    def call_async(
+        self,
+        method: str,
+        *args,
+        timeout: Optional[float] = None,
+        start_at: Optional[float] = None,
+        **kwargs,
+    ) -> Future:
+        """Send a call without waiting; the returned Future resolves with the result.
+
+        *timeout* (seconds) fails the future with ``TimeoutError`` if no reply
+        arrives in time (the worker may still finish the call – use
+        ``cancel()`` to also stop motion). *start_at* (``time.monotonic()``
+        seconds, shared by all processes of the host) holds the call in the
+        worker until that instant; the future then carries ``ipc_started`` and
+        ``ipc_late_s``. Both names are reserved and not forwarded to the
+        worker method.
+        """
+        fut: Future = Future()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._link_lock, self._send_lock:
+            link = self._active()
+            self._req_id += 1
+            curr_id = self._req_id
+            with link.pending_lock:
+                link.pending[curr_id] = (fut, deadline, method)
+            fut.ipc_id = curr_id  # type: ignore[attr-defined]
+            fut.ipc_method = method  # type: ignore[attr-defined]
+            fut.ipc_link = link  # type: ignore[attr-defined]
+            msg = {"cmd": "call", "method": method, "args": args, "kwargs": kwargs, "id": curr_id}
+            if start_at is not None:
+                msg["start_at"] = start_at
+            try:
+                _send(link.conn, link.codec, msg)
+            except (BrokenPipeError, EOFError, OSError) as exc:
+                with link.pending_lock:
+                    link.pending.pop(curr_id, None)
+                fut.set_exception(RuntimeError(f"worker pipe closed: {exc!r}"))
+        return fut
+
+    async def acall(self, method: str, *args, timeout: Optional[float] = None, **kwargs):
+        """``asyncio`` variant of :meth:`call_async`: ``await proxy.acall("cmd_get")``."""
+        return await asyncio.wrap_future(self.call_async(method, *args, timeout=timeout, **kwargs))
+
+    def cancel(self, fut: Future) -> bool:
+        """Give up on *fut*.
+
+        The worker drops a queued call before it starts; only if *fut* is the
+        call it is executing right now is motion stopped (``stop_play``) –
+        other work on the arm goes on.
+        """
+        link = getattr(fut, "ipc_link", None)
+        call_id = getattr(fut, "ipc_id", None)
+        if link is not None:
+            with link.pending_lock:
+                link.pending.pop(call_id, None)  # type: ignore[arg-type]
+        cancelled = fut.cancel()
+        if getattr(fut, "ipc_method", None) not in QUERY_METHODS and link is self._link and call_id is not None:
+            with self._send_lock:
+                try:
+                    _send(link.conn, link.codec, {"cmd": "cancel", "id": call_id})
+                except (BrokenPipeError, EOFError, OSError):
+                    pass
+        return cancelled
+
     def _send_call(self, method: str, *args, **kwargs):
-        self._req_id += 1
-        curr_id = self._req_id
-        self._conn.send({
-            "cmd": "call",
-            "method": method,
-            "args": args,
-            "kwargs": kwargs,
-            "id": curr_id,
-        })
-        resp = self._conn.recv()
-        if resp.get("id") != curr_id:
-            raise RuntimeError("out-of-order IPC reply")
-        if resp.get("ok"):
-            return resp.get("result")
-        raise RuntimeError(f"Worker error: {resp.get('error')}\n{resp.get('trace', '')}")
+        return self.call_async(method, *args, **kwargs).result()
 
-    # ------------------------- public helpers ---------------------------
-    def shutdown(self):
-        """Gracefully terminate the worker process."""
-        if not self._proc.is_alive():  # already dead
+    def _send_control(self, op: str, **payload):
+        """Fire-and-forget message on the control pipe (never waits for a reply)."""
+        with self._ctrl_lock:
+            try:
+                link = self._active()
+                _send(link.ctrl, link.codec, {"op": op, **payload})
+            except (BrokenPipeError, OSError):
+                logging.warning("control '%s' lost – %s worker is down", op, self.side)
+
+    # ------------------------- control channel --------------------------
+    def stop_play(self):
+        """Stop playback now, even while a blocking play call is in flight."""
+        self._send_control("stop")
+
+    def pause(self):
+        """Pause playback at the next control tick."""
+        self._send_control("pause")
+
+    def resume(self):
+        """Resume playback paused by pause()."""
+        self._send_control("resume")
+
+    def set_speed(self, factor: float):
+        """Live playback rate multiplier (1.0 – as planned)."""
+        self._send_control("speed", value=float(factor))
+
+    # ------------------------- supervision ------------------------------
+    def check_health(self) -> Optional[str]:
+        """``None`` while the active worker beats, otherwise why it is considered dead."""
+        link = self._link
+        return None if link is None else link.health()
+
+    def failover(self, reason: str = "manual restart") -> float:
+        """Replace the active worker by the standby (or a fresh one); returns seconds to ready.
+
+        The new worker reconnects to the same CAN interface; the arm keeps its
+        pose, so no re-homing is needed. Calls in flight on the old worker
+        fail with RuntimeError; motion that was running is *not* resumed.
+        """
+        t0 = time.perf_counter()
+        with self._link_lock, self._standby_lock:
+            old = self._active()
+            new, self._standby = self._standby, None
+            with self._ctrl_lock:
+                old.kill()
+            if self._live is not None:
+                self._live.recover()  # the old writer may have died mid-update
+            if new is not None and new.proc.is_alive():
+                new.activate()
+                wait_s = ACTIVATE_TIMEOUT_S
+            else:
+                new = self._spawn(standby=False)
+                wait_s = STARTUP_TIMEOUT_S
+            self._link = new
+            # queued in the pipe; the worker reads them once it is up
+            for sub in list(self._subscriptions.values()):
+                self._send_subscribe(new, sub)
+        # Not under the locks: calls, control ops and the other arm's
+        # supervision go on while the new worker connects
+        ready = new.ready.wait(wait_s)
+        elapsed = time.perf_counter() - t0
+        old.fail_pending(f"worker restarted ({reason})")
+        self.restarts += 1
+        self.last_restart_reason = reason
+        self.last_failover_s = elapsed
+        if ready:
+            logging.warning("[SUPERVISOR] %s worker replaced in %.0f ms (%s)", self.side, elapsed * 1000, reason)
+        else:
+            logging.error("[SUPERVISOR] %s replacement worker not ready after %.1fs", self.side, elapsed)
+        self.ensure_standby()
+        return elapsed
+
+    def _standby_after_ready(self) -> None:
+        link = self._link
+        if link is not None and link.ready.wait(STARTUP_TIMEOUT_S):
+            self.ensure_standby()
+
+    def ensure_standby(self) -> None:
+        """(Re)spawn the spare worker if it is enabled and missing or dead."""
+        link = self._link
+        if not self._use_standby or link is None or not link.ready.is_set():
+            return
+        with self._standby_lock:
+            spare = self._standby
+            if spare is not None and spare.health() is None:
+                return
+            if spare is not None:
+                logging.warning("[SUPERVISOR] %s standby lost (%s) – respawning", self.side, spare.health())
+                spare.kill()
+                self.standby_respawns += 1
+            self._standby = self._spawn(standby=True)
+
+    def worker_stats(self) -> Dict[str, Any]:
+        link, spare = self._link, self._standby
+        now = time.monotonic()
+        return {
+            "pid": link.proc.pid if link else None,
+            "alive": bool(link and link.proc.is_alive()),
+            "heartbeat_age_ms": round((now - link.last_beat) * 1000) if link and link.last_beat else None,
+            "sdk_stall_ms": round(link.sdk_stall[1] * 1000) if link else None,
+            "standby_pid": spare.proc.pid if spare else None,
+            "standby_alive": bool(spare and spare.proc.is_alive()),
+            "restarts": self.restarts,
+            "standby_respawns": self.standby_respawns,
+            "last_restart_reason": self.last_restart_reason,
+            "last_failover_ms": round(self.last_failover_s * 1000) if self.last_failover_s is not None else None,
+        }
+
+    # ------------------------- startup ---------------------------------
+    def wait_ready(self, timeout: Optional[float] = STARTUP_TIMEOUT_S) -> bool:
+        """Block until the active worker has built its terminal (CAN connected)."""
+        return self._active().ready.wait(timeout)
+
+    def startup_report(self) -> Dict[str, Any]:
+        """Seconds from spawn to ready and the worker's per-phase timings."""
+        link = self._active()
+        return {"ready_s": link.ready_s, "phases": dict(link.phases)}
+
+    # ------------------------- live state ------------------------------
+    def live_state(self) -> Dict[str, Any]:
+        """Latest state published by the worker (lock-free shared-memory read)."""
+        if self._live is None:
+            raise RuntimeError("proxy is shut down")
+        return self._live.read()
+
+    # ------------------------- telemetry stream ------------------------
+    def subscribe_telemetry(
+        self,
+        channels=None,
+        hz: float = 1.0,
+        callback=None,
+        maxlen: int = SUBSCRIPTION_QUEUE,
+    ) -> TelemetrySubscription:
+        """Stream *channels* (``telemetry.STREAM_CHANNELS``) at *hz* from the worker.
+
+        The samples come from the worker's own SDK connection – nothing else
+        opens the CAN bus. Without *callback* they are queued on the returned
+        subscription (``get()`` / iteration); ``close()`` ends the stream.
+        """
+        decimation_for(hz)  # rejects hz <= 0 here rather than in the worker
+        sub = TelemetrySubscription(self, validate_channels(channels), float(hz), callback, maxlen)
+        with self._link_lock:
+            self._subscriptions[sub.id] = sub
+            self._send_subscribe(self._active(), sub)
+        return sub
+
+    def unsubscribe_telemetry(self, sub: TelemetrySubscription) -> None:
+        if self._subscriptions.pop(sub.id, None) is None:
+            return
+        link = self._link
+        if link is None:
             return
+        with self._send_lock:
+            try:
+                _send(link.conn, link.codec, {"cmd": "unsubscribe", "sub": sub.id})
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+
+    def _send_subscribe(self, link: _WorkerLink, sub: TelemetrySubscription) -> None:
+        with self._send_lock:
+            try:
+                _send(link.conn, link.codec, {
+                    "cmd": "subscribe", "sub": sub.id, "channels": sorted(sub.channels), "hz": sub.hz,
+                })
+            except (BrokenPipeError, EOFError, OSError):
+                logging.warning("telemetry subscription %d lost – %s worker is down", sub.id, self.side)
+
+    # ------------------------- shared-memory plans ----------------------
+    def play_plans(
+        self,
+        *plans: Union[SharedPlanBuffer, Tuple[str, SetpointPlan]],
+        timeout: Optional[float] = None,
+    ) -> Future:
+        """Play precompiled plans on the worker, in order, without serialising them.
+
+        Each item is a ``SharedPlanBuffer`` (kept by the caller, reusable) or a
+        ``(label, SetpointPlan)`` pair; pairs are copied into shared memory for
+        this call only and released when it finishes. The label is a track-like
+        name (``left__…``) that selects the arm on the worker.
+        """
+        owned: List[SharedPlanBuffer] = []
+        handles = []
         try:
-            self._conn.send({"cmd": "shutdown"})
-        except (BrokenPipeError, EOFError):
-            pass
-        self._conn.close()
-        self._proc.join(timeout=3)
+            for item in plans:
+                if isinstance(item, SharedPlanBuffer):
+                    buf = item
+                else:
+                    label, plan = item
+                    buf = SharedPlanBuffer(plan, label)
+                    owned.append(buf)
+                handles.append(buf.handle)
+        except Exception:
+            for buf in owned:
+                buf.close()
+            raise
+        fut = self.call_async("play_plan_handle", *handles, timeout=timeout)
+        if owned:
+            # Safe even on timeout: a worker that mapped a block keeps it until it detaches
+            fut.add_done_callback(lambda _f: [buf.close() for buf in owned])
+        return fut
+
+    # ------------------------- public helpers ---------------------------
+    def shutdown(self):
+        """Gracefully terminate the worker process (and the standby)."""
+        self._use_standby = False
+        with self._link_lock, self._standby_lock:
+            links = [lnk for lnk in (self.__dict__.get("_link"), self.__dict__.get("_standby")) if lnk]
+            self._link = self._standby = None
+        for sub in list(self.__dict__.get("_subscriptions", {}).values()):
+            sub.close()  # wakes iterating consumers
+        for link in links:
+            # a silent (hung) worker is killed right away instead of waiting on join
+            if link.proc.is_alive() and link.health() is None:
+                try:
+                    _send(link.conn, link.codec, {"cmd": "shutdown"})
+                except (BrokenPipeError, EOFError, OSError):
+                    pass
+                link.proc.join(timeout=3)
+            link.kill()
+        live = self.__dict__.get("_live")
+        if live is not None:
+            live.close()
+            self._live = None
 
     # ------------------ dynamic dispatch magic --------------------------
     def __getattr__(self, item: str):  # noqa: D401 – it's fine
         """Return a callable forwarding the method *item* to the worker."""
+        if item.startswith("_"):
+            # private names are never remote – avoids recursion in a half-built proxy
+            raise AttributeError(item)
         return lambda *args, **kwargs: self._send_call(item, *args, **kwargs)
 
     # Ensure we clean up the worker if ArmProxy GC-ed
@@ -198,4 +1017,67 @@ class ArmProxy:
         try:
             self.shutdown()
         except Exception:  # noqa: BLE001
-            pass 
\ No newline at end of file
+            pass
+
+
+class ArmSupervisor:
+    """Heartbeat watchdog over named proxies with automatic failover.
+
+    Every *interval* seconds each proxy's active worker is checked; a dead or
+    silent one is replaced via ``ArmProxy.failover`` (standby first), and lost
+    standbys are respawned. Runs in one daemon thread.
+    """
+
+    def __init__(self, proxies: Dict[str, ArmProxy], interval: float = HEARTBEAT_S, auto_restart: bool = True):
+        self.proxies = proxies
+        self.interval = interval
+        self.auto_restart = auto_restart
+        self.missed: Dict[str, int] = {name: 0 for name in proxies}
+        # failovers in progress – each waits for its new worker in its own thread
+        self._failovers: Dict[str, threading.Thread] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="arm-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            for name, proxy in self.proxies.items():
+                try:
+                    self.check(name, proxy)
+                except Exception:  # noqa: BLE001 – the watchdog must keep running
+                    logging.exception("[SUPERVISOR] check of %s failed", name)
+
+    def check(self, name: str, proxy: ArmProxy) -> None:
+        running = self._failovers.get(name)
+        if running is not None and running.is_alive():
+            return
+        reason = proxy.check_health()
+        if reason is not None:
+            self.missed[name] = self.missed.get(name, 0) + 1
+            logging.error("[SUPERVISOR] %s: %s", name, reason)
+            if self.auto_restart:
+                # the other arms keep being checked while this one reconnects
+                thread = threading.Thread(target=proxy.failover, args=(reason,), name=f"failover-{name}", daemon=True)
+                self._failovers[name] = thread
+                thread.start()
+                return
+        proxy.ensure_standby()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for name, proxy in self.proxies.items():
+            st = proxy.worker_stats()
+            st["detected_failures"] = self.missed.get(name, 0)
+            out[name] = st
+        return out
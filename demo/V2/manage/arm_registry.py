@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+"""Registry of the arms of a station: name → CAN interface → worker.
+
+The orchestrator used to know exactly two arms (``settings.CAN_LEFT`` /
+``CAN_RIGHT``, ``left__`` / ``right__`` track prefixes). The registry makes
+the set of arms configuration:
+
+    arms.json (next to settings.py, or the path in $PIPER_ARMS)::
+
+        {"arms": [
+            {"name": "left",  "can": "can0", "cpu": 2},
+            {"name": "right", "can": "can1", "cpu": 3},
+            {"name": "a3",    "can": "can2"}
+        ]}
+
+    settings.ARMS = {"left": "can0", "right": "can1", ...}   – shorthand
+    otherwise CAN_LEFT / CAN_RIGHT                           – the old pair
+
+Every arm gets its own worker process (``ArmProxy``). Track names keep the
+``<arm>__<name>`` convention, so ``left__wave`` and ``a3__wave`` address the
+left arm and arm ``a3``. ``cpu`` optionally pins the arm's worker to one core
+so that 4–8 control loops on one host do not migrate between CPUs.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import demo.V2.settings as settings
+
+ARMS_CONFIG = Path(settings.__file__).with_name("arms.json")
+ARMS_ENV = "PIPER_ARMS"
+
+TRACK_SEP = "__"
+_ARM_NAME_RE = re.compile(r"^[A-Za-z0-9]+(?:_[A-Za-z0-9]+)*$")  # no "__", no edge "_"
+# Reserved: command arguments meaning "every arm", the scene/recipe prefixes
+_RESERVED = {"all", "both", "a", "scene", "recipe", "version"}
+
+
+@dataclass(frozen=True)
+class ArmSpec:
+    name: str
+    can: str
+    cpu: Optional[int] = None  # core the worker is pinned to (None – no pinning)
+
+    @property
+    def prefix(self) -> str:
+        return f"{self.name}{TRACK_SEP}"
+
+    @property
+    def slot(self) -> str:
+        """Arm slot of the worker's PiperTerminal (it has a left and a right one)."""
+        return "right" if self.name == "right" else "left"
+
+
+class ArmRegistry:
+    """Ordered set of ``ArmSpec`` with track-name routing."""
+
+    def __init__(self, arms: List[ArmSpec]) -> None:
+        self._arms: Dict[str, ArmSpec] = {}
+        cans: Dict[str, str] = {}
+        for spec in arms:
+            if not _ARM_NAME_RE.match(spec.name) or spec.name in _RESERVED:
+                raise ValueError(f"invalid arm name '{spec.name}'")
+            if spec.name in self._arms:
+                raise ValueError(f"duplicate arm '{spec.name}'")
+            if spec.can in cans:
+                raise ValueError(f"arms '{cans[spec.can]}' and '{spec.name}' share CAN '{spec.can}'")
+            self._arms[spec.name] = spec
+            cans[spec.can] = spec.name
+
+    # ------------------------------ loading ------------------------------
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any]) -> "ArmRegistry":
+        return cls([ArmSpec(str(a["name"]), str(a["can"]), a.get("cpu")) for a in obj.get("arms", [])])
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ArmRegistry":
+        return cls.from_json(json.loads(Path(path).read_text()))
+
+    @classmethod
+    def from_settings(cls) -> "ArmRegistry":
+        arms = getattr(settings, "ARMS", None)
+        if arms is None:
+            arms = {"left": getattr(settings, "CAN_LEFT", None), "right": getattr(settings, "CAN_RIGHT", None)}
+        return cls([ArmSpec(name, can) for name, can in arms.items() if can is not None])
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "ArmRegistry":
+        """*path*, else $PIPER_ARMS, else ``arms.json`` if present, else settings."""
+        path = path or (Path(os.environ[ARMS_ENV]) if os.environ.get(ARMS_ENV) else None)
+        if path is None and ARMS_CONFIG.exists():
+            path = ARMS_CONFIG
+        return cls.from_file(path) if path is not None else cls.from_settings()
+
+    # ------------------------------ access ------------------------------
+    def __iter__(self) -> Iterator[ArmSpec]:
+        return iter(self._arms.values())
+
+    def __len__(self) -> int:
+        return len(self._arms)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._arms
+
+    def __getitem__(self, name: str) -> ArmSpec:
+        return self._arms[name]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._arms)
+
+    def arm_for_track(self, track_name: str) -> Optional[str]:
+        """Arm addressed by ``<arm>__<name>``; None for unknown prefixes."""
+        arm, sep, _rest = track_name.partition(TRACK_SEP)
+        return arm if sep and arm in self._arms else None
+
+    def resolve(self, token: str) -> Optional[str]:
+        """Arm name for a command argument (``l``/``r`` aliases, exact names)."""
+        tok = token.lower()
+        alias = {"l": "left", "r": "right"}.get(tok, tok)
+        return alias if alias in self._arms else None
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+"""Micro-benchmark of the arm_ipc wire codecs (pickle vs msgpack).
+
+For typical payloads – a ``cmd_get`` reply, one telemetry sample as a dict
+and a 250-sample NumPy telemetry batch – measures:
+
+    encode+decode   µs per message in-process;
+    round trip      median / p99 µs, echo through a Pipe to another process;
+    throughput      one-way messages/s and MB/s through a Pipe.
+
+Usage:  python -m demo.V2.manage.bench_ipc_codec [--n 5000]
+"""
+
+import argparse
+import statistics
+import time
+from multiprocessing import Pipe, Process
+from typing import Any, Dict, List
+
+import numpy as np
+
+from demo.V2.manage.ipc_codec import get_codec
+
+
+def _payloads() -> Dict[str, Any]:
+    rng = np.random.default_rng(0)
+    n = 250
+    return {
+        "cmd_get": {"ok": True, "result": {"left": [1200, -35000, 41000, 0, 15000, -900, 52000], "right": None}, "id": 4711},
+        "telemetry": {
+            "ts": time.time(),
+            "joints": [1200, -35000, 41000, 0, 15000, -900, 52000],
+            "motor_speed_rpm": [12, -3, 0, 0, 5, 1],
+            "motor_current_ma": [310, 1220, 870, 40, 160, 30],
+            "motor_effort_mNm": [0.31, 1.22, 0.87, 0.04, 0.16, 0.03],
+            "foc_temp_c": [36, 39, 38, 33, 34, 33],
+            "motor_temp_c": [41, 44, 43, 37, 38, 36],
+        },
+        f"telemetry_batch[{n}]": {
+            "ts": np.linspace(0.0, n / 50, n),
+            "joints": rng.integers(-90_000, 90_000, size=(n, 7), dtype=np.int32),
+            "motor_current_ma": rng.integers(0, 3000, size=(n, 6), dtype=np.int32),
+            "motor_effort_mNm": rng.normal(size=(n, 6)),
+        },
+    }
+
+
+def _echo(conn, codec_name: str) -> None:
+    codec = get_codec(codec_name)
+    while True:
+        try:
+            data = conn.recv_bytes()
+        except EOFError:
+            break
+        if data == b"stop":
+            break
+        if data == b"sink":
+            # throughput mode: decode everything until "end", then ack
+            while True:
+                data = conn.recv_bytes()
+                if data == b"end":
+                    conn.send_bytes(b"ok")
+                    break
+                codec.loads(data)
+            continue
+        conn.send_bytes(codec.dumps(codec.loads(data)))
+
+
+def _codec_cost(codec, payload, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        codec.loads(codec.dumps(payload))
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def _round_trip(conn, codec, payload, n: int) -> List[float]:
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        conn.send_bytes(codec.dumps(payload))
+        codec.loads(conn.recv_bytes())
+        out.append((time.perf_counter() - t0) * 1e6)
+    return out
+
+
+def _throughput(conn, codec, payload, n: int):
+    conn.send_bytes(b"sink")
+    t0 = time.perf_counter()
+    nbytes = 0
+    for _ in range(n):
+        frame = codec.dumps(payload)
+        nbytes += len(frame)
+        conn.send_bytes(frame)
+    conn.send_bytes(b"end")
+    conn.recv_bytes()
+    dt = time.perf_counter() - t0
+    return n / dt, nbytes / dt / 1e6, nbytes / n
+
+
+def run(n: int = 5000, codecs=("pickle", "msgpack")) -> List[Dict[str, Any]]:
+    rows = []
+    payloads = _payloads()
+    for codec_name in codecs:
+        codec = get_codec(codec_name)
+        parent, child = Pipe()
+        proc = Process(target=_echo, args=(child, codec.name), daemon=True)
+        proc.start()
+        try:
+            for label, payload in payloads.items():
+                k = n if "batch" not in label else max(200, n // 10)
+                _round_trip(parent, codec, payload, min(200, k))  # warm-up
+                rtt = sorted(_round_trip(parent, codec, payload, k))
+                msgs, mbps, size = _throughput(parent, codec, payload, k)
+                rows.append({
+                    "codec": codec.name,
+                    "payload": label,
+                    "bytes": int(size),
+                    "codec_us": _codec_cost(codec, payload, k),
+                    "rtt_med_us": statistics.median(rtt),
+                    "rtt_p99_us": rtt[int(0.99 * (len(rtt) - 1))],
+                    "msgs_s": msgs,
+                    "mb_s": mbps,
+                })
+        finally:
+            parent.send_bytes(b"stop")
+            proc.join(timeout=2)
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--n", type=int, default=5000, help="messages per measurement")
+    args = ap.parse_args()
+    rows = run(args.n)
+    print(f"{'payload':<22}{'codec':<9}{'bytes':>8}{'enc+dec µs':>12}{'rtt med µs':>12}{'rtt p99 µs':>12}{'msg/s':>10}{'MB/s':>9}")
+    for r in rows:
+        print(
+            f"{r['payload']:<22}{r['codec']:<9}{r['bytes']:>8}{r['codec_us']:>12.1f}{r['rtt_med_us']:>12.1f}"
+            f"{r['rtt_p99_us']:>12.1f}{r['msgs_s']:>10.0f}{r['mb_s']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ import json
 import time
 from pathlib import Path
 from demo.V2.settings import CAN_NAME
+from demo.V2.manage.rate import RateScheduler
 from interface.piper_interface_v2 import C_PiperInterface_V2 as SDK
 
 DEFAULT_CAN = CAN_NAME
@@ -59,7 +60,7 @@ def play(json_path: Path = JSON_PATH, hz: int = HZ, can_name: str = CAN) -> None
 
     time.sleep(0.5)  # дать контроллеру переключиться
 
-    period = 1.0 / hz
+    sched = RateScheduler(hz)
     print(f"Воспроизведение {len(data)} точек с частотой {hz} Гц…  Ctrl+C для прерывания.")
     try:
         for pt in data:
@@ -71,10 +72,12 @@ def play(json_path: Path = JSON_PATH, hz: int = HZ, can_name: str = CAN) -> None
             else:
                 print("⚠️  пропуск некорректной точки", pt)
                 continue
-            time.sleep(period)
+            sched.wait()
     except KeyboardInterrupt:
         print("Остановлено пользователем.")
     finally:
+        st = sched.summary()
+        print(f"Тайминг: {st['ticks']} тиков за {st['elapsed_s']} с, пропущено дедлайнов {st['missed']}, max опоздание {st['max_late_ms']} мс")
         # Переводим в standby и отключаем моторы, если явно попросили
         arm.ModeCtrl(ctrl_mode=0x00, move_mode=0x00)
         # От CAN можно отключиться в любом случае – моторы уже получили последнее задание
@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+"""Standalone effort/temperature dump over its own SDK connection.
+
+Opens a second SDK instance on the bus – only for use without a running
+terminal. With terminal_v3 up use ``telemetry [side] channels=... hz=...``
+(or ``ArmProxy.subscribe_telemetry``), which streams the same values from
+the arm worker's own connection.
+"""
+
 import argparse
 import json
 import sys
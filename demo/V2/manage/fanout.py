@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""Concurrent broadcast of one command to several arm proxies.
+
+``PiperTerminalV3`` used to call the arms one after the other, so a reset or
+mode change took the sum of both round trips. ``FanOut`` sends the call to
+every proxy first (``ArmProxy.call_async`` does not wait) and only then
+gathers the replies, keeping the result or the exception of each arm::
+
+    fan = FanOut({"left": left, "right": right})
+    out = fan.call("cmd_reset")
+    for arm, res in out.items():
+        print(arm, res.ok, res.error)
+
+With ``barrier=True`` every worker holds the call until one common instant
+on the host's monotonic clock (``time.monotonic`` is the same clock in all
+processes), so motions start together instead of one IPC latency apart::
+
+    out = fan.call("cmd_play", barrier=True, args_by_arm={"left": ("left__a",), "right": ("right__a",)})
+    print(start_skew_ms(out))
+"""
+
+import logging
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+# How far ahead of "now" the common start instant is placed. Covers sending
+# the call to every worker and their dispatch wake-up (well under 1 ms each).
+BARRIER_LEAD_S = 0.02
+
+
+@dataclass
+class ArmResult:
+    """Outcome of one arm in a fan-out call."""
+
+    arm: str
+    ok: bool
+    result: Any = None
+    error: Optional[BaseException] = None
+    started: Optional[float] = None   # worker's monotonic start (barrier calls)
+    late_s: Optional[float] = None    # how late the worker passed the barrier
+
+
+def start_skew_ms(results: Mapping[str, ArmResult]) -> Optional[float]:
+    """Spread of the workers' actual start instants of a barrier call."""
+    starts = [r.started for r in results.values() if r.started is not None]
+    if len(starts) < 2:
+        return None
+    return (max(starts) - min(starts)) * 1000
+
+
+class FanOut:
+    """Issue the same call to all proxies at once and gather per-arm results."""
+
+    def __init__(self, proxies: Mapping[str, Any]) -> None:
+        self.proxies = {arm: p for arm, p in proxies.items() if p is not None}
+
+    def submit(
+        self,
+        method: str,
+        *args,
+        arms: Optional[Sequence[str]] = None,
+        args_by_arm: Optional[Mapping[str, Sequence[Any]]] = None,
+        barrier: bool = False,
+        lead_s: float = BARRIER_LEAD_S,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Dict[str, Future]:
+        """Send *method* to every selected arm without waiting.
+
+        *args_by_arm* gives per-arm positional arguments (arms missing from it
+        are skipped); otherwise *args* go to all of *arms* (default – all).
+        """
+        if args_by_arm is not None:
+            targets = {arm: tuple(a) for arm, a in args_by_arm.items() if arm in self.proxies}
+        else:
+            targets = {arm: args for arm in (arms or self.proxies) if arm in self.proxies}
+        start_at = time.monotonic() + lead_s if barrier else None
+        futures: Dict[str, Future] = {}
+        for arm, call_args in targets.items():
+            try:
+                futures[arm] = self.proxies[arm].call_async(
+                    method, *call_args, timeout=timeout, start_at=start_at, **kwargs
+                )
+            except Exception as exc:  # noqa: BLE001 – e.g. proxy shut down; reported per arm
+                fut: Future = Future()
+                fut.set_exception(exc)
+                futures[arm] = fut
+        return futures
+
+    @staticmethod
+    def gather(futures: Mapping[str, Future], timeout: Optional[float] = None) -> Dict[str, ArmResult]:
+        """Wait for every future; never raises – errors land in ``ArmResult.error``."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        out: Dict[str, ArmResult] = {}
+        for arm, fut in futures.items():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                res = ArmResult(arm, True, result=fut.result(timeout=remaining))
+            except Exception as exc:  # noqa: BLE001
+                res = ArmResult(arm, False, error=exc)
+            res.started = getattr(fut, "ipc_started", None)
+            res.late_s = getattr(fut, "ipc_late_s", None)
+            out[arm] = res
+        return out
+
+    def call(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Dict[str, ArmResult]:
+        """``submit`` + ``gather``: run *method* on all arms concurrently."""
+        results = self.gather(self.submit(method, *args, timeout=timeout, **kwargs))
+        for res in results.values():
+            if not res.ok:
+                first_line = (str(res.error) or repr(res.error)).splitlines()[0]
+                logging.warning("[FANOUT] %s.%s failed: %s", res.arm, method, first_line)
+        skew = start_skew_ms(results)
+        if skew is not None:
+            logging.debug("[FANOUT] %s barrier start skew %.3f ms", method, skew)
+        return results
@@ -18,6 +18,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from kinematics.piper_fk import C_PiperForwardKinematics
 from demo.V2.manage.terminal_v2 import PiperTerminal
+from demo.V2.manage.track import TrackBase
 
 
 logging.basicConfig(level=logging.INFO,
@@ -164,20 +165,18 @@ class PiperGUI:
 
     def _prepare_timeline(self, tracks):
         """Load track data and draw 7 joint traces."""
-        # Load combined points
-        pts = []
+        # Load combined points (struct-of-arrays, no per-sample objects)
+        chunks = []
         for t in tracks:
-            path = (Path(__file__).parent / "tracks" / f"{t}.json").resolve()
             try:
-                data = json.loads(path.read_text())
-                pts.extend(data)
+                chunks.append(TrackBase.read_track(t).arrays.coordinates)
             except Exception:
                 logging.warning("Failed to load track %s", t)
 
-        if not pts:
+        if not chunks or not sum(len(c) for c in chunks):
             return
 
-        arr = np.array(pts)  # shape (N,7)
+        arr = np.concatenate(chunks)  # shape (N,7)
         self._timeline_len = len(arr)
         self._point_counter = 0
 
@@ -227,7 +226,7 @@ class PiperGUI:
             messagebox.showinfo("Not playing", "There is no active playback.")
             return
         try:
-            self.term.stop_play()
+            self.term.stop_play(wait=True, timeout=5.0)
             self.term.set_point_hook(None)
         except Exception as exc:
             logging.exception("Stop play failed")
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+"""Pluggable wire codecs for the ``arm_ipc`` protocol.
+
+Every message between ``ArmProxy`` and its worker (commands, replies,
+heartbeats, control ops, telemetry) is one frame sent with
+``Connection.send_bytes`` and encoded by a codec:
+
+    pickle   – what ``Connection.send`` did before; any Python object.
+    msgpack  – compact binary maps/lists; NumPy arrays travel as raw bytes
+               (ext type 1: dtype, shape, buffer – no per-element encoding)
+               and anything msgpack cannot express (dataclasses such as
+               ``PlanHandle``, sets …) falls back to an embedded pickle
+               (ext type 2), so every existing call keeps working.
+
+msgpack is optional: without it ``get_codec("msgpack")`` falls back to pickle
+with a warning. ``bench_ipc_codec.py`` compares the two.
+"""
+
+import logging
+import pickle
+import struct
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover – optional dependency
+    msgpack = None  # type: ignore[assignment]
+
+DEFAULT_CODEC = "msgpack"
+
+EXT_NDARRAY = 1
+EXT_PICKLE = 2
+
+_ND_HDR = struct.Struct("<B")  # length of dtype string / ndim
+
+
+class PickleCodec:
+    name = "pickle"
+
+    @staticmethod
+    def dumps(obj: Any) -> bytes:
+        return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+def _pack_ndarray(arr: np.ndarray) -> bytes:
+    arr = np.ascontiguousarray(arr)
+    dtype = arr.dtype.str.encode()
+    shape = struct.pack(f"<{arr.ndim}Q", *arr.shape)
+    return b"".join((_ND_HDR.pack(len(dtype)), dtype, _ND_HDR.pack(arr.ndim), shape, arr.tobytes()))
+
+
+def _unpack_ndarray(data: bytes) -> np.ndarray:
+    view = memoryview(data)
+    (dlen,) = _ND_HDR.unpack_from(view, 0)
+    dtype = np.dtype(bytes(view[1:1 + dlen]).decode())
+    off = 1 + dlen
+    (ndim,) = _ND_HDR.unpack_from(view, off)
+    off += 1
+    shape = struct.unpack_from(f"<{ndim}Q", view, off)
+    off += 8 * ndim
+    # Read-only view on the received frame – no copy of the payload
+    return np.frombuffer(view, dtype=dtype, offset=off).reshape(shape)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise ImportError("msgpack is not installed")
+
+    @staticmethod
+    def _default(obj: Any) -> Any:
+        if isinstance(obj, np.ndarray):
+            return msgpack.ExtType(EXT_NDARRAY, _pack_ndarray(obj))
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return msgpack.ExtType(EXT_PICKLE, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == EXT_NDARRAY:
+            return _unpack_ndarray(data)
+        if code == EXT_PICKLE:
+            return pickle.loads(data)
+        return msgpack.ExtType(code, data)
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, default=self._default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+_CODECS: Dict[str, Callable[[], Any]] = {
+    "pickle": PickleCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def get_codec(name: str = DEFAULT_CODEC):
+    """Codec instance by name (``pickle`` / ``msgpack``)."""
+    try:
+        factory = _CODECS[name]
+    except KeyError:
+        raise ValueError(f"unknown IPC codec '{name}' (known: {', '.join(sorted(_CODECS))})") from None
+    try:
+        return factory()
+    except ImportError as exc:
+        logging.warning("[IPC] codec %s unavailable (%s) – using pickle", name, exc)
+        return PickleCodec()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+"""Seqlock-protected shared-memory block with the live state of one arm.
+
+Each arm worker publishes its latest joints, gripper, motor telemetry, play
+state, current track, progress and loop jitter at the control rate into a
+small ``multiprocessing.shared_memory`` block. Readers (orchestrator, GUI,
+visualiser) poll it without any IPC round trip and without locks:
+
+    writer: seq += 1 (odd) → write fields → seq += 1 (even)
+    reader: s1 = seq; copy; s2 = seq; retry unless s1 == s2 and s1 is even
+
+There is exactly one writer per block (the worker's publisher thread).
+``ArmProxy`` creates and owns the block; the worker only attaches to it.
+"""
+
+import logging
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# play-state bit flags
+STATE_PLAYING = 1
+STATE_PAUSED = 2
+STATE_RECORDING = 4
+STATE_HYBRID = 8
+
+LIVE_HZ = 50  # publisher rate (= default control rate)
+READ_SPINS = 100  # busy retries before a reader starts yielding the CPU
+READ_TIMEOUT_S = 0.05  # a writer preempted mid-update must not fail readers
+TRACK_NAME_BYTES = 64
+
+LIVE_DTYPE = np.dtype(
+    [
+        ("seq", "<u8"),
+        ("ts", "<f8"),                      # time.time() of the update
+        ("joints", "<i4", (7,)),            # 6 joints + gripper, 0.001° / 0.001 mm
+        ("motor_speed_rpm", "<i4", (6,)),
+        ("motor_current_ma", "<i4", (6,)),
+        ("motor_effort_mNm", "<f8", (6,)),
+        ("foc_temp_c", "<i4", (6,)),
+        ("motor_temp_c", "<i4", (6,)),
+        ("state", "<u4"),                   # STATE_* flags
+        ("progress", "<i8"),                # index of the last sent setpoint
+        ("total", "<i8"),                   # setpoints in the current track
+        ("jitter_ms", "<f4"),               # lateness of the last control tick
+        ("max_jitter_ms", "<f4"),           # worst lateness in the current track
+        ("track", f"S{TRACK_NAME_BYTES}"),
+    ],
+    align=True,
+)
+_BLOCK_FIELDS = frozenset(LIVE_DTYPE.names)
+
+
+class LiveStateBlock:
+    """One record of ``LIVE_DTYPE`` in shared memory."""
+
+    def __init__(self, name: Optional[str] = None, create: bool = False) -> None:
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=LIVE_DTYPE.itemsize if create else 0)
+        self.name = self.shm.name
+        self._owner = create
+        self._rec = np.ndarray((1,), dtype=LIVE_DTYPE, buffer=self.shm.buf)
+        self._seq = self._rec["seq"]  # view – reading it does not copy the record
+        if create:
+            self._rec[0] = np.zeros((), dtype=LIVE_DTYPE)
+
+    # ----------------------------- writer -----------------------------
+    def write(self, **fields: Any) -> None:
+        """Update *fields* atomically for readers (single writer only)."""
+        rec = self._rec
+        self._seq[0] += 1  # odd – update in progress
+        for key, value in fields.items():
+            if key == "track":
+                value = (value or "").encode()[:TRACK_NAME_BYTES]
+            rec[key][0] = value
+        self._seq[0] += 1  # even – consistent
+
+    def recover(self) -> None:
+        """Owner side: close an update left open by a writer that died mid-write."""
+        if int(self._seq[0]) & 1:
+            self._seq[0] += 1
+
+    # ----------------------------- reader -----------------------------
+    def read_raw(self, timeout_s: float = READ_TIMEOUT_S) -> np.void:
+        """Consistent copy of the record.
+
+        Spins while a write is in progress, yielding the CPU after a few
+        attempts: the writer may be preempted mid-update for milliseconds.
+        Raises only if the block stays inconsistent for *timeout_s*.
+        """
+        deadline = time.monotonic() + timeout_s
+        attempt = 0
+        while True:
+            s1 = int(self._seq[0])
+            if not s1 & 1:
+                snap = self._rec[0].copy()
+                if int(self._seq[0]) == s1:
+                    return snap
+            attempt += 1
+            if attempt >= READ_SPINS:
+                if time.monotonic() >= deadline:
+                    raise RuntimeError("live state: writer stuck mid-update")
+                time.sleep(0)
+
+    def read(self) -> Dict[str, Any]:
+        rec = self.read_raw()
+        state = int(rec["state"])
+        return {
+            "seq": int(rec["seq"]),
+            "ts": float(rec["ts"]),
+            "age_s": max(0.0, time.time() - float(rec["ts"])) if rec["ts"] else None,
+            "joints": rec["joints"].tolist(),
+            "motor_speed_rpm": rec["motor_speed_rpm"].tolist(),
+            "motor_current_ma": rec["motor_current_ma"].tolist(),
+            "motor_effort_mNm": rec["motor_effort_mNm"].tolist(),
+            "foc_temp_c": rec["foc_temp_c"].tolist(),
+            "motor_temp_c": rec["motor_temp_c"].tolist(),
+            "playing": bool(state & STATE_PLAYING),
+            "paused": bool(state & STATE_PAUSED),
+            "recording": bool(state & STATE_RECORDING),
+            "hybrid_recording": bool(state & STATE_HYBRID),
+            "track": rec["track"].decode(errors="replace"),
+            "progress": int(rec["progress"]),
+            "total": int(rec["total"]),
+            "jitter_ms": float(rec["jitter_ms"]),
+            "max_jitter_ms": float(rec["max_jitter_ms"]),
+        }
+
+    def close(self) -> None:
+        self._rec = None  # type: ignore[assignment] – release buffer views first
+        self._seq = None  # type: ignore[assignment]
+        self.shm.close()
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class LivePublisher(threading.Thread):
+    """Worker-side thread copying PiperTerminal state into a LiveStateBlock.
+
+    With a *hub* (``telemetry.TelemetryHub``) every sample – including the
+    channels the block has no room for – is also offered to its subscribers.
+    """
+
+    def __init__(self, term, block: LiveStateBlock, hz: float = LIVE_HZ, hub=None) -> None:
+        super().__init__(name="live", daemon=True)
+        self._term = term
+        self._block = block
+        self._hz = hz
+        self._hub = hub
+        self._halt = threading.Event()
+
+    def stop(self) -> None:
+        self._halt.set()
+
+    def _arm(self):
+        term = self._term
+        return term.left_arm or term.right_arm
+
+    def run(self) -> None:
+        from demo.V2.manage.rate import RateScheduler  # local import – keep module light
+
+        sched = RateScheduler(self._hz)
+        while not self._halt.is_set():
+            try:
+                sample = self._collect()
+                self._block.write(**{k: v for k, v in sample.items() if k in _BLOCK_FIELDS})
+                if self._hub:
+                    self._hub.publish(sample)
+            except Exception:  # noqa: BLE001 – never let telemetry kill the worker
+                logging.debug("live state publish failed", exc_info=True)
+            sched.wait()
+
+    def _collect(self) -> Dict[str, Any]:
+        term = self._term
+        out: Dict[str, Any] = {"ts": time.time()}
+        arm = self._arm()
+        if arm is not None:
+            js = arm.GetArmJointMsgs().joint_state
+            gr = arm.GetArmGripperMsgs().gripper_state
+            out["joints"] = (js.joint_1, js.joint_2, js.joint_3, js.joint_4, js.joint_5, js.joint_6, gr.grippers_angle)
+            hs = arm.GetArmHighSpdInfoMsgs()
+            ls = arm.GetArmLowSpdInfoMsgs()
+            hm = [getattr(hs, f"motor_{i}") for i in range(1, 7)]
+            lm = [getattr(ls, f"motor_{i}") for i in range(1, 7)]
+            out["motor_speed_rpm"] = [m.motor_speed for m in hm]
+            out["motor_current_ma"] = [m.current for m in hm]
+            out["motor_pos_deg001"] = [m.pos for m in hm]
+            out["motor_effort_mNm"] = [m.effort for m in hm]
+            out["voltage_mv"] = [m.vol for m in lm]
+            out["foc_temp_c"] = [m.foc_temp for m in lm]
+            out["motor_temp_c"] = [m.motor_temp for m in lm]
+            out["bus_current_ma"] = [m.bus_current for m in lm]
+
+        state = 0
+        if term.is_playing():
+            state |= STATE_PLAYING
+        # in-memory flags only – _pause_requested() would read pause.txt every tick
+        if term._play_pause.is_set() or term._live_paused:
+            state |= STATE_PAUSED
+        if term.is_recording():
+            state |= STATE_RECORDING
+        if term.is_hybrid_recording():
+            state |= STATE_HYBRID
+        out["state"] = state
+        out["track"] = term._live_track
+        out["progress"], out["total"] = term._live_progress
+        sched = term._live_sched
+        if sched is not None:
+            out["jitter_ms"] = sched.last_late_ns / 1e6
+            out["max_jitter_ms"] = sched.max_late_ns / 1e6
+        return out
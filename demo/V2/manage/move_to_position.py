@@ -20,6 +20,7 @@ from pathlib import Path
 from typing import List
 
 from interface.piper_interface_v2 import C_PiperInterface_V2 as SDK
+from demo.V2.manage.rate import RateScheduler
 
 DEFAULT_CAN = "can_piper"
 DEFAULT_SPEED = 30  # Speed percentage (0-100)
@@ -104,7 +105,7 @@ def move_to_position(position_name: str, can_name: str = DEFAULT_CAN,
         print(f"Время перемещения: ~{movement_time:.1f} секунд")
         
         # Smooth movement using interpolation
-        period = 1.0 / hz
+        sched = RateScheduler(hz)
         total_steps = int(movement_time * hz)
         
         for step in range(total_steps + 1):
@@ -130,7 +131,7 @@ def move_to_position(position_name: str, can_name: str = DEFAULT_CAN,
                 progress = (step / total_steps) * 100
                 print(f"  Прогресс: {progress:.0f}%")
             
-            time.sleep(period)
+            sched.wait()
         
         print("✓ Перемещение завершено!")
         
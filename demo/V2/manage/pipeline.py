@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+"""Order queue and pipelined execution of scenes.
+
+``scene_play a b`` runs scenes strictly one after another: dish N+1 starts
+only when every arm has finished dish N. ``OrderPipeline`` instead merges
+the queued orders into one scene, one after another *per arm*, so an arm
+that is done with its part of dish N moves on to dish N+1 while its partner
+is still finishing N::
+
+    left:  [N: prep ...........][N+1: prep ...........]
+    right:          [N: plate .......][N+1: plate .......]
+
+What must not overlap is declared in the scenes with ``acquire <resource>``
+/ ``release <resource>`` (stove, door, utensils – see scene.py). In the
+merged scene the first ``acquire`` of a resource by order N+1 waits for the
+``release`` of that resource by the last order that used it, so the
+resource is handed over through the same ``signal``/``wait`` mechanism as
+the arms' handoffs and is respected at run time, not only in the plan.
+Handoff events are namespaced per order. Pauses keep their meaning
+relative to the arm's previous element, so scenes meant for pipelining
+should express "wait for the partner" with ``wait`` rather than leading
+pauses.
+
+Before a batch moves, every order is pre-flighted (preflight.py): orders
+with a missing/broken track or inconsistent handoffs are rejected on their
+own, and the merged scene is played from precompiled shared-memory plans.
+Orders queued while a batch is running start with the next batch.
+Throughput (dishes per hour) and per-order latency (queued → last track
+done) are kept for all orders since the pipeline was created.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+from demo.V2.manage.preflight import PreflightError, PreparedScene, PreparedTrack, check_scenes, preflight
+from demo.V2.manage.scene import Scene, SceneElement
+from demo.V2.manage.scene_compiler import CompiledScene, ExecutionReport, SceneExecutor, compile_scene
+
+_ORDER_IDS = itertools.count(1)
+
+
+@dataclass
+class Order:
+    scene: str
+    id: int = field(default_factory=lambda: next(_ORDER_IDS))
+    queued: float = field(default_factory=time.monotonic)
+    started: Optional[float] = None   # first track started (monotonic)
+    finished: Optional[float] = None  # last track done (monotonic)
+    ok: Optional[bool] = None         # None – not run yet
+
+    @property
+    def tag(self) -> str:
+        return f"o{self.id}"
+
+    @property
+    def latency_s(self) -> Optional[float]:
+        return None if self.finished is None else self.finished - self.queued
+
+    @property
+    def cook_s(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+def merge_orders(
+    orders: List[Tuple[str, Scene]], name: str = "scene__pipeline"
+) -> Tuple[Scene, Dict[Tuple[str, int], str]]:
+    """Concatenate *orders* (``(tag, scene)``) per arm into one scene.
+
+    Returns the merged scene and the owner tag of every merged element
+    ``(arm, index)``.
+    """
+    arms: Dict[str, List[SceneElement]] = {}
+    owner: Dict[Tuple[str, int], str] = {}
+    released_by: Dict[str, List[str]] = {}  # resource → release events of the last order using it
+    for tag, scene in orders:
+        released_here: Dict[str, List[str]] = {}
+        for arm, seq in scene.arms.items():
+            out = arms.setdefault(arm, [])
+
+            def _add(el: SceneElement) -> None:
+                owner[(arm, len(out))] = tag
+                out.append(el)
+
+            for idx, el in enumerate(seq):
+                if el.type in ("signal", "wait"):
+                    _add(SceneElement(type=el.type, event=f"{tag}:{el.event}"))
+                elif el.type == "acquire":
+                    for ev in released_by.get(el.resource, []):
+                        _add(SceneElement(type="wait", event=ev))
+                    _add(el)
+                elif el.type == "release":
+                    ev = f"{tag}:release:{el.resource}:{arm}:{idx}"
+                    released_here.setdefault(el.resource, []).append(ev)
+                    _add(el)
+                    _add(SceneElement(type="signal", event=ev))
+                else:
+                    _add(el)
+        released_by.update(released_here)
+    return Scene(name=name, arms=arms), owner
+
+
+@dataclass
+class BatchReport:
+    orders: List[Order]
+    planned_s: float     # makespan of the merged schedule
+    sequential_s: float  # sum of the orders' own makespans (scene_play)
+    execution: ExecutionReport
+
+
+class OrderPipeline:
+    """Queue of orders (scene names) executed in pipelined batches."""
+
+    def __init__(
+        self,
+        proxies: Mapping[str, Any],
+        stop_event: Optional[threading.Event] = None,
+        pause_active: Optional[Callable[[], bool]] = None,
+        loader: Callable[[str], Scene] = Scene.load,
+        timing: Optional[Callable[[str, float], Any]] = None,
+        check_tracks: bool = True,
+    ) -> None:
+        self.proxies = dict(proxies)
+        self.stop_event = stop_event or threading.Event()
+        self.pause_active = pause_active
+        self.loader = loader
+        self.timing = timing
+        # Load and compile every track before the batch moves (preflight.py);
+        # off – tracks are timed with *timing* and played by name
+        self.check_tracks = check_tracks
+        self.queue: Deque[Order] = deque()
+        self.history: List[Order] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    # ------------------------------ queue ------------------------------
+    def submit(self, scene_name: str) -> Order:
+        order = Order(scene_name)
+        with self._cond:
+            self.queue.append(order)
+            self._cond.notify()
+        return order
+
+    def pending(self) -> List[Order]:
+        with self._cond:
+            return list(self.queue)
+
+    # ------------------------------ execution ------------------------------
+    def run_pending(self) -> Optional[BatchReport]:
+        """Run everything queued now as one pipelined batch (blocking)."""
+        with self._cond:
+            batch = list(self.queue)
+            self.queue.clear()
+        if not batch:
+            return None
+        loaded: List[Tuple[Order, Scene]] = []
+        for order in batch:
+            try:
+                loaded.append((order, self.loader(order.scene)))
+            except Exception as exc:
+                self._reject(order, [str(exc)])
+        # Every order is checked up front (all tracks, in parallel); broken ones are dropped
+        tracks: Dict[str, PreparedTrack] = {}
+        if self.check_tracks:
+            tracks, compiled_orders, problems = check_scenes([sc for _o, sc in loaded])
+        else:
+            compiled_orders, problems = [], []
+            for _o, sc in loaded:
+                try:
+                    compiled_orders.append(compile_scene(sc, timing=self.timing))
+                    problems.append([])
+                except ValueError as exc:
+                    compiled_orders.append(None)
+                    problems.append([str(exc)])
+        scenes: List[Tuple[str, Scene]] = []
+        sequential = 0.0
+        for (order, sc), comp, own in zip(loaded, compiled_orders, problems):
+            if not own and not comp.tracks():
+                # nothing to cook – and no start/finish to measure it by
+                own = [f"{sc.name}: no tracks to play"]
+            if own:
+                self._reject(order, own)
+                continue
+            scenes.append((order.tag, sc))
+            sequential += comp.makespan
+        runnable = [o for o in batch if o.ok is None]
+        if not runnable:
+            return None
+        merged, owner = merge_orders(scenes, name=f"scene__pipeline_{runnable[0].tag}_{runnable[-1].tag}")
+        prepared: Optional[PreparedScene] = None
+        plans = None
+        if self.check_tracks:
+            try:
+                # reuses the tracks loaded for the per-order check above
+                prepared = preflight([merged], tracks=tracks)[0]
+            except PreflightError as exc:
+                # e.g. one dish does not end where the next one starts
+                for o in runnable:
+                    self._reject(o, exc.problems)
+                return None
+            compiled, plans = prepared.compiled, prepared.handles
+        else:
+            compiled = compile_scene(merged, timing=self.timing)
+        logging.info(
+            "[PIPELINE] %d orders: planned %.2fs (back-to-back %.2fs, saves %.0f%%)",
+            len(runnable),
+            compiled.makespan,
+            sequential,
+            100 * (1 - compiled.makespan / sequential) if sequential else 0.0,
+        )
+        extra = {"pause_active": self.pause_active} if self.pause_active is not None else {}
+        executor = SceneExecutor(self.proxies, stop_event=self.stop_event, **extra)
+        try:
+            report = executor.run(compiled, plans=plans)
+        finally:
+            if prepared is not None:
+                prepared.close()
+        self._account(runnable, compiled, owner, report)
+        self.history.extend(runnable)
+        for o in runnable:
+            logging.info(
+                "[PIPELINE] order %d %s: %s, latency %s",
+                o.id,
+                o.scene,
+                "done" if o.ok else "FAILED",
+                f"{o.latency_s:.2f}s" if o.latency_s is not None else "-",
+            )
+        return BatchReport(runnable, compiled.makespan, sequential, report)
+
+    def _reject(self, order: Order, problems: List[str]) -> None:
+        for problem in problems:
+            logging.error("[PIPELINE] order %d (%s) rejected: %s", order.id, order.scene, problem)
+        order.ok = False
+        self.history.append(order)
+
+    @staticmethod
+    def _account(
+        orders: List[Order],
+        compiled: CompiledScene,
+        owner: Dict[Tuple[str, int], str],
+        report: ExecutionReport,
+    ) -> None:
+        tracks: Dict[str, List[Tuple[str, int]]] = {}
+        for it in compiled.tracks():
+            tracks.setdefault(owner[(it.arm, it.index)], []).append((it.arm, it.index))
+        for o in orders:
+            keys = tracks.get(o.tag, [])
+            times = [report.track_times[k] for k in keys if k in report.track_times]
+            o.ok = len(times) == len(keys)
+            if times:
+                o.started = min(t[0] for t in times)
+                o.finished = max(t[1] for t in times) if o.ok else None
+
+    # ------------------------------ background runner ------------------------------
+    def start(self) -> None:
+        """Keep running batches in a background thread as orders arrive."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name="order-pipeline", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self.queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            try:
+                self.run_pending()
+            except Exception:  # noqa: BLE001 – keep serving the next orders
+                logging.exception("[PIPELINE] batch failed")
+            if self.stop_event.is_set():
+                with self._cond:
+                    dropped = len(self.queue)
+                    self.queue.clear()
+                logging.info("[PIPELINE] stop requested – %d queued order(s) dropped", dropped)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ------------------------------ statistics ------------------------------
+    def stats(self) -> Dict[str, Any]:
+        done = [o for o in self.history if o.ok]
+        latencies = [o.latency_s for o in done if o.latency_s is not None]
+        out: Dict[str, Any] = {
+            "done": len(done),
+            "failed": sum(1 for o in self.history if o.ok is False),
+            "queued": len(self.pending()),
+            "dishes_per_hour": None,
+            "latency_avg_s": sum(latencies) / len(latencies) if latencies else None,
+            "latency_max_s": max(latencies, default=None),
+        }
+        if done:
+            span = max(o.finished for o in done) - min(o.started for o in done)
+            out["dishes_per_hour"] = len(done) * 3600 / span if span > 0 else None
+        return out
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+"""Precompiled setpoint plans for timed (v3) tracks.
+
+``compile_plan`` turns a :class:`TrackV3Timed` into one contiguous int32
+``(N, 7)`` array of setpoints sampled on the playback grid (interpolation
+profile, speed factor and gripper tightening already applied). The real-time loop only indexes the array
+and sends – no interpolation arithmetic, no per-point list building.
+``resample_plan`` / ``move_plan`` build the same kind of plan for recorded
+tracks and single-point moves (see preflight.py); those are not cached.
+
+Plans are cached twice:
+    - in memory (process-wide LRU, like the track cache);
+    - on disk under ``tracks/.plans/<key>.npz``.
+The key is a hash of the track content, the speed factor, the rate and the
+gripper coefficient, so editing a track or changing its speed just yields a
+new key and stale plans are never reused.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from demo.V2.manage.track import TRACK_DIR, DEFAULT_PROFILE, TrackV3Timed
+
+PLAN_DIR = TRACK_DIR / ".plans"
+PLAN_CACHE_SIZE = 32
+PLAN_FORMAT = 2  # bump when the sampling rule changes – invalidates disk plans
+
+# Share of a segment spent accelerating (and the same decelerating) in the
+# trapezoidal profile; 0.25 → cruise over the middle half.
+TRAPEZOID_ACCEL_FRACTION = 0.25
+
+# Rows a segment may fall short of the next whole row and still count as it:
+# durations like 0.58 s give 28.999… rows at 50 Hz in floating point.
+GRID_TOLERANCE = 1e-6
+
+
+@dataclass
+class SetpointPlan:
+    """Setpoints of one timed track on a fixed-rate grid.
+
+    Attributes:
+        targets:        int32 (N, 7) – interpolated track points (what the
+                        visualiser hook sees).
+        setpoints:      int32 (N, 7) – what is actually sent (gripper tightened).
+        segment_starts: int32 (S,)   – row where segment *k* (target point k+1)
+                        begins; used only for progress logging.
+        hz:             playback rate the plan was sampled at.
+        key:            cache key.
+    """
+
+    targets: np.ndarray
+    setpoints: np.ndarray
+    segment_starts: np.ndarray
+    hz: float
+    key: str
+
+    def __len__(self) -> int:
+        return int(self.setpoints.shape[0])
+
+    @property
+    def duration(self) -> float:
+        return len(self) / self.hz
+
+
+# ------------------------------ compilation ------------------------------
+def plan_key(trk: TrackV3Timed, hz: float, speed_up: float, gripper_tight: float, profile: str) -> str:
+    h = hashlib.sha1()
+    h.update(trk.content_hash.encode())
+    h.update(f"|{PLAN_FORMAT}|{float(hz)!r}|{float(speed_up)!r}|{float(gripper_tight)!r}|{profile}".encode())
+    return h.hexdigest()
+
+
+# ---- normalised segment shapes s(τ), τ ∈ (0, 1] → s ∈ (0, 1] ----
+def _trapezoidal(tau: np.ndarray) -> np.ndarray:
+    a = TRAPEZOID_ACCEL_FRACTION
+    v = 1.0 / (1.0 - a)  # cruise velocity so that the area equals 1
+    return np.where(
+        tau < a,
+        v * tau * tau / (2 * a),
+        np.where(tau <= 1 - a, v * (tau - a / 2), 1 - v * (1 - tau) ** 2 / (2 * a)),
+    )
+
+
+def _min_jerk(tau: np.ndarray) -> np.ndarray:
+    return tau ** 3 * (10 - 15 * tau + 6 * tau * tau)
+
+
+_SEGMENT_SHAPES = {"trapezoidal": _trapezoidal, "min_jerk": _min_jerk}
+
+
+def spline_moments(pts: np.ndarray, h: np.ndarray) -> np.ndarray:
+    """Second derivatives of the clamped (v=0 at both ends) cubic spline."""
+    n = len(pts)
+    A = np.zeros((n, n))
+    rhs = np.zeros_like(pts)
+    slope = (pts[1:] - pts[:-1]) / h[:, None]
+    A[0, 0], A[0, 1] = 2 * h[0], h[0]
+    rhs[0] = 6 * slope[0]
+    for i in range(1, n - 1):
+        A[i, i - 1], A[i, i], A[i, i + 1] = h[i - 1], 2 * (h[i - 1] + h[i]), h[i]
+    rhs[1:-1] = 6 * (slope[1:] - slope[:-1])
+    A[-1, -2], A[-1, -1] = h[-1], 2 * h[-1]
+    rhs[-1] = -6 * slope[-1]
+    return np.linalg.solve(A, rhs)
+
+
+def _sample(trk: TrackV3Timed, hz: float, speed_up: float, profile: str = DEFAULT_PROFILE):
+    """Sample *trk* on the *hz* grid.
+
+    Segment *k* (from point k-1 to k) lasts ``duration[k] * (1 - speed_up)``
+    seconds and contributes ``max(1, floor(dur * hz))`` rows (with a small
+    tolerance, so 0.58 s at 50 Hz is 29 rows, not 28); row *s* of *n*
+    sits at τ = s / n of the segment. For ``linear`` the result is exactly
+    the former per-step loop: ``int(start + (end - start) / n * s)``.
+    """
+    pts = np.asarray(trk.points, dtype=np.float64).reshape(-1, 7)
+    durs = np.asarray(trk.durations, dtype=np.float64)[1:] * (1 - speed_up)
+    steps = np.maximum(1, np.floor(durs * hz + GRID_TOLERANCE).astype(np.int64))
+
+    seg = np.repeat(np.arange(len(steps)), steps)              # segment of each row
+    seg_starts = np.concatenate(([0], np.cumsum(steps)[:-1]))
+    step = (np.arange(int(steps.sum())) - seg_starts[seg] + 1).astype(np.float64)
+    start = pts[:-1][seg]
+    delta = (pts[1:] - pts[:-1])[seg]
+
+    if profile == "linear":
+        out = start + delta / steps[seg, None] * step[:, None]
+    elif profile in _SEGMENT_SHAPES:
+        tau = step / steps[seg]
+        out = start + delta * _SEGMENT_SHAPES[profile](tau)[:, None]
+    elif profile == "spline":
+        h = steps / hz                                  # actual segment time on the grid
+        M = spline_moments(pts, h)
+        hs = h[seg][:, None]
+        t = (step / hz)[:, None]                        # time into the segment
+        m0, m1 = M[:-1][seg], M[1:][seg]
+        y0, y1 = start, pts[1:][seg]
+        out = (
+            m0 * (hs - t) ** 3 / (6 * hs)
+            + m1 * t ** 3 / (6 * hs)
+            + (y0 / hs - m0 * hs / 6) * (hs - t)
+            + (y1 / hs - m1 * hs / 6) * t
+        )
+        # a spline overshoots between points – fine for joints, not for the
+        # gripper (it would squeeze harder than taught): blend it per segment
+        out[:, 6] = start[:, 6] + delta[:, 6] * _min_jerk(step / steps[seg])
+    else:
+        raise ValueError(f"Unknown interpolation profile '{profile}'")
+
+    return np.trunc(out).astype(np.int32), seg_starts.astype(np.int32)
+
+
+def compile_plan(
+    trk: TrackV3Timed,
+    hz: float = 50,
+    speed_up: Optional[float] = None,
+    gripper_tight: float = 0.0,
+    use_cache: bool = True,
+    profile: Optional[str] = None,
+) -> SetpointPlan:
+    """Return the setpoint plan of *trk* (from cache when possible).
+
+    *profile* overrides the interpolation stored in the track file.
+    """
+    if len(trk.points) < 2:
+        raise ValueError(f"Track '{trk.name}' has <2 points – nothing to compile")
+    speed = trk.speed_up if speed_up is None else speed_up
+    profile = profile or trk.profile
+    key = plan_key(trk, hz, speed, gripper_tight, profile)
+
+    if use_cache:
+        plan = _PLAN_CACHE.get(key)
+        if plan is not None:
+            return plan
+        plan = _load_plan(key, hz)
+        if plan is not None:
+            _PLAN_CACHE.put(plan)
+            return plan
+
+    targets, seg_starts = _sample(trk, hz, speed, profile)
+    plan = SetpointPlan(targets, _tighten(targets, gripper_tight), seg_starts, hz, key)
+
+    if use_cache:
+        _PLAN_CACHE.put(plan)
+        _save_plan(plan)
+    return plan
+
+
+def _tighten(targets: np.ndarray, gripper_tight: float) -> np.ndarray:
+    setpoints = targets.copy()
+    if gripper_tight > 0:
+        setpoints[:, 6] = np.trunc(targets[:, 6] * (1 - gripper_tight)).astype(np.int32)
+    return setpoints
+
+
+def resample_plan(
+    coordinates: np.ndarray,
+    timestamps: np.ndarray,
+    hz: float = 50,
+    gripper_tight: float = 0.0,
+    key: str = "",
+) -> SetpointPlan:
+    """Plan of a recorded (v1/v2/v4) track: its points linearly resampled on the *hz* grid.
+
+    ``_run_track`` sends the recorded points at their own timestamps; the
+    plan keeps that timing, so the track can be played from shared memory.
+    """
+    coords = np.asarray(coordinates, dtype=np.float64).reshape(-1, 7)
+    if len(coords) == 0:
+        raise ValueError("recorded track has no points")
+    ts = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+    ts = ts - ts[0]
+    grid = np.arange(0.0, ts[-1] + 0.5 / hz, 1.0 / hz) if ts[-1] > 0 else np.zeros(1)
+    targets = np.stack([np.interp(grid, ts, coords[:, j]) for j in range(7)], axis=1)
+    targets = np.trunc(targets).astype(np.int32)
+    return SetpointPlan(targets, _tighten(targets, gripper_tight), np.zeros(0, dtype=np.int32), hz, key)
+
+
+def move_plan(
+    start: Optional[np.ndarray],
+    target: np.ndarray,
+    hz: float = 50,
+    steps: int = 100,
+    gripper_tight: float = 0.0,
+    key: str = "",
+) -> SetpointPlan:
+    """Straight move from *start* to *target* in *steps* rows (as ``_move_smooth``).
+
+    Without *start* the plan is the single target row – the worker's
+    move-to-start before the first plan of a call brings the arm there.
+    """
+    target = np.asarray(target, dtype=np.float64).reshape(7)
+    if start is None:
+        targets = target.reshape(1, 7)
+    else:
+        targets = np.linspace(np.asarray(start, dtype=np.float64).reshape(7), target, steps + 1)[1:]
+    targets = np.trunc(targets).astype(np.int32)
+    return SetpointPlan(targets, _tighten(targets, gripper_tight), np.zeros(0, dtype=np.int32), hz, key)
+
+
+# ------------------------------ caches ------------------------------
+class PlanCache:
+    """Small thread-safe LRU of compiled plans keyed by plan key."""
+
+    def __init__(self, capacity: int = PLAN_CACHE_SIZE) -> None:
+        self.capacity = capacity
+        self._items: "OrderedDict[str, SetpointPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[SetpointPlan]:
+        with self._lock:
+            plan = self._items.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return plan
+
+    def put(self, plan: SetpointPlan) -> None:
+        with self._lock:
+            self._items[plan.key] = plan
+            self._items.move_to_end(plan.key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._items),
+                "capacity": self.capacity,
+            }
+
+
+_PLAN_CACHE = PlanCache()
+
+
+def _plan_path(key: str) -> Path:
+    return PLAN_DIR / f"{key}.npz"
+
+
+def _load_plan(key: str, hz: float) -> Optional[SetpointPlan]:
+    path = _plan_path(key)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as npz:
+            return SetpointPlan(npz["targets"], npz["setpoints"], npz["segment_starts"], hz, key)
+    except Exception:
+        logging.warning("[PLAN] Broken plan file %s – recompiling", path, exc_info=True)
+        return None
+
+
+def _save_plan(plan: SetpointPlan) -> None:
+    try:
+        PLAN_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = PLAN_DIR / f".{plan.key}.tmp.npz"
+        np.savez(tmp, targets=plan.targets, setpoints=plan.setpoints, segment_starts=plan.segment_starts)
+        tmp.replace(_plan_path(plan.key))
+    except OSError:
+        logging.warning("[PLAN] Could not store plan %s on disk", plan.key, exc_info=True)
+
+
+def plan_cache_stats() -> Dict[str, int]:
+    stats = _PLAN_CACHE.stats()
+    stats["on_disk"] = len(list(PLAN_DIR.glob("*.npz"))) if PLAN_DIR.exists() else 0
+    return stats
+
+
+def clear_plan_cache(disk: bool = False) -> None:
+    """Drop in-memory plans (and the on-disk ones if *disk*)."""
+    _PLAN_CACHE.clear()
+    if disk and PLAN_DIR.exists():
+        for p in PLAN_DIR.glob("*.npz"):
+            p.unlink(missing_ok=True)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+"""Per-track playback parameters (sidecar registry ``playback.json``).
+
+Replaces the hard-coded ``TrackV3Timed.speed_up`` name chain. The file maps a
+track name to its parameters; anything omitted falls back to the defaults::
+
+    {
+      "right__tomat": {"speed_up": 0.47},
+      "left__lopatka1": {"speed_up": 0.15, "profile": "min_jerk"},
+      "right__cheese": {"gripper_tight": 0.05, "start_tolerance": 5000}
+    }
+
+The registry is loaded once and indexed by name. It reloads itself when the
+file changes on disk (checked at most every ``RELOAD_INTERVAL`` seconds), so
+edits from another process or a text editor apply to the next play.
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Kept next to this module, not in tracks/, so that track globbing never sees it
+PLAYBACK_FILE = Path(__file__).parent / "playback.json"
+RELOAD_INTERVAL = 1.0  # seconds between mtime checks
+# speed_up cuts segment durations by this share at most; 1 would make them zero
+MAX_SPEED_UP = 0.9
+# gripper_tight closes the gripper setpoint by this share at most
+MAX_GRIPPER_TIGHT = 0.5
+
+# Interpolation between control points of a timed track (sampled in plan.py):
+#   linear      – constant velocity per segment (velocity steps at every point);
+#   trapezoidal – accelerate / cruise / decelerate, stop at every point;
+#   min_jerk    – 5th-order minimum-jerk blend, stop at every point;
+#   spline      – C2 cubic spline through all points, zero velocity at both ends.
+INTERPOLATION_PROFILES = ("linear", "trapezoidal", "min_jerk", "spline")
+
+
+@dataclass
+class PlaybackParams:
+    """Playback parameters of one track; ``None`` means "use the global default"."""
+
+    speed_up: float = 0.0                    # share of segment time cut: dur * (1 - speed_up)
+    profile: Optional[str] = None            # interpolation override (see INTERPOLATION_PROFILES)
+    gripper_tight: Optional[float] = None    # overrides GRIPPER_TIGHT_COEFFICEINT
+    start_tolerance: Optional[int] = None    # overrides TOLERANCE_ANGLE_UNITS for the start check
+
+    def __post_init__(self) -> None:
+        if not 0.0 <= self.speed_up <= MAX_SPEED_UP:
+            raise ValueError(f"speed_up must be within 0..{MAX_SPEED_UP:g}, got {self.speed_up:g}")
+        if self.profile is not None and self.profile not in INTERPOLATION_PROFILES:
+            raise ValueError(f"Unknown interpolation profile '{self.profile}'")
+        if self.gripper_tight is not None and not 0.0 <= self.gripper_tight <= MAX_GRIPPER_TIGHT:
+            raise ValueError(f"gripper_tight must be within 0..{MAX_GRIPPER_TIGHT:g}, got {self.gripper_tight:g}")
+
+    def to_json(self) -> Dict[str, Any]:
+        """Only the non-default fields (keeps the sidecar file short)."""
+        default = PlaybackParams()
+        return {k: v for k, v in asdict(self).items() if v != getattr(default, k)}
+
+
+_FIELDS = {f.name for f in fields(PlaybackParams)}
+_DEFAULT = PlaybackParams()
+
+
+class PlaybackRegistry:
+    """Name → PlaybackParams, loaded from *path* and reloaded on change."""
+
+    def __init__(self, path: Path = PLAYBACK_FILE) -> None:
+        self.path = path
+        self._params: Dict[str, PlaybackParams] = {}
+        self._sig: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    # ----------------------------- loading ----------------------------
+    def _signature(self) -> Optional[tuple]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload(self) -> None:
+        """Re-read the sidecar file (bad entries are logged and skipped)."""
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        sig = self._signature()
+        self._sig = sig
+        self._loaded = True
+        self._checked_at = time.monotonic()
+        params: Dict[str, PlaybackParams] = {}
+        if sig is not None:
+            try:
+                raw = json.loads(self.path.read_text())
+            except (OSError, ValueError) as exc:
+                # keep the previous table – a half-saved file must not reset speeds
+                logging.error("[PLAYBACK] Cannot read %s: %s", self.path, exc)
+                return
+            for name, entry in raw.items():
+                unknown = set(entry) - _FIELDS
+                if unknown:
+                    logging.warning("[PLAYBACK] %s: unknown keys %s ignored", name, sorted(unknown))
+                try:
+                    params[name] = PlaybackParams(**{k: v for k, v in entry.items() if k in _FIELDS})
+                except (TypeError, ValueError) as exc:
+                    logging.error("[PLAYBACK] %s: %s – entry ignored", name, exc)
+        self._params = params
+        self.reloads += 1
+        if self.reloads > 1:
+            logging.info("[PLAYBACK] Reloaded %s (%d tracks)", self.path.name, len(params))
+
+    def _maybe_reload(self) -> None:
+        if self._loaded and time.monotonic() - self._checked_at < RELOAD_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if not self._loaded or self._signature() != self._sig:
+                self._load_locked()
+
+    # ----------------------------- access -----------------------------
+    def get(self, name: str) -> PlaybackParams:
+        self._maybe_reload()
+        return self._params.get(name, _DEFAULT)
+
+    def update(self, name: str, **changes: Any) -> PlaybackParams:
+        """Change fields of *name* and persist the file; returns the new params."""
+        unknown = set(changes) - _FIELDS
+        if unknown:
+            raise KeyError(f"unknown playback parameter(s): {', '.join(sorted(unknown))}")
+        with self._lock:
+            if self._signature() != self._sig:
+                self._load_locked()
+            current = asdict(self._params.get(name, _DEFAULT))
+            current.update(changes)
+            new = PlaybackParams(**current)
+            self._params[name] = new
+            self._save_locked()
+        return new
+
+    def _save_locked(self) -> None:
+        payload = {n: p.to_json() for n, p in sorted(self._params.items()) if p.to_json()}
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
+        tmp.replace(self.path)
+        self._sig = self._signature()
+        self._checked_at = time.monotonic()
+
+    def items(self) -> Dict[str, PlaybackParams]:
+        self._maybe_reload()
+        return dict(self._params)
+
+
+PLAYBACK = PlaybackRegistry()
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+"""Pre-flight: load, compile and check every track of a scene before motion.
+
+Without it a scene discovers a missing, corrupt or mis-recorded track only
+when the arm gets to it, and the worker re-reads each file right before
+playing. ``preflight`` does all of that up front, for all queued scenes at
+once:
+
+    1. every distinct track is read and compiled to a ``SetpointPlan`` in a
+       thread pool (timed tracks – ``compile_plan``; recorded tracks –
+       resampled on the playback grid; 1-point tracks – a straight move from
+       where the arm's previous track ends);
+    2. per arm, the end of each track is checked against the start of the
+       next one (the worker would otherwise insert an unplanned move);
+    3. every plan is copied into shared memory (``SharedPlanBuffer``).
+
+All problems of all scenes are reported together (``PreflightError``);
+nothing moves unless every scene is ready. A ``PreparedScene`` is then run
+with ``SceneExecutor.run(prepared.compiled, plans=prepared.handles)``: the
+workers play straight from shared memory (``play_plan_handle``) and no track
+file is opened while the arms move.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from demo.V2.manage.plan import SetpointPlan, compile_plan, move_plan, resample_plan
+from demo.V2.manage.scene import Scene
+from demo.V2.manage.scene_compiler import SINGLE_POINT_MOVE_S, CompiledScene, compile_scene
+from demo.V2.manage.shared_plan import PlanHandle, SharedPlanBuffer
+
+PREFLIGHT_WORKERS = min(8, os.cpu_count() or 1)
+PLAY_PLAN_METHOD = "play_plan_handle"
+
+
+class PreflightError(ValueError):
+    """One or more scenes are not ready; ``problems`` lists every issue."""
+
+    def __init__(self, problems: List[str]) -> None:
+        super().__init__("pre-flight failed:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+@dataclass
+class PreparedTrack:
+    name: str
+    first: np.ndarray                 # first point (joints + gripper)
+    last: np.ndarray                  # last point
+    plan: Optional[SetpointPlan]      # None for 1-point tracks – built per use
+    start_tolerance: Optional[float] = None
+    gripper_tight: float = 0.0
+
+    @property
+    def single_point(self) -> bool:
+        return self.plan is None
+
+    @property
+    def duration(self) -> float:
+        return SINGLE_POINT_MOVE_S if self.plan is None else self.plan.duration
+
+
+@dataclass
+class PreparedScene:
+    compiled: CompiledScene
+    buffers: Dict[Tuple[str, int], SharedPlanBuffer] = field(default_factory=dict)
+
+    @property
+    def handles(self) -> Dict[Tuple[str, int], PlanHandle]:
+        """(arm, element index) → shared-memory plan of that track."""
+        return {key: buf.handle for key, buf in self.buffers.items()}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buf.nbytes for buf in self.buffers.values())
+
+    def close(self) -> None:
+        for buf in self.buffers.values():
+            buf.close()
+        self.buffers.clear()
+
+    def __enter__(self) -> "PreparedScene":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ------------------------------ tracks ------------------------------
+def prepare_track(name: str, hz: float = 50) -> PreparedTrack:
+    """Read and compile one track (raises on a missing or broken file)."""
+    from demo.V2.manage.terminal_v2 import GRIPPER_TIGHT_COEFFICEINT, PiperTerminal  # local import to avoid cycles
+    from demo.V2.manage.track import TrackBase, TrackV3Timed
+
+    trk = TrackBase.read_track(name)
+    if isinstance(trk, TrackV3Timed):
+        pts = np.asarray(trk.points, dtype=np.int32).reshape(-1, 7)
+        if len(pts) == 0:
+            raise ValueError("track has no points")
+        tight = PiperTerminal._gripper_tight(trk)
+        plan = compile_plan(trk, hz=hz, gripper_tight=tight) if len(pts) > 1 else None
+        return PreparedTrack(name, pts[0], pts[-1], plan, trk.playback.start_tolerance, tight)
+    arrays = trk.arrays
+    if len(arrays) == 0:
+        raise ValueError("track has no points")
+    plan = resample_plan(arrays.coordinates, arrays.timestamps, hz, GRIPPER_TIGHT_COEFFICEINT, key=f"rec:{name}")
+    return PreparedTrack(name, arrays.coordinates[0], arrays.coordinates[-1], plan, None, GRIPPER_TIGHT_COEFFICEINT)
+
+
+def prepare_tracks(
+    names: List[str],
+    hz: float = 50,
+    max_workers: int = PREFLIGHT_WORKERS,
+    loader: Callable[[str, float], PreparedTrack] = prepare_track,
+) -> Tuple[Dict[str, PreparedTrack], Dict[str, str]]:
+    """Prepare distinct *names* in parallel; returns (tracks, {name: error})."""
+    names = list(dict.fromkeys(names))
+    prepared: Dict[str, PreparedTrack] = {}
+    problems: Dict[str, str] = {}
+    if not names:
+        return prepared, problems
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(names))), thread_name_prefix="preflight") as pool:
+        futures = {name: pool.submit(loader, name, hz) for name in names}
+        for name, fut in futures.items():
+            try:
+                prepared[name] = fut.result()
+            except Exception as exc:  # noqa: BLE001 – collected, reported together
+                problems[name] = str(exc) or type(exc).__name__
+    return prepared, problems
+
+
+# ------------------------------ scenes ------------------------------
+def _is_close(a: np.ndarray, b: np.ndarray, tol: Optional[float]) -> bool:
+    from demo.V2.manage.terminal_v2 import TOLERANCE_ANGLE_UNITS, PiperTerminal  # local import to avoid cycles
+
+    return PiperTerminal._is_close_ignored(
+        [int(v) for v in a], [int(v) for v in b], tol=TOLERANCE_ANGLE_UNITS if tol is None else tol
+    )
+
+
+def check_continuity(
+    scene: Scene,
+    tracks: Dict[str, PreparedTrack],
+    is_close: Callable[[np.ndarray, np.ndarray, Optional[float]], bool] = _is_close,
+) -> List[str]:
+    """Per arm: the end of each track must be where the next track starts.
+
+    1-point tracks are moves to a pose and may start anywhere.
+    """
+    problems: List[str] = []
+    for arm, seq in scene.arms.items():
+        prev: Optional[PreparedTrack] = None
+        for idx, el in enumerate(seq):
+            if el.type != "track" or el.name not in tracks:
+                continue
+            cur = tracks[el.name]
+            if prev is not None and not cur.single_point and not is_close(prev.last, cur.first, cur.start_tolerance):
+                delta = int(np.max(np.abs(prev.last[:6].astype(np.int64) - cur.first[:6])))
+                problems.append(
+                    f"{scene.name}: {arm}[{idx}] '{cur.name}' starts {delta / 1000:.1f}° away from "
+                    f"where '{prev.name}' ends"
+                )
+            prev = cur
+    return problems
+
+
+def _plans_for(
+    scene: Scene, tracks: Dict[str, PreparedTrack], hz: float
+) -> Dict[Tuple[str, int], Tuple[str, SetpointPlan]]:
+    plans: Dict[Tuple[str, int], Tuple[str, SetpointPlan]] = {}
+    for arm, seq in scene.arms.items():
+        last: Optional[np.ndarray] = None
+        for idx, el in enumerate(seq):
+            if el.type != "track":
+                continue
+            trk = tracks[el.name]
+            plan = trk.plan
+            if plan is None:
+                plan = move_plan(last, trk.last, hz, gripper_tight=trk.gripper_tight, key=f"move:{trk.name}")
+            plans[(arm, idx)] = (trk.name, plan)
+            last = trk.last
+    return plans
+
+
+def _track_names(scene: Scene) -> List[str]:
+    return [el.name for seq in scene.arms.values() for el in seq if el.type == "track" and el.name]
+
+
+def check_scenes(
+    scenes: List[Scene],
+    hz: float = 50,
+    max_workers: int = PREFLIGHT_WORKERS,
+    loader: Callable[[str, float], PreparedTrack] = prepare_track,
+    is_close: Callable[[np.ndarray, np.ndarray, Optional[float]], bool] = _is_close,
+    tracks: Optional[Dict[str, PreparedTrack]] = None,
+) -> Tuple[Dict[str, PreparedTrack], List[Optional[CompiledScene]], List[List[str]]]:
+    """Load every track of *scenes* in parallel and check each scene.
+
+    Returns the prepared tracks and, per scene, its compiled schedule (None
+    if it does not compile) and its problems – so a caller can reject just
+    the broken scenes. Tracks already in *tracks* (from an earlier call)
+    are not loaded again.
+    """
+    known = dict(tracks or {})
+    names = [n for sc in scenes for n in _track_names(sc) if n not in known]
+    fresh, failed = prepare_tracks(names, hz, max_workers, loader)
+    tracks = {**known, **fresh}
+    compiled: List[Optional[CompiledScene]] = []
+    problems: List[List[str]] = []
+    for sc in scenes:
+        own = [f"{sc.name}: track '{n}': {failed[n]}" for n in dict.fromkeys(_track_names(sc)) if n in failed]
+        own.extend(check_continuity(sc, tracks, is_close))
+        # tracks that failed to load are already reported above
+        timing = lambda n, _hz: (tracks[n].duration if n in tracks else 0.0, PLAY_PLAN_METHOD)  # noqa: E731
+        try:
+            compiled.append(compile_scene(sc, hz, timing=timing))
+        except ValueError as exc:
+            compiled.append(None)
+            own.append(str(exc))
+        problems.append(own)
+    return tracks, compiled, problems
+
+
+def preflight(
+    scenes: List[Scene],
+    hz: float = 50,
+    max_workers: int = PREFLIGHT_WORKERS,
+    loader: Callable[[str, float], PreparedTrack] = prepare_track,
+    is_close: Callable[[np.ndarray, np.ndarray, Optional[float]], bool] = _is_close,
+    tracks: Optional[Dict[str, PreparedTrack]] = None,
+) -> List[PreparedScene]:
+    """Make *scenes* ready to run; raises ``PreflightError`` listing every problem.
+
+    *tracks* – already prepared tracks (see ``check_scenes``) to reuse.
+    """
+    t0 = time.perf_counter()
+    tracks, compiled, problems = check_scenes(scenes, hz, max_workers, loader, is_close, tracks)
+    t_check = time.perf_counter() - t0
+    all_problems = [p for own in problems for p in own]
+    if all_problems:
+        raise PreflightError(all_problems)
+
+    prepared: List[PreparedScene] = []
+    try:
+        for sc, comp in zip(scenes, compiled):
+            ps = PreparedScene(comp)
+            prepared.append(ps)
+            for key, (label, plan) in _plans_for(sc, tracks, hz).items():
+                ps.buffers[key] = SharedPlanBuffer(plan, label)
+    except Exception:
+        for ps in prepared:
+            ps.close()
+        raise
+    logging.info(
+        "[PREFLIGHT] %d scene(s), %d tracks ready in %.0f ms (load+check %.0f ms, %.1f MB shared)",
+        len(scenes),
+        len(tracks),
+        (time.perf_counter() - t0) * 1000,
+        t_check * 1000,
+        sum(ps.nbytes for ps in prepared) / 1e6,
+    )
+    return prepared
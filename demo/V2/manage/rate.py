@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+"""Drift-free fixed-rate scheduler for control / recording loops.
+
+Replaces the ``send(); time.sleep(period)`` pattern, where send latency adds
+up and a 10 s segment runs noticeably longer than 10 s. Deadlines are
+absolute (``start + k * period`` on ``time.perf_counter_ns``); the scheduler
+sleeps coarsely and spins only for the final stretch, so timing is precise
+while CPU use stays low.
+
+Usage::
+
+    sched = RateScheduler(50)
+    for pt in points:
+        send(pt)
+        sched.wait()          # sleeps until the next tick of the 50 Hz grid
+    sched.log_summary("[PLAY]")
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Overrun policies
+SKIP = "skip"          # drop missed ticks, continue on the grid after *now*
+CATCH_UP = "catch_up"  # keep every deadline, run late ticks back-to-back
+
+# Final stretch before a deadline that is busy-waited instead of slept.
+DEFAULT_SPIN_NS = 500_000  # 0.5 ms
+
+# Upper edges (µs) of the lateness histogram buckets; last bucket is open-ended.
+JITTER_BUCKETS_US = (50, 100, 250, 500, 1000, 2000, 5000, 10000)
+
+
+def sleep_until(deadline_s: float, spin_ns: int = DEFAULT_SPIN_NS) -> float:
+    """Sleep until ``time.monotonic() >= deadline_s``; returns lateness in seconds.
+
+    ``time.monotonic`` is CLOCK_MONOTONIC on Linux – the same clock in every
+    process of the host, so deadlines can be shared between arm workers.
+    """
+    remaining_ns = int((deadline_s - time.monotonic()) * 1e9)
+    if remaining_ns > spin_ns:
+        time.sleep((remaining_ns - spin_ns) / 1e9)
+    now = time.monotonic()
+    while now < deadline_s:
+        now = time.monotonic()
+    return now - deadline_s
+
+
+class RateScheduler:
+    """Absolute-deadline ticker with overrun policy and jitter histogram."""
+
+    def __init__(
+        self,
+        hz: float,
+        policy: str = SKIP,
+        spin_ns: int = DEFAULT_SPIN_NS,
+    ) -> None:
+        if hz <= 0:
+            raise ValueError("hz must be positive")
+        if policy not in (SKIP, CATCH_UP):
+            raise ValueError(f"policy must be '{SKIP}' or '{CATCH_UP}'")
+        self.hz = hz
+        self.period_ns = int(round(1e9 / hz))
+        self.policy = policy
+        self.spin_ns = spin_ns
+        self.ticks = 0
+        self.missed = 0          # ticks where wait() was entered after its deadline
+        self.overruns = 0        # ticks where we woke up after the *next* deadline
+        self.skipped = 0         # ticks dropped by SKIP policy
+        self.max_late_ns = 0
+        self.last_late_ns = 0    # lateness of the most recent tick (live state)
+        self.speed = 1.0
+        self._hist: List[int] = [0] * (len(JITTER_BUCKETS_US) + 1)
+        self.reset()
+
+    # ------------------------------------------------------------------ clock
+    def reset(self) -> None:
+        """Re-anchor the grid at *now* (e.g. after a pause)."""
+        self._start_ns = time.perf_counter_ns()
+        self._next_ns = self._start_ns + self.period_ns
+        # track time (for wait_until) = _anchor_track_s + (now - _anchor_ns) * speed
+        self._anchor_ns = self._start_ns
+        self._anchor_track_s = 0.0
+
+    def shift(self, delta_s: float) -> None:
+        """Move the whole grid *delta_s* seconds later (time spent paused)."""
+        delta_ns = int(delta_s * 1e9)
+        self._start_ns += delta_ns
+        self._next_ns += delta_ns
+        self._anchor_ns += delta_ns
+
+    def set_speed(self, speed: float) -> None:
+        """Run the track *speed* times faster (<1 – slower) from the next tick on.
+
+        ``wait()`` shortens the period; ``wait_until()`` re-anchors its track
+        clock at the current position, so there is no jump either way.
+        """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        if speed == self.speed:
+            return
+        now = time.perf_counter_ns()
+        self._anchor_track_s += (now - self._anchor_ns) / 1e9 * self.speed
+        self._anchor_ns = now
+        new_period = int(round(1e9 / (self.hz * speed)))
+        self._next_ns += new_period - self.period_ns
+        self.period_ns = new_period
+        self.speed = speed
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the last reset."""
+        return (time.perf_counter_ns() - self._start_ns) / 1e9
+
+    # ------------------------------------------------------------------ waits
+    def _sleep_until(self, deadline_ns: int) -> int:
+        remaining = deadline_ns - time.perf_counter_ns()
+        if remaining > self.spin_ns:
+            time.sleep((remaining - self.spin_ns) / 1e9)
+        now = time.perf_counter_ns()
+        while now < deadline_ns:
+            now = time.perf_counter_ns()
+        return now
+
+    def _record(self, late_ns: int) -> None:
+        self.ticks += 1
+        self.last_late_ns = late_ns
+        if late_ns > self.max_late_ns:
+            self.max_late_ns = late_ns
+        late_us = late_ns / 1000
+        for idx, edge in enumerate(JITTER_BUCKETS_US):
+            if late_us <= edge:
+                self._hist[idx] += 1
+                return
+        self._hist[-1] += 1
+
+    def wait(self) -> None:
+        """Block until the next tick of the grid."""
+        deadline = self._next_ns
+        now = time.perf_counter_ns()
+        if now < deadline:
+            now = self._sleep_until(deadline)
+        else:
+            self.missed += 1
+        self._record(now - deadline)
+        self._next_ns = deadline + self.period_ns
+        if now >= self._next_ns:
+            # overrun: at least one whole period lost
+            self.overruns += 1
+            if self.policy == SKIP:
+                missed = (now - deadline) // self.period_ns
+                self.skipped += int(missed)
+                self._next_ns = deadline + (missed + 1) * self.period_ns
+
+    def wait_until(self, offset_s: float, abort: Optional[threading.Event] = None) -> bool:
+        """Block until *offset_s* seconds of track time after the last reset (time-stamped playback).
+
+        Recorded tracks can have gaps of several seconds between samples;
+        with *abort* the coarse part of the sleep ends as soon as the event
+        is set. Returns False in that case (nothing is recorded), else True.
+        """
+        deadline = self._anchor_ns + int((offset_s - self._anchor_track_s) / self.speed * 1e9)
+        now = time.perf_counter_ns()
+        if abort is not None and deadline - now > self.spin_ns:
+            if abort.wait((deadline - now - self.spin_ns) / 1e9):
+                return False
+            now = time.perf_counter_ns()
+        if now < deadline:
+            now = self._sleep_until(deadline)
+        else:
+            self.missed += 1
+        self._record(max(0, now - deadline))
+        return True
+
+    # ------------------------------------------------------------------ stats
+    def histogram(self) -> Dict[str, int]:
+        labels = [f"<={edge}us" for edge in JITTER_BUCKETS_US] + [f">{JITTER_BUCKETS_US[-1]}us"]
+        return dict(zip(labels, self._hist))
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "hz": self.hz,
+            "ticks": self.ticks,
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "max_late_ms": round(self.max_late_ns / 1e6, 3),
+            "elapsed_s": round(self.elapsed, 3),
+            "jitter_hist": self.histogram(),
+        }
+
+    def log_summary(self, tag: str, level: int = logging.INFO, expected_s: Optional[float] = None) -> None:
+        hist = " ".join(f"{k}:{v}" for k, v in self.histogram().items() if v)
+        msg = (
+            f"{tag} {self.ticks} ticks @ {self.hz:g} Hz in {self.elapsed:.3f}s"
+            + (f" (planned {expected_s:.3f}s)" if expected_s is not None else "")
+            + f", missed={self.missed}, overruns={self.overruns}, skipped={self.skipped}, "
+            f"max late={self.max_late_ns / 1e6:.3f} ms | jitter {hist}"
+        )
+        logging.log(level, msg)
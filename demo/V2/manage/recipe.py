@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+"""Recipes: cooking steps as a dependency graph, scheduled onto the arms.
+
+A scene fixes which arm does what and in which order. A *recipe* only says
+what has to happen before what; the scheduler picks the arm and the order.
+Saved in JSON under manage/recipes/::
+
+    {"version": "recipe_v1",
+     "tasks": [
+        {"id": "open_door", "tracks": {"right": "right__open_door"}},
+        {"id": "take_pan",  "track": "take_pan", "arms": ["left", "right"]},
+        {"id": "insert",    "tracks": {"left": "left__insert_pan"},
+         "after": ["open_door", "take_pan"]}
+     ]}
+
+``tracks`` maps every arm allowed to do the task to its track;
+``track`` + ``arms`` is the shorthand for ``<arm>__<track>`` on each arm.
+Durations come from the tracks themselves (``scene_compiler.track_timing``)
+plus the setup of each play call; the move to the start point before an
+arm's first track is added when the scene is compiled.
+
+``schedule_recipe`` is list scheduling on the upward rank (the longest
+remaining path to the end of the recipe): among the ready tasks the one with
+the highest rank goes first, onto the allowed arm where it finishes
+earliest (an idle gap between two tasks of that arm counts).
+``ScheduledRecipe.to_scene`` turns the result into an ordinary scene –
+tracks in the chosen order, ``signal``/``wait`` where a task depends on
+another arm – and ``critical_path`` lists the tasks that determine the
+makespan: shortening any of them shortens the recipe.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from demo.V2.manage.scene import Scene, SceneElement
+
+BASE_DIR = Path(__file__).parent  # manage/
+RECIPE_DIR = BASE_DIR / "recipes"  # created on first save
+
+
+@dataclass
+class RecipeTask:
+    id: str
+    tracks: Dict[str, str]  # allowed arm → track playing the task on that arm
+    after: List[str] = field(default_factory=list)
+
+    def to_json(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"id": self.id, "tracks": dict(self.tracks)}
+        if self.after:
+            out["after"] = list(self.after)
+        return out
+
+    @classmethod
+    def from_json(cls, obj: Dict[str, Any]) -> "RecipeTask":
+        tid = obj.get("id")
+        if not tid:
+            raise ValueError("task without id")
+        tracks = dict(obj.get("tracks") or {})
+        if obj.get("track"):
+            for arm in obj.get("arms") or []:
+                tracks.setdefault(arm, f"{arm}__{obj['track']}")
+        if not tracks:
+            raise ValueError(f"task '{tid}' has no tracks")
+        return cls(id=str(tid), tracks=tracks, after=[str(d) for d in obj.get("after", [])])
+
+
+@dataclass
+class Recipe:
+    name: str  # recipe__xxx
+    tasks: List[RecipeTask] = field(default_factory=list)
+    version: str = "recipe_v1"
+
+    def __post_init__(self) -> None:
+        ids = [t.id for t in self.tasks]
+        dup = {i for i in ids if ids.count(i) > 1}
+        if dup:
+            raise ValueError(f"{self.name}: duplicate task id(s) {', '.join(sorted(dup))}")
+        for t in self.tasks:
+            unknown = [d for d in t.after if d not in ids]
+            if unknown:
+                raise ValueError(f"{self.name}: task '{t.id}' depends on unknown {', '.join(unknown)}")
+        self.topo_order()  # rejects cycles
+
+    # ---------------- files ----------------
+    @property
+    def path(self) -> Path:
+        return RECIPE_DIR / f"{self.name}.json"
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"version": self.version, "tasks": [t.to_json() for t in self.tasks]}
+
+    def save(self):
+        RECIPE_DIR.mkdir(exist_ok=True)
+        self.path.write_text(json.dumps(self.to_json(), indent=2))
+
+    @classmethod
+    def load(cls, name: str) -> "Recipe":
+        obj = json.loads((RECIPE_DIR / f"{name}.json").read_text())
+        tasks = [RecipeTask.from_json(t) for t in obj.get("tasks", [])]
+        return cls(name=name, tasks=tasks, version=obj.get("version", "recipe_v1"))
+
+    # ---------------- graph ----------------
+    def task(self, tid: str) -> RecipeTask:
+        return next(t for t in self.tasks if t.id == tid)
+
+    def successors(self) -> Dict[str, List[str]]:
+        out: Dict[str, List[str]] = {t.id: [] for t in self.tasks}
+        for t in self.tasks:
+            for dep in t.after:
+                out[dep].append(t.id)
+        return out
+
+    def topo_order(self) -> List[str]:
+        """Task ids, dependencies first (file order among independent tasks)."""
+        done: List[str] = []
+        pending = list(self.tasks)
+        while pending:
+            ready = [t for t in pending if all(d in done for d in t.after)]
+            if not ready:
+                raise ValueError(f"{self.name}: dependency cycle among {', '.join(t.id for t in pending)}")
+            done.extend(t.id for t in ready)
+            pending = [t for t in pending if t.id not in done]
+        return done
+
+
+# ------------------------------ scheduling ------------------------------
+@dataclass
+class TaskSlot:
+    task: str
+    arm: str
+    track: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class ScheduledRecipe:
+    recipe: Recipe
+    slots: Dict[str, TaskSlot]  # task id → assignment
+
+    @property
+    def makespan(self) -> float:
+        return max((s.end for s in self.slots.values()), default=0.0)
+
+    def by_arm(self) -> Dict[str, List[TaskSlot]]:
+        out: Dict[str, List[TaskSlot]] = {}
+        for s in sorted(self.slots.values(), key=lambda s: (s.start, s.end)):
+            out.setdefault(s.arm, []).append(s)
+        return out
+
+    def critical_path(self) -> List[TaskSlot]:
+        """Chain of slots, each starting right when the one before it ends.
+
+        A task waits either for a dependency or for the previous task on its
+        arm; following whichever of them ends last back from the final task
+        gives the tasks whose durations add up to the makespan.
+        """
+        if not self.slots:
+            return []
+        prev_on_arm: Dict[str, Optional[TaskSlot]] = {}
+        for seq in self.by_arm().values():
+            for before, slot in zip([None, *seq], seq):
+                prev_on_arm[slot.task] = before
+        cur = max(self.slots.values(), key=lambda s: s.end)
+        path = [cur]
+        while True:
+            blockers = [self.slots[d] for d in self.recipe.task(cur.task).after]
+            if prev_on_arm[cur.task] is not None:
+                blockers.append(prev_on_arm[cur.task])
+            if not blockers:
+                break
+            cur = max(blockers, key=lambda s: s.end)
+            path.append(cur)
+        return path[::-1]
+
+    def to_scene(self, name: str) -> Scene:
+        """Executable scene: per-arm track order plus cross-arm handoffs."""
+        arms: Dict[str, List[SceneElement]] = {}
+        by_arm = self.by_arm()
+        signalled = {
+            dep
+            for slot in self.slots.values()
+            for dep in self.recipe.task(slot.task).after
+            if self.slots[dep].arm != slot.arm
+        }
+        for arm, seq in by_arm.items():
+            out: List[SceneElement] = []
+            for slot in seq:
+                for dep in self.recipe.task(slot.task).after:
+                    if self.slots[dep].arm != arm:
+                        out.append(SceneElement(type="wait", event=dep))
+                out.append(SceneElement(type="track", name=slot.track))
+                if slot.task in signalled:
+                    out.append(SceneElement(type="signal", event=slot.task))
+            arms[arm] = out
+        return Scene(name=name, arms=arms)
+
+
+def schedule_recipe(
+    recipe: Recipe,
+    hz: float = 50,
+    timing: Optional[Callable[[str, float], Any]] = None,
+    arms: Optional[List[str]] = None,
+) -> ScheduledRecipe:
+    """Assign every task to an arm and a start time (list scheduling).
+
+    *arms* restricts the arms that may be used (e.g. the registry); a task
+    none of whose arms is available raises ValueError, as does a track whose
+    duration cannot be determined.
+    """
+    from demo.V2.manage.scene_compiler import play_overhead, track_timing  # local import to avoid cycles
+
+    timing = timing or track_timing
+    dur: Dict[str, Dict[str, float]] = {}
+    for t in recipe.tasks:
+        options = {arm: trk for arm, trk in t.tracks.items() if arms is None or arm in arms}
+        if not options:
+            raise ValueError(f"{recipe.name}: no available arm for task '{t.id}' ({', '.join(t.tracks)})")
+        dur[t.id] = {}
+        for arm, trk in options.items():
+            try:
+                seconds, method = timing(trk, hz)
+                dur[t.id][arm] = float(seconds) + play_overhead(method, first=False)
+            except Exception as exc:
+                raise ValueError(f"{recipe.name}: task '{t.id}' track '{trk}': {exc}") from exc
+
+    # upward rank: fastest way from the task's start to the end of the recipe
+    succ = recipe.successors()
+    rank: Dict[str, float] = {}
+    for tid in reversed(recipe.topo_order()):
+        rank[tid] = min(dur[tid].values()) + max((rank[s] for s in succ[tid]), default=0.0)
+
+    order = {t.id: i for i, t in enumerate(recipe.tasks)}
+    busy: Dict[str, List[TaskSlot]] = {}  # per arm, sorted by start
+    slots: Dict[str, TaskSlot] = {}
+    while len(slots) < len(recipe.tasks):
+        ready = [t for t in recipe.tasks if t.id not in slots and all(d in slots for d in t.after)]
+        t = max(ready, key=lambda t: (rank[t.id], -order[t.id]))
+        deps_done = max((slots[d].end for d in t.after), default=0.0)
+        best: Optional[TaskSlot] = None
+        for arm, d in dur[t.id].items():
+            # earliest idle gap of the arm after the dependencies that fits the task
+            start = deps_done
+            for other in busy.get(arm, []):
+                if start + d <= other.start + 1e-9:
+                    break
+                start = max(start, other.end)
+            if best is None or start + d < best.end - 1e-9:
+                best = TaskSlot(t.id, arm, t.tracks[arm], start, start + d)
+        slots[t.id] = best
+        busy.setdefault(best.arm, []).append(best)
+        busy[best.arm].sort(key=lambda s: s.start)
+    return ScheduledRecipe(recipe, slots)
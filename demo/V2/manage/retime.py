@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+"""Time-optimal retiming of timed (v3) tracks under per-joint limits.
+
+The geometric path of a timed track (its control points) is kept; only the
+segment durations are recomputed as the shortest ones for which the chosen
+interpolation profile (see ``plan.py``) stays within the per-joint velocity
+and acceleration limits.
+
+Limits are in SDK units per second: 0.001° (joints) / 0.001 mm (gripper).
+They come from ``joint_limits.json`` next to this module, written by
+``read_limits_from_arm`` – the same controller parameters the
+``read_arm_motor_max_angle_spd.py`` / ``read_arm_motor_max_acc_limit.py``
+demos query – and fall back to conservative datasheet values.
+"""
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from demo.V2.manage.plan import TRAPEZOID_ACCEL_FRACTION, spline_moments
+from demo.V2.manage.track import INTERPOLATION_PROFILES, TrackV3Timed
+
+LIMITS_FILE = Path(__file__).parent / "joint_limits.json"
+
+# Datasheet joint speeds (°/s) and a conservative acceleration; gripper in mm.
+DEFAULT_MAX_VEL = [180_000, 195_000, 180_000, 225_000, 225_000, 225_000, 50_000]
+DEFAULT_MAX_ACC = [300_000, 300_000, 300_000, 400_000, 400_000, 400_000, 200_000]
+
+# Fraction of the limits a retimed track is allowed to use.
+DEFAULT_LIMIT_SCALE = 0.8
+
+# Peak |velocity| and |acceleration| of a rest-to-rest segment of length d and
+# duration T are ``kv * d / T`` and ``ka * d / T**2`` for each profile shape.
+_TRAP_A = TRAPEZOID_ACCEL_FRACTION
+_PROFILE_PEAKS = {
+    "trapezoidal": (1.0 / (1.0 - _TRAP_A), 1.0 / (_TRAP_A * (1.0 - _TRAP_A))),
+    "min_jerk": (1.875, 10.0 / math.sqrt(3.0)),
+}
+
+# Linear segments change velocity in steps at every point (unbounded
+# acceleration), so they cannot be retimed under an acceleration limit: a
+# linear track is retimed – and its ``_rt`` copy stored – with this profile.
+LINEAR_RETIME_PROFILE = "trapezoidal"
+
+# Segments where no axis moves more than this are dwells (waiting for a pour,
+# steeping …) – their duration is intentional and kept as is.
+DWELL_TOLERANCE = 100  # 0.1°
+
+SPLINE_ITERATIONS = 30
+SPLINE_SAMPLES_PER_SEGMENT = 32
+
+
+@dataclass
+class JointLimits:
+    """Per-axis (6 joints + gripper) velocity / acceleration limits."""
+
+    max_vel: List[float] = field(default_factory=lambda: list(DEFAULT_MAX_VEL))
+    max_acc: List[float] = field(default_factory=lambda: list(DEFAULT_MAX_ACC))
+    source: str = "default"
+
+    def scaled(self, k: float) -> "JointLimits":
+        return JointLimits([v * k for v in self.max_vel], [a * k for a in self.max_acc], f"{self.source}×{k:g}")
+
+    # ----------------------------- persistence ------------------------
+    @classmethod
+    def load(cls, path: Path = LIMITS_FILE) -> "JointLimits":
+        if not path.exists():
+            return cls()
+        obj = json.loads(path.read_text())
+        return cls(list(obj["max_vel"]), list(obj["max_acc"]), obj.get("source", str(path.name)))
+
+    def save(self, path: Path = LIMITS_FILE) -> None:
+        path.write_text(json.dumps({"max_vel": self.max_vel, "max_acc": self.max_acc, "source": self.source}, indent=2))
+
+
+def _motor(items: Sequence, joint: int):
+    # SDK keeps motors 1..6 either 1-based (index 0 unused) or 0-based
+    return items[joint] if len(items) > 6 else items[joint - 1]
+
+
+def read_limits_from_arm(arm, settle: float = 0.1) -> JointLimits:
+    """Query max joint speed / acceleration from the controller.
+
+    SDK units: ``max_joint_spd`` 0.001 rad/s, ``max_joint_acc`` 0.01 rad/s².
+    The gripper has no such parameters and keeps the default.
+    """
+    arm.SearchAllMotorMaxAngleSpd()
+    arm.SearchAllMotorMaxAccLimit()
+    time.sleep(settle)
+    spd = arm.GetAllMotorAngleLimitMaxSpd().all_motor_angle_limit_max_spd.motor
+    acc = arm.GetAllMotorMaxAccLimit().all_motor_max_acc_limit.motor
+    rad_to_deg001 = 180_000.0 / math.pi
+    max_vel = [_motor(spd, j).max_joint_spd * 0.001 * rad_to_deg001 for j in range(1, 7)]
+    max_acc = [_motor(acc, j).max_joint_acc * 0.01 * rad_to_deg001 for j in range(1, 7)]
+    if not all(max_vel) or not all(max_acc):
+        raise RuntimeError("controller reported zero limits – no feedback yet?")
+    return JointLimits(max_vel + [DEFAULT_MAX_VEL[6]], max_acc + [DEFAULT_MAX_ACC[6]], "arm")
+
+
+# ------------------------------ retiming ------------------------------
+@dataclass
+class RetimeResult:
+    name: str
+    profile: str
+    points: List[List[int]]
+    durations: List[float]            # new durations, durations[0] == 0
+    original: List[float]             # effective original durations (speed_up applied)
+    violations: List[int]             # segments whose original timing exceeds the limits
+
+    @property
+    def original_total(self) -> float:
+        return float(sum(self.original[1:]))
+
+    @property
+    def total(self) -> float:
+        return float(sum(self.durations[1:]))
+
+    @property
+    def saved(self) -> float:
+        return self.original_total - self.total
+
+    def summary(self) -> str:
+        pct = 100.0 * self.saved / self.original_total if self.original_total else 0.0
+        out = (
+            f"{self.name}: {self.original_total:.2f}s → {self.total:.2f}s "
+            f"({-self.saved:+.2f}s, {-pct:+.1f}%), profile={self.profile}"
+        )
+        if self.violations:
+            out += f", original exceeds limits in {len(self.violations)} segment(s)"
+        return out
+
+
+def _segment_min_times(delta: np.ndarray, limits: JointLimits, profile: str) -> np.ndarray:
+    kv, ka = _PROFILE_PEAKS[profile]
+    d = np.abs(delta)
+    vel = np.asarray(limits.max_vel, dtype=np.float64)
+    acc = np.asarray(limits.max_acc, dtype=np.float64)
+    t_vel = kv * d / vel
+    t_acc = np.sqrt(ka * d / acc)
+    return np.maximum(t_vel, t_acc).max(axis=1)
+
+
+def _spline_peaks(pts: np.ndarray, h: np.ndarray):
+    """Per-segment peak |v| and |a| of the clamped spline, shape (S, axes)."""
+    M = spline_moments(pts, h)
+    u = np.linspace(0.0, 1.0, SPLINE_SAMPLES_PER_SEGMENT)[None, :, None]
+    hs = h[:, None, None]
+    t = u * hs
+    m0, m1 = M[:-1][:, None, :], M[1:][:, None, :]
+    y0, y1 = pts[:-1][:, None, :], pts[1:][:, None, :]
+    v = -m0 * (hs - t) ** 2 / (2 * hs) + m1 * t ** 2 / (2 * hs) + (y1 - y0) / hs - (m1 - m0) * hs / 6
+    a = m0 * (hs - t) / hs + m1 * t / hs
+    return np.abs(v).max(axis=1), np.abs(a).max(axis=1)
+
+
+def _spline_ratios(pts: np.ndarray, limits: JointLimits, h: np.ndarray) -> np.ndarray:
+    """Per-segment max over joints of peak/limit (acceleration as sqrt, like time)."""
+    v, a = _spline_peaks(pts[:, :6], h)
+    vel = np.asarray(limits.max_vel[:6], dtype=np.float64)
+    acc = np.asarray(limits.max_acc[:6], dtype=np.float64)
+    return np.maximum(v / vel, np.sqrt(a / acc)).max(axis=1)
+
+
+def _spline_times(
+    pts: np.ndarray, limits: JointLimits, t0: np.ndarray, floor: np.ndarray, fixed: np.ndarray, hz: float
+) -> np.ndarray:
+    h = np.maximum(t0, 1e-3)
+    free = ~fixed
+    # Per-segment fixed point: stretch segments over the limits, shrink the
+    # others (the spline couples neighbours, hence damping and iterations).
+    for _ in range(SPLINE_ITERATIONS):
+        r = _spline_ratios(pts, limits, h)
+        if np.all(np.abs(r[free] - 1.0) < 0.02):
+            break
+        h = np.where(free, np.maximum(h * np.clip(r, 0.5, 2.0) ** 0.7, np.maximum(t0 * 0.25, floor)), h)
+    # Grid rounding, then a final guard: uniform time scaling of the free
+    # segments keeps the shape and makes it feasible
+    for _ in range(SPLINE_ITERATIONS):
+        h = np.where(free, np.maximum(1, np.ceil(h * hz - 1e-9)) / hz, h)
+        r = _spline_ratios(pts, limits, h).max()
+        if r <= 1.0:
+            break
+        h = np.where(free, h * r, h)
+    return h
+
+
+def retime_track(
+    trk: TrackV3Timed,
+    limits: Optional[JointLimits] = None,
+    profile: Optional[str] = None,
+    hz: float = 50,
+) -> RetimeResult:
+    """Compute the fastest feasible durations of *trk* for *profile*.
+
+    Durations are rounded up to the playback grid (*hz*) so that the sampled
+    plan is exactly as long as computed. The gripper joins the joints in the
+    time-scaling for point-to-point profiles; for ``spline`` it is blended
+    per segment (see plan._sample) and bounded by the point-to-point rule.
+    ``linear`` is retimed as ``LINEAR_RETIME_PROFILE``.
+    """
+    limits = limits or JointLimits.load().scaled(DEFAULT_LIMIT_SCALE)
+    profile = profile or trk.profile
+    if profile not in INTERPOLATION_PROFILES:
+        raise ValueError(f"Unknown interpolation profile '{profile}'")
+    if profile == "linear":
+        logging.info("[RETIME] %s: linear has no acceleration bound – retimed as %s", trk.name, LINEAR_RETIME_PROFILE)
+        profile = LINEAR_RETIME_PROFILE
+    pts = np.asarray(trk.points, dtype=np.float64).reshape(-1, 7)
+    if len(pts) < 2:
+        raise ValueError(f"Track '{trk.name}' has <2 points – nothing to retime")
+    delta = pts[1:] - pts[:-1]
+    original = [0.0] + [d * (1 - trk.speed_up) for d in trk.durations[1:]]
+    orig_h = np.maximum(np.asarray(original[1:]), 1e-3)
+    dwell = np.abs(delta).max(axis=1) <= DWELL_TOLERANCE
+
+    if profile == "spline":
+        grip_only = JointLimits([math.inf] * 6 + limits.max_vel[6:], [math.inf] * 6 + limits.max_acc[6:])
+        grip = _segment_min_times(delta, grip_only, "min_jerk")
+        t0 = np.where(dwell, orig_h, np.maximum(_segment_min_times(delta, limits, "trapezoidal"), grip))
+        seg = _spline_times(pts, limits, t0, grip, dwell, hz)
+        violations = np.nonzero(_spline_ratios(pts, limits, orig_h) > 1.0)[0]
+    else:
+        seg = _segment_min_times(delta, limits, profile)
+        violations = np.nonzero(seg > np.asarray(original[1:]) + 1e-9)[0]
+
+    seg = np.where(dwell, orig_h, seg)
+    # Round up to whole control periods (plan rows), at least one
+    seg = np.maximum(1, np.ceil(seg * hz - 1e-9)) / hz
+    return RetimeResult(
+        name=trk.name,
+        profile=profile,
+        points=[list(map(int, p)) for p in trk.points],
+        durations=[0.0] + [float(d) for d in seg],  # exact multiples of 1/hz
+        original=original,
+        violations=[int(i) + 1 for i in violations],
+    )
+
+
+def write_retimed(res: RetimeResult, name: Optional[str] = None) -> str:
+    """Store *res* as a new timed track (default ``<name>_rt``); return its name."""
+    out = name or f"{res.name}_rt"
+    TrackV3Timed.write_from_points(out, res.points, res.durations, profile=res.profile)
+    logging.info("[RETIME] saved %s (%.2fs)", out, res.total)
+    return out
+
+
+def retime_report(results: Sequence[RetimeResult]) -> Dict[str, float]:
+    """Log one line per track plus the total; return totals."""
+    for res in results:
+        logging.info("[RETIME] %s", res.summary())
+    before = sum(r.original_total for r in results)
+    after = sum(r.total for r in results)
+    if results:
+        logging.info("[RETIME] total: %.2fs → %.2fs (saved %.2fs)", before, after, before - after)
+    return {"before_s": before, "after_s": after, "saved_s": before - after}
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+"""Allocation-free sampling primitives for the recording loop.
+
+Provides:
+    - SampleRing      : preallocated, growable ring of NumPy columns that the
+                        acquisition loop fills by index and a writer thread
+                        drains in blocks.
+    - LatencyStats    : preallocated acquisition-latency log with percentile
+                        summary (p50/p90/p99) and missed-deadline counter.
+    - read_arm_sample : reads the four SDK feedback groups of an arm straight
+                        into a ring slot (no per-sample dict/list).
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from demo.V2.manage.track import TELEMETRY_CHANNELS
+
+# 4 s of samples at 250 Hz before the ring has to grow.
+DEFAULT_RING_CAPACITY = 1024
+
+
+class SampleRing:
+    """Single-producer / single-consumer ring buffer of track columns.
+
+    ``head``/``tail`` are monotonically increasing sample counters; the slot of
+    sample *k* is ``k % capacity``. The producer never blocks on the consumer:
+    if the ring is full it doubles its capacity (rare, only when the disk
+    writer stalls for longer than the ring span).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_RING_CAPACITY) -> None:
+        self.capacity = int(capacity)
+        self.coordinates = np.zeros((self.capacity, 7), dtype=np.int32)
+        self.timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self.details_ts = np.zeros(self.capacity, dtype=np.float64)
+        self.channels: Dict[str, np.ndarray] = {
+            ch: np.zeros((self.capacity, 6), dtype=dtype) for ch, dtype in TELEMETRY_CHANNELS.items()
+        }
+        self.head = 0  # samples committed by the producer
+        self.tail = 0  # samples handed to the consumer
+        self.grown = 0
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------- producer
+    def reserve(self) -> int:
+        """Return the slot index for the next sample (grows the ring if full)."""
+        if self.head - self.tail >= self.capacity:
+            self._grow()
+        return self.head % self.capacity
+
+    def commit(self) -> None:
+        """Publish the sample written into the slot returned by ``reserve``."""
+        self.head += 1
+
+    def pending(self) -> int:
+        return self.head - self.tail
+
+    def _grow(self) -> None:
+        with self._lock:
+            old_cap = self.capacity
+            new_cap = old_cap * 2
+            idx = np.arange(self.tail, self.head)
+            old_idx, new_idx = idx % old_cap, idx % new_cap
+
+            def _regrow(arr: np.ndarray) -> np.ndarray:
+                out = np.zeros((new_cap,) + arr.shape[1:], dtype=arr.dtype)
+                out[new_idx] = arr[old_idx]
+                return out
+
+            self.coordinates = _regrow(self.coordinates)
+            self.timestamps = _regrow(self.timestamps)
+            self.details_ts = _regrow(self.details_ts)
+            self.channels = {ch: _regrow(arr) for ch, arr in self.channels.items()}
+            self.capacity = new_cap
+            self.grown += 1
+
+    # ---------------------------------------------------------------- consumer
+    def drain(self) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]]:
+        """Copy out every committed-but-unread sample as contiguous columns."""
+        with self._lock:
+            head = self.head
+            if head == self.tail:
+                return None
+            idx = np.arange(self.tail, head) % self.capacity
+            block = (
+                self.coordinates[idx],
+                self.timestamps[idx],
+                self.details_ts[idx],
+                {ch: arr[idx] for ch, arr in self.channels.items()},
+            )
+            self.tail = head
+        return block
+
+
+class LatencyStats:
+    """Acquisition latency log (seconds) backed by a growable NumPy array."""
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self._lat = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+        self.missed = 0  # deadlines the loop woke up after
+
+    def add(self, latency_s: float) -> None:
+        if self.count == len(self._lat):
+            self._lat = np.concatenate([self._lat, np.zeros_like(self._lat)])
+        self._lat[self.count] = latency_s
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        """Percentiles in milliseconds plus sample / missed-deadline counts."""
+        if self.count == 0:
+            return {"samples": 0, "missed_deadlines": self.missed}
+        ms = self._lat[: self.count] * 1000.0
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99]).tolist()
+        return {
+            "samples": self.count,
+            "p50_ms": round(p50, 3),
+            "p90_ms": round(p90, 3),
+            "p99_ms": round(p99, 3),
+            "max_ms": round(float(ms.max()), 3),
+            "missed_deadlines": self.missed,
+        }
+
+
+def read_arm_sample(arm, ring: SampleRing, slot: int, ts: float) -> bool:
+    """Read joints, gripper and telemetry of *arm* into *ring* slot *slot*.
+
+    Returns False (slot left unused) if the SDK still reports all-zero joints –
+    typical right after reconnect.
+    """
+    js = arm.GetArmJointMsgs().joint_state
+    gr = arm.GetArmGripperMsgs().gripper_state
+    pt = (js.joint_1, js.joint_2, js.joint_3, js.joint_4, js.joint_5, js.joint_6, gr.grippers_angle)
+    if not any(pt):
+        return False
+    ring.coordinates[slot] = pt
+    ring.timestamps[slot] = ts
+    ring.details_ts[slot] = ts
+
+    hs = arm.GetArmHighSpdInfoMsgs()
+    ls = arm.GetArmLowSpdInfoMsgs()
+    ch = ring.channels
+    h1, h2, h3, h4, h5, h6 = hs.motor_1, hs.motor_2, hs.motor_3, hs.motor_4, hs.motor_5, hs.motor_6
+    l1, l2, l3, l4, l5, l6 = ls.motor_1, ls.motor_2, ls.motor_3, ls.motor_4, ls.motor_5, ls.motor_6
+    # High-speed feedback
+    ch["motor_speed_rpm"][slot] = (h1.motor_speed, h2.motor_speed, h3.motor_speed, h4.motor_speed, h5.motor_speed, h6.motor_speed)
+    ch["motor_current_ma"][slot] = (h1.current, h2.current, h3.current, h4.current, h5.current, h6.current)
+    ch["motor_pos_deg001"][slot] = (h1.pos, h2.pos, h3.pos, h4.pos, h5.pos, h6.pos)
+    ch["motor_effort_mNm"][slot] = (h1.effort, h2.effort, h3.effort, h4.effort, h5.effort, h6.effort)
+    # Low-speed feedback
+    ch["voltage_mv"][slot] = (l1.vol, l2.vol, l3.vol, l4.vol, l5.vol, l6.vol)
+    ch["foc_temp_c"][slot] = (l1.foc_temp, l2.foc_temp, l3.foc_temp, l4.foc_temp, l5.foc_temp, l6.foc_temp)
+    ch["motor_temp_c"][slot] = (l1.motor_temp, l2.motor_temp, l3.motor_temp, l4.motor_temp, l5.motor_temp, l6.motor_temp)
+    ch["bus_current_ma"][slot] = (l1.bus_current, l2.bus_current, l3.bus_current, l4.bus_current, l5.bus_current, l6.bus_current)
+    return True
@@ -2,20 +2,26 @@ from __future__ import annotations
 
 """Scene composition support.
 
-A *Scene* is a parallel timeline for two arms consisting of Track or Pause elements.
+A *Scene* is a parallel timeline for the arms (left/right or any arm of the
+registry) consisting of Track or Pause elements, plus Signal/Wait handoffs
+between arms: ``signal <event>`` marks the point an arm has reached (all its
+previous elements done), ``wait <event>`` holds an arm until that point.
+``acquire <resource>`` / ``release <resource>`` mark where the scene takes
+and gives back a shared station resource (stove, door, utensil); they matter
+when several orders are pipelined (see pipeline.py).
 Saved in JSON under manage/scenes/ directory.
 """
 
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
 from typing import List, Union, Literal, Dict, Any
 
 BASE_DIR = Path(__file__).parent  # manage/
-SCENE_DIR = BASE_DIR / "scenes"
-SCENE_DIR.mkdir(exist_ok=True)
+SCENE_DIR = BASE_DIR / "scenes"  # created on first save
 
-ElementType = Literal["track", "pause"]
+ElementType = Literal["track", "pause", "signal", "wait", "acquire", "release"]
+ELEMENT_TYPES = ("track", "pause", "signal", "wait", "acquire", "release")
 
 @dataclass
 class SceneElement:
@@ -24,6 +30,10 @@ class SceneElement:
     name: str | None = None  # track base name without .json
     # for type == "pause"
     duration: float | None = None  # seconds
+    # for type == "signal" / "wait"
+    event: str | None = None  # handoff name shared by the signalling and waiting arms
+    # for type == "acquire" / "release"
+    resource: str | None = None  # shared station resource, e.g. "stove"
 
     def to_json(self) -> Dict[str, Any]:
         return {k: v for k, v in asdict(self).items() if v is not None}
@@ -31,17 +41,42 @@ class SceneElement:
     @classmethod
     def from_json(cls, obj: Dict[str, Any]) -> "SceneElement":
         t = obj.get("type")
-        if t not in ("track", "pause"):
+        if t not in ELEMENT_TYPES:
             raise ValueError("Unknown element type")
-        return cls(type=t, name=obj.get("name"), duration=obj.get("duration"))
+        if t in ("signal", "wait") and not obj.get("event"):
+            raise ValueError(f"'{t}' element without event")
+        if t in ("acquire", "release") and not obj.get("resource"):
+            raise ValueError(f"'{t}' element without resource")
+        return cls(
+            type=t,
+            name=obj.get("name"),
+            duration=obj.get("duration"),
+            event=obj.get("event"),
+            resource=obj.get("resource"),
+        )
 
 @dataclass
 class Scene:
+    """Timelines keyed by arm name.
+
+    The JSON keeps one list per arm at top level (``"left"``, ``"right"`` or
+    any arm of the registry, see ``arm_registry.py``), so two-arm scenes
+    written before the registry load unchanged.
+    """
+
     name: str  # scene__xxx
-    left: List[SceneElement]
-    right: List[SceneElement]
+    arms: Dict[str, List[SceneElement]] = field(default_factory=dict)
     version: str = "scene_v1"
 
+    # ---------------- two-arm compatibility ----------------
+    @property
+    def left(self) -> List[SceneElement]:
+        return self.arms.get("left", [])
+
+    @property
+    def right(self) -> List[SceneElement]:
+        return self.arms.get("right", [])
+
     # ---------------- files ----------------
     @property
     def path(self) -> Path:
@@ -49,13 +84,13 @@ class Scene:
 
     # ---------------- serialization ----------------
     def to_json(self) -> Dict[str, Any]:
-        return {
-            "version": self.version,
-            "left": [el.to_json() for el in self.left],
-            "right": [el.to_json() for el in self.right],
-        }
+        out: Dict[str, Any] = {"version": self.version}
+        for arm, seq in self.arms.items():
+            out[arm] = [el.to_json() for el in seq]
+        return out
 
     def save(self):
+        SCENE_DIR.mkdir(exist_ok=True)
         self.path.write_text(json.dumps(self.to_json(), indent=2))
 
     # ---------------- helpers ----------------
@@ -63,14 +98,17 @@ class Scene:
     def load(cls, name: str) -> "Scene":
         path = SCENE_DIR / f"{name}.json"
         obj = json.loads(path.read_text())
-        left = [SceneElement.from_json(e) for e in obj["left"]]
-        right = [SceneElement.from_json(e) for e in obj["right"]]
-        return cls(name=name, left=left, right=right, version=obj.get("version", "scene_v1"))
+        arms = {
+            arm: [SceneElement.from_json(e) for e in seq]
+            for arm, seq in obj.items()
+            if arm != "version" and isinstance(seq, list)
+        }
+        return cls(name=name, arms=arms, version=obj.get("version", "scene_v1"))
 
     def timeline_with_times(self):
         """Return lists of tuples (element, start, end) per arm."""
         res = {}
-        for arm_name, seq in (("left", self.left), ("right", self.right)):
+        for arm_name, seq in self.arms.items():
             t = 0.0
             arr = []
             for el in seq:
@@ -79,7 +117,11 @@ class Scene:
                     end = t + (el.duration or 0)
                     arr.append((el, start, end))
                     t = end
+                elif el.type in ("signal", "wait", "acquire", "release"):
+                    # zero-length marker; a wait's real start depends on the partner arm
+                    arr.append((el, t, t))
                 else:
                     # assume track duration unknown; mark end as None for now
                     arr.append((el, t, None))
-            res[arm_name] = arr 
\ No newline at end of file
+            res[arm_name] = arr
+        return res
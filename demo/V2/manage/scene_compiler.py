@@ -0,0 +1,510 @@
+from __future__ import annotations
+
+"""Scene compiler and time-triggered scene executor.
+
+``Scene.timeline_with_times`` cannot know when a track ends, and playing
+each arm's list as "play, then next" lets start times drift with file
+loading, IPC latency and per-call pauses. ``compile_scene`` instead resolves
+every element to an absolute ``[start, end)`` on the scene clock, using the
+exact playback length of each track:
+
+    timed (v3) tracks   – length of the compiled setpoint plan (speed_up and
+                          rate applied, see plan.py), 1-point tracks – the
+                          smooth move to that point;
+    recorded tracks     – span of the recorded timestamps;
+
+plus what the worker spends around it (``play_overhead``: mode settle, and
+the move to the start point before an arm's first track).
+
+The result is one merged schedule sorted by start time. ``SceneExecutor``
+runs it against a single ``time.monotonic`` epoch shared by all arm workers:
+each track is sent shortly before its slot with ``start_at`` (see
+``ArmProxy.call_async``), so the worker begins it on the planned instant and
+cross-arm handoffs happen exactly when planned. External pause (pause.txt)
+shifts the whole schedule; stop ends it before the next element.
+
+Handoffs between arms are explicit elements instead of padded pauses::
+
+    right: track right__open_door, signal door_open, track right__hold
+    left:  wait door_open, track left__insert_pan
+
+At run time ``wait`` is gated on the partner actually reaching its
+``signal`` (its tracks finished), not on the planned time, and the waiting
+arm continues from that instant.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple
+
+from demo.V2.manage.rate import sleep_until
+from demo.V2.manage.scene import Scene
+
+PAUSE_FILE = Path(__file__).parent / "pause.txt"
+PAUSE_POLL_S = 0.2
+
+# A call is handed to its worker this long before its slot: enough for the
+# IPC hop, short enough that a stop request rarely finds it already queued.
+DISPATCH_LEAD_S = 0.05
+# Epoch of the schedule relative to "now" when the executor starts
+START_DELAY_S = 0.1
+
+# terminal_v2._move_smooth: 100 steps at 50 Hz for 1-point timed tracks
+SINGLE_POINT_MOVE_S = 100 / 50
+
+# Worker time of a play call besides the motion itself (terminal_v2): every
+# call settles the control mode (_prepare_track_play); before its first track
+# an arm may also have to move to the start point (_move_smooth + 0.2 s
+# settle). Later tracks start where the previous one ended – pre-flight checks
+# that – so they skip the move.
+PLAY_SETUP_S = 0.01
+START_MOVE_S = {
+    "cmd_play": 100 / 50 + 0.2,
+    "cmd_play_v2": 25 / 50 + 0.2,
+    "play_plan_handle": 25 / 50 + 0.2,
+}
+
+
+@dataclass
+class ScheduledItem:
+    arm: str
+    index: int                  # position in the arm's timeline
+    kind: str                   # "track" | "pause" | "signal" | "wait" | "acquire" | "release"
+    start: float                # seconds from scene start
+    end: float
+    name: Optional[str] = None  # track name
+    method: Optional[str] = None  # worker method playing the track
+    event: Optional[str] = None   # signal / wait handoff
+    resource: Optional[str] = None  # acquire / release
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+@dataclass
+class CompiledScene:
+    name: str
+    items: List[ScheduledItem]  # merged, sorted by (start, arm, index)
+    hz: float
+
+    @property
+    def makespan(self) -> float:
+        return max((it.end for it in self.items), default=0.0)
+
+    @property
+    def arms(self) -> List[str]:
+        return list(dict.fromkeys(it.arm for it in self.items))
+
+    def by_arm(self) -> Dict[str, List[ScheduledItem]]:
+        out: Dict[str, List[ScheduledItem]] = {}
+        for it in sorted(self.items, key=lambda it: (it.arm, it.index)):
+            out.setdefault(it.arm, []).append(it)
+        return out
+
+    def tracks(self) -> List[ScheduledItem]:
+        return [it for it in self.items if it.kind == "track"]
+
+
+# ------------------------------ compilation ------------------------------
+def track_timing(name: str, hz: float = 50):
+    """``(seconds, worker method)`` of playing track *name* once."""
+    from demo.V2.manage.plan import compile_plan  # local import – numpy-heavy
+    from demo.V2.manage.terminal_v2 import PiperTerminal
+    from demo.V2.manage.track import TrackBase, TrackV3Timed
+
+    trk = TrackBase.read_track(name)
+    if isinstance(trk, TrackV3Timed):
+        if len(trk.points) == 1:
+            return SINGLE_POINT_MOVE_S, "cmd_play_v2"
+        plan = compile_plan(trk, hz=hz, gripper_tight=PiperTerminal._gripper_tight(trk))
+        return plan.duration, "cmd_play_v2"
+    ts = trk.arrays.timestamps
+    return (float(ts[-1] - ts[0]) if len(ts) > 1 else 0.0), "cmd_play"
+
+
+def play_overhead(method: str, first: bool) -> float:
+    """Seconds *method* spends before the motion starts; *first* – the arm's first track."""
+    if method not in START_MOVE_S:
+        return 0.0
+    return PLAY_SETUP_S + (START_MOVE_S[method] if first else 0.0)
+
+
+def _check_events(scene: Scene) -> None:
+    """Every awaited event is signalled exactly once."""
+    signalled: Dict[str, str] = {}
+    awaited: Dict[str, str] = {}
+    for arm, seq in scene.arms.items():
+        for idx, el in enumerate(seq):
+            if el.type not in ("signal", "wait"):
+                continue
+            if not el.event:
+                raise ValueError(f"{scene.name}: {arm}[{idx}] {el.type} element without event")
+            where = f"{arm}[{idx}]"
+            if el.type == "signal":
+                if el.event in signalled:
+                    raise ValueError(
+                        f"{scene.name}: event '{el.event}' signalled twice ({signalled[el.event]}, {where})"
+                    )
+                signalled[el.event] = where
+            else:
+                awaited.setdefault(el.event, where)
+    for event, where in awaited.items():
+        if event not in signalled:
+            raise ValueError(f"{scene.name}: {where} waits for event '{event}' that is never signalled")
+
+
+def compile_scene(
+    scene: Scene,
+    hz: float = 50,
+    timing: Optional[Callable[[str, float], Any]] = None,
+) -> CompiledScene:
+    """Resolve every element of *scene* to absolute start/end times.
+
+    A ``wait`` starts where its arm is and ends at the planned time of the
+    matching ``signal`` (or at once if that is already past), so arms are
+    advanced in turns until every handoff is resolved.
+
+    Raises ValueError naming the element if a track cannot be resolved or the
+    handoffs are inconsistent (missing/duplicate signal, circular waits) – a
+    bad scene is rejected before any arm moves.
+    """
+    timing = timing or track_timing
+    _check_events(scene)
+    items: List[ScheduledItem] = []
+    cursor = {arm: 0.0 for arm in scene.arms}
+    pos = {arm: 0 for arm in scene.arms}
+    signal_at: Dict[str, float] = {}
+    moved: Set[str] = set()  # arms that already played a track
+    progress = True
+    while progress:
+        progress = False
+        for arm, seq in scene.arms.items():
+            while pos[arm] < len(seq):
+                idx, el, t = pos[arm], seq[pos[arm]], cursor[arm]
+                if el.type == "wait" and el.event not in signal_at:
+                    break  # partner has not reached the handoff yet – advance the others
+                if el.type == "pause":
+                    dur = float(el.duration or 0)
+                    items.append(ScheduledItem(arm, idx, "pause", t, t + dur))
+                elif el.type == "track":
+                    if not el.name:
+                        raise ValueError(f"{scene.name}: {arm}[{idx}] track element without name")
+                    try:
+                        dur, method = timing(el.name, hz)
+                    except Exception as exc:
+                        raise ValueError(f"{scene.name}: {arm}[{idx}] track '{el.name}': {exc}") from exc
+                    dur += play_overhead(method, first=arm not in moved)
+                    moved.add(arm)
+                    items.append(ScheduledItem(arm, idx, "track", t, t + dur, name=el.name, method=method))
+                elif el.type == "signal":
+                    signal_at[el.event] = t
+                    items.append(ScheduledItem(arm, idx, "signal", t, t, event=el.event))
+                elif el.type == "wait":
+                    items.append(ScheduledItem(arm, idx, "wait", t, max(t, signal_at[el.event]), event=el.event))
+                elif el.type in ("acquire", "release"):
+                    # markers for pipelining; no time and nothing to run within one scene
+                    items.append(ScheduledItem(arm, idx, el.type, t, t, resource=el.resource))
+                else:
+                    # element kinds the time-triggered executor does not understand
+                    raise ValueError(f"{scene.name}: {arm}[{idx}] unsupported element '{el.type}'")
+                cursor[arm] = items[-1].end
+                pos[arm] += 1
+                progress = True
+    stuck = [f"{arm}[{pos[arm]}] wait '{seq[pos[arm]].event}'" for arm, seq in scene.arms.items() if pos[arm] < len(seq)]
+    if stuck:
+        raise ValueError(f"{scene.name}: circular waits – {', '.join(stuck)}")
+    items.sort(key=lambda it: (it.start, it.arm, it.index))
+    return CompiledScene(scene.name, items, hz)
+
+
+def log_schedule(compiled: CompiledScene) -> None:
+    logging.info("[SCENE] %s: %d elements, makespan %.2fs", compiled.name, len(compiled.items), compiled.makespan)
+    for it in compiled.items:
+        if it.kind == "track":
+            what = it.name
+        elif it.kind == "pause":
+            what = f"pause {it.duration:g}s"
+        elif it.kind == "signal":
+            what = f"signal {it.event}"
+        elif it.kind in ("acquire", "release"):
+            what = f"{it.kind} {it.resource}"
+        else:
+            what = f"wait {it.event} ({it.duration:.2f}s)"
+        logging.info("  %8.2f → %8.2f  %-6s %s", it.start, it.end, it.arm, what)
+
+
+# ------------------------------ execution ------------------------------
+def _external_pause_active() -> bool:
+    try:
+        return PAUSE_FILE.read_text().strip() == "1"
+    except Exception:
+        return False
+
+
+@dataclass
+class ExecutionReport:
+    scene: str
+    planned_s: float
+    elapsed_s: float = 0.0
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    stopped: bool = False
+    paused_s: float = 0.0
+    # planned vs actual start of each track (ms late, worker-reported)
+    start_late_ms: Dict[str, float] = field(default_factory=dict)
+    # actual vs planned time of each signal (ms, negative – partner was early)
+    handoff_ms: Dict[str, float] = field(default_factory=dict)
+    # arms that gave up their timeline (failed track before a signal, aborted handoff)
+    aborted: List[str] = field(default_factory=list)
+    # (arm, element index) → monotonic (started, finished) of every completed track
+    track_times: Dict[Tuple[str, int], Tuple[float, float]] = field(default_factory=dict)
+
+    @property
+    def max_late_ms(self) -> float:
+        return max(self.start_late_ms.values(), default=0.0)
+
+
+class _Handoff:
+    """One scene event: set by the signalling arm, awaited by the others."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.ok = False
+        self.at: Optional[float] = None  # scene time the signal fired
+
+    def fire(self, at: float) -> None:
+        self.at, self.ok = at, True
+        self.done.set()
+
+    def abort(self) -> None:
+        if not self.done.is_set():
+            self.done.set()
+
+
+class SceneExecutor:
+    """Run a ``CompiledScene`` on arm proxies against one monotonic epoch.
+
+    Each arm is driven by its own thread. Tracks go to the arm's worker with
+    ``start_at`` = epoch + planned start (+ the arm's handoff shift), without
+    waiting for the previous track – the worker plays them back to back.
+    ``signal`` waits until everything the arm was given has finished, then
+    fires; ``wait`` holds the arm until that happens and re-bases the arm's
+    remaining schedule on the actual handoff instant, so a partner that is
+    early or late moves the waiting arm with it instead of padded pauses.
+    """
+
+    def __init__(
+        self,
+        proxies: Mapping[str, Any],
+        stop_event: Optional[threading.Event] = None,
+        pause_active: Callable[[], bool] = _external_pause_active,
+        lead_s: float = DISPATCH_LEAD_S,
+    ) -> None:
+        self.proxies = dict(proxies)
+        self.stop_event = stop_event or threading.Event()
+        self.pause_active = pause_active
+        self.lead_s = lead_s
+        self._epoch = 0.0
+        self._resumed = threading.Event()
+        self._paused = threading.Event()
+        self._done_at: Dict[Tuple[str, int], float] = {}
+        self._plans: Dict[Tuple[str, int], Any] = {}
+
+    def run(self, compiled: CompiledScene, plans: Optional[Mapping[Tuple[str, int], Any]] = None) -> ExecutionReport:
+        """Run *compiled*; *plans* – shared-memory plan handles per (arm, element index).
+
+        Tracks with a plan handle are played from it (``play_plan_handle``, see
+        preflight.py), the others by name with their worker method.
+        """
+        report = ExecutionReport(compiled.name, compiled.makespan)
+        self._plans = dict(plans or {})
+        by_arm = compiled.by_arm()
+        missing = sorted(arm for arm in by_arm if arm not in self.proxies)
+        if missing:
+            logging.warning("[SCENE] %s: no worker for arm(s) %s – their tracks are skipped", compiled.name, missing)
+        handoffs = {it.event: _Handoff() for it in compiled.items if it.kind == "signal"}
+        planned_signal = {it.event: it.start for it in compiled.items if it.kind == "signal"}
+        runs: Dict[str, List[tuple]] = {arm: [] for arm in by_arm}
+        self._done_at = {}
+        self._paused.clear()
+        self._resumed.set()
+        self._epoch = time.monotonic() + START_DELAY_S
+        threads = [
+            threading.Thread(
+                target=self._run_arm,
+                args=(arm, items, handoffs, runs[arm], report),
+                name=f"scene-{arm}",
+                daemon=True,
+            )
+            for arm, items in by_arm.items()
+        ]
+        for th in threads:
+            th.start()
+        # External pause shifts the whole remaining schedule of every arm
+        while any(th.is_alive() for th in threads):
+            if self.pause_active() and not self.stop_event.is_set():
+                self._resumed.clear()
+                self._paused.set()
+                paused_at = time.monotonic()
+                while self.pause_active() and not self.stop_event.is_set():
+                    self.stop_event.wait(PAUSE_POLL_S)
+                shift = time.monotonic() - paused_at
+                self._epoch += shift
+                report.paused_s += shift
+                self._paused.clear()
+                self._resumed.set()
+            next(th for th in threads if th.is_alive()).join(PAUSE_POLL_S)
+        for arm in by_arm:
+            for it, fut, start_at in runs[arm]:
+                self._collect(report, it, fut, start_at, self._done_at.get((it.arm, it.index)))
+        for event, h in handoffs.items():
+            if h.ok:
+                report.handoff_ms[event] = (h.at - planned_signal[event]) * 1000
+        report.stopped = self.stop_event.is_set()
+        report.skipped = len(compiled.tracks()) - sum(len(r) for r in runs.values())
+        report.elapsed_s = time.monotonic() - self._epoch
+        logging.info(
+            "[SCENE] %s done in %.2fs (planned %.2fs, paused %.2fs) | %d ok, %d failed, %d skipped | start late max %.1f ms",
+            compiled.name,
+            report.elapsed_s,
+            report.planned_s,
+            report.paused_s,
+            report.completed,
+            report.failed,
+            report.skipped,
+            report.max_late_ms,
+        )
+        if report.handoff_ms:
+            logging.info(
+                "[SCENE] handoffs vs plan: %s",
+                ", ".join(f"{ev} {ms:+.0f} ms" for ev, ms in report.handoff_ms.items()),
+            )
+        return report
+
+    # ------------------------------ per-arm timeline ------------------------------
+    def _run_arm(
+        self,
+        arm: str,
+        items: List[ScheduledItem],
+        handoffs: Dict[str, _Handoff],
+        running: List[tuple],
+        report: ExecutionReport,
+    ) -> None:
+        proxy = self.proxies.get(arm)
+        shift = 0.0  # actual − planned scene time of this arm, set at each wait
+        try:
+            for it in items:
+                if proxy is None or self.stop_event.is_set():
+                    break
+                if it.kind == "track":
+                    sent = self._dispatch(proxy, it, it.start + shift)
+                    if sent is None:
+                        break
+                    fut, start_at = sent
+                    fut.add_done_callback(
+                        lambda _f, key=(arm, it.index): self._done_at.__setitem__(key, time.monotonic())
+                    )
+                    running.append((it, fut, start_at))
+                elif it.kind == "signal":
+                    # the arm has reached the handoff once everything before it is done
+                    failed = self._first_failure(running)
+                    if failed is not None:
+                        logging.error("[SCENE] %s: '%s' not signalled – %s failed", arm, it.event, failed.name)
+                        report.aborted.append(arm)
+                        break
+                    fire_at = self._wait_slot(it.start + shift, 0.0)
+                    if fire_at is None:
+                        break
+                    handoffs[it.event].fire(time.monotonic() - self._epoch)
+                elif it.kind == "wait":
+                    h = handoffs[it.event]
+                    while not h.done.wait(PAUSE_POLL_S):
+                        if self.stop_event.is_set():
+                            return
+                    if not h.ok:
+                        logging.error("[SCENE] %s: handoff '%s' aborted – rest of the timeline skipped", arm, it.event)
+                        report.aborted.append(arm)
+                        break
+                    # proceed as soon as both the partner and this arm are there
+                    shift = max(it.start + shift, h.at) - it.end
+        finally:
+            # never leave partners waiting on a signal this arm will not send
+            for it in items:
+                if it.kind == "signal" and not handoffs[it.event].ok:
+                    handoffs[it.event].abort()
+
+    def _dispatch(self, proxy: Any, it: ScheduledItem, at: float) -> Optional[Tuple[Future, float]]:
+        """Send track *it* for scene time *at*; ``(future, start_at)``, None on stop.
+
+        The worker only knows the absolute ``start_at``, so a pause that begins
+        between the dispatch and that instant would not move the track. Until
+        then the call is held here: on pause it is cancelled (the worker drops
+        it unstarted) and sent again for the shifted slot.
+        """
+        while True:
+            start_at = self._wait_slot(at, self.lead_s)
+            if start_at is None:
+                return None
+            handle = self._plans.get((it.arm, it.index))
+            if handle is not None:
+                fut = proxy.call_async("play_plan_handle", handle, start_at=start_at)
+            else:
+                fut = proxy.call_async(it.method, it.name, start_at=start_at)
+            if not self._paused.wait(max(0.0, start_at - time.monotonic())):
+                return fut, start_at
+            if time.monotonic() >= start_at or not proxy.cancel(fut):
+                return fut, start_at  # already playing – it is not taken back
+            logging.info("[SCENE] %s %s: paused before its start – re-sent after the pause", it.arm, it.name)
+
+    def _wait_slot(self, at: float, lead: float) -> Optional[float]:
+        """Block until *lead* before scene time *at*; its monotonic instant, None on stop."""
+        while not self.stop_event.is_set():
+            if not self._resumed.wait(PAUSE_POLL_S):
+                continue
+            target = self._epoch + at
+            self._wait_until(target - lead)
+            if lead == 0.0:
+                sleep_until(target)
+            # a pause during the wait moves the slot – wait for the new one
+            if self._resumed.is_set() and self._epoch + at == target:
+                return None if self.stop_event.is_set() else target
+        return None
+
+    @staticmethod
+    def _first_failure(running: List[tuple]) -> Optional[ScheduledItem]:
+        for it, fut, _start_at in running:
+            try:
+                fut.result()
+            except Exception:  # noqa: BLE001 – logged once in _collect
+                return it
+        return None
+
+    def _wait_until(self, deadline: float) -> None:
+        """Sleep until *deadline* (monotonic) – but wake up at once on stop."""
+        while not self.stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= PAUSE_POLL_S:
+                sleep_until(deadline)
+                return
+            self.stop_event.wait(remaining - PAUSE_POLL_S)
+
+    @staticmethod
+    def _collect(
+        report: ExecutionReport, it: ScheduledItem, fut: Future, start_at: float, done_at: Optional[float]
+    ) -> None:
+        started = getattr(fut, "ipc_started", None)
+        try:
+            fut.result()
+            report.completed += 1
+            report.track_times[(it.arm, it.index)] = (started or start_at, done_at or time.monotonic())
+        except Exception as exc:  # noqa: BLE001 – reported, the other arms carry on
+            report.failed += 1
+            logging.error("[SCENE] %s %s failed: %s", it.arm, it.name, str(exc).splitlines()[0] if str(exc) else exc)
+        if started is not None:
+            report.start_late_ms[f"{it.arm}:{it.index}:{it.name}"] = (started - start_at) * 1000
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+"""Zero-copy handoff of compiled setpoint plans to arm workers.
+
+The orchestrator compiles (or retimes / blends) a :class:`SetpointPlan`
+once, copies its int32 rows into a ``multiprocessing.shared_memory`` block
+and sends the worker only a small :class:`PlanHandle` (block name, shape,
+dtype, rate, label). The worker maps the same block and plays straight from
+it – no JSON re-reading, no pickling of thousands of points through the Pipe.
+
+Layout of the block: ``(N, 7)`` setpoints when the gripper is not tightened
+(targets == setpoints), otherwise ``(2, N, 7)`` = ``[targets, setpoints]``.
+
+The creator (``SharedPlanBuffer``) owns the block and unlinks it in
+``close()``. On POSIX a worker that already mapped it keeps a valid mapping
+until it detaches, so the owner may release the buffer as soon as the play
+call returns (or times out).
+"""
+
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from demo.V2.manage.plan import SetpointPlan
+
+
+@dataclass(frozen=True)
+class PlanHandle:
+    """What travels through the Pipe instead of the plan itself."""
+
+    name: str                       # shared-memory block name
+    shape: Tuple[int, ...]          # (N, 7) or (2, N, 7)
+    dtype: str                      # numpy dtype string, "<i4"
+    hz: float
+    label: str                      # track-like name, selects the arm: left__… / right__…
+    segment_starts: Tuple[int, ...] = ()
+    key: str = ""
+
+    @property
+    def rows(self) -> int:
+        return int(self.shape[-2])
+
+
+class SharedPlanBuffer:
+    """Owner side: one plan copied into shared memory."""
+
+    def __init__(self, plan: SetpointPlan, label: str) -> None:
+        same = np.array_equal(plan.targets, plan.setpoints)
+        src = plan.setpoints if same else np.stack((plan.targets, plan.setpoints))
+        src = np.ascontiguousarray(src, dtype=np.int32)
+        self._shm: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(
+            create=True, size=max(1, src.nbytes)
+        )
+        np.ndarray(src.shape, dtype=src.dtype, buffer=self._shm.buf)[...] = src
+        self.handle = PlanHandle(
+            name=self._shm.name,
+            shape=tuple(src.shape),
+            dtype=src.dtype.str,
+            hz=float(plan.hz),
+            label=label,
+            segment_starts=tuple(int(s) for s in plan.segment_starts),
+            key=plan.key,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.handle.shape)) * np.dtype(self.handle.dtype).itemsize
+
+    def close(self) -> None:
+        """Unmap and unlink the block (idempotent)."""
+        if self._shm is None:
+            return
+        shm, self._shm = self._shm, None
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SharedPlanBuffer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+
+@contextmanager
+def open_shared_plan(handle: PlanHandle) -> Iterator[SetpointPlan]:
+    """Worker side: map *handle* and yield a SetpointPlan viewing the block.
+
+    The arrays are views (no copy); they must not outlive the ``with`` block.
+    """
+    shm = shared_memory.SharedMemory(name=handle.name)
+    arr = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf)
+    if arr.ndim == 3:
+        targets, setpoints = arr[0], arr[1]
+    else:
+        targets = setpoints = arr
+    plan = SetpointPlan(targets, setpoints, np.asarray(handle.segment_starts, dtype=np.int32), handle.hz, handle.key)
+    try:
+        yield plan
+    finally:
+        # Drop every view on the buffer before unmapping it
+        plan.targets = plan.setpoints = None  # type: ignore[assignment]
+        del arr, targets, setpoints
+        try:
+            shm.close()
+        except BufferError:
+            logging.warning("[PLAN_SHM] %s still referenced – left mapped until GC", handle.name)
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+"""Telemetry publish/subscribe between arm workers and the orchestrator.
+
+The worker's live-state thread (``live_state.LivePublisher``) already reads
+the arm's SDK feedback at ``LIVE_HZ`` over the worker's own CAN connection.
+Every tick it hands the sample to a :class:`TelemetryHub`, which forwards
+to each subscriber only the channels it asked for, decimated to its rate.
+Nobody else has to open the bus (unlike ``demo_show_temp.py``).
+
+Orchestrator side::
+
+    sub = left.subscribe_telemetry(["foc_temp_c", "motor_temp_c"], hz=1)
+    for msg in sub:                 # or sub.get(timeout=...)
+        print(msg["ts"], msg["data"]["motor_temp_c"])
+    sub.close()
+
+Subscriptions are re-established automatically after a worker failover.
+"""
+
+import collections
+import itertools
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, Iterator, Optional
+
+from demo.V2.manage.live_state import LIVE_HZ
+from demo.V2.manage.track import TELEMETRY_CHANNELS
+
+# Everything a subscriber can ask for (one value per publisher tick)
+STREAM_CHANNELS = (
+    "joints",                   # 6 joints + gripper (0.001° / 0.001 mm)
+    *TELEMETRY_CHANNELS,        # per-motor feedback, 6 values each
+    "state",                    # live_state.STATE_* flags
+    "track",
+    "progress",
+    "total",
+    "jitter_ms",
+)
+DEFAULT_STREAM_CHANNELS = ("joints", "motor_current_ma", "foc_temp_c", "motor_temp_c")
+SUBSCRIPTION_QUEUE = 1024  # samples kept per subscriber; the oldest are dropped
+
+
+def validate_channels(channels: Optional[Iterable[str]]) -> FrozenSet[str]:
+    chans = frozenset(channels or DEFAULT_STREAM_CHANNELS)
+    unknown = chans - set(STREAM_CHANNELS)
+    if unknown:
+        raise ValueError(f"unknown telemetry channel(s): {', '.join(sorted(unknown))}")
+    return chans
+
+
+def decimation_for(hz: float, base_hz: float = LIVE_HZ) -> int:
+    """Publisher ticks per delivered sample for a subscriber asking *hz*."""
+    if hz <= 0:
+        raise ValueError("hz must be positive")
+    return max(1, int(round(base_hz / hz)))
+
+
+# ------------------------------ worker side ------------------------------
+@dataclass
+class _Sub:
+    channels: FrozenSet[str]
+    every: int
+    sent: int = 0
+
+
+class TelemetryHub:
+    """Worker-side fan-out of publisher samples to subscriptions.
+
+    *sink* receives one message per delivered sample:
+    ``{"telemetry": sub_id, "seq": n, "ts": ..., "data": {channel: value}}``.
+    """
+
+    def __init__(self, sink: Callable[[Dict[str, Any]], None], base_hz: float = LIVE_HZ) -> None:
+        self._sink = sink
+        self.base_hz = base_hz
+        self._subs: Dict[int, _Sub] = {}
+        self._lock = threading.Lock()
+        self._tick = 0
+
+    def subscribe(self, sub_id: int, channels: Iterable[str], hz: float) -> None:
+        with self._lock:
+            self._subs[sub_id] = _Sub(validate_channels(channels), decimation_for(hz, self.base_hz))
+
+    def unsubscribe(self, sub_id: int) -> None:
+        with self._lock:
+            self._subs.pop(sub_id, None)
+
+    def __bool__(self) -> bool:
+        return bool(self._subs)
+
+    def wanted(self) -> FrozenSet[str]:
+        with self._lock:
+            return frozenset().union(*(s.channels for s in self._subs.values()))
+
+    def publish(self, sample: Dict[str, Any]) -> None:
+        self._tick += 1
+        with self._lock:
+            due = [(sid, s) for sid, s in self._subs.items() if self._tick % s.every == 0]
+        for sid, sub in due:
+            sub.sent += 1
+            self._sink({
+                "telemetry": sid,
+                "seq": sub.sent,
+                "ts": sample.get("ts"),
+                "data": {ch: sample[ch] for ch in sub.channels if ch in sample},
+            })
+
+
+# ---------------------------- orchestrator side ----------------------------
+_SUB_IDS = itertools.count(1)
+
+
+class TelemetrySubscription:
+    """Orchestrator-side handle: a bounded queue of samples and/or a callback.
+
+    The callback runs on the proxy's reply-dispatcher thread – keep it short.
+    """
+
+    def __init__(
+        self,
+        proxy,
+        channels: FrozenSet[str],
+        hz: float,
+        callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        maxlen: int = SUBSCRIPTION_QUEUE,
+    ) -> None:
+        self.id = next(_SUB_IDS)
+        self.proxy = proxy
+        self.channels = channels
+        self.hz = hz
+        self.callback = callback
+        self.received = 0
+        self.dropped = 0
+        self.closed = False
+        self._queue: Deque[Dict[str, Any]] = collections.deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+
+    def _deliver(self, msg: Dict[str, Any]) -> None:
+        self.received += 1
+        if self.callback is not None:
+            try:
+                self.callback(msg)
+            except Exception:  # noqa: BLE001 – a broken dashboard must not stop the dispatcher
+                logging.exception("[TELEMETRY] subscriber %d callback failed", self.id)
+            return
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(msg)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next sample, or None on timeout / after close()."""
+        with self._cond:
+            if not self._queue and not self.closed:
+                self._cond.wait(timeout)
+            return self._queue.popleft() if self._queue else None
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while not self.closed:
+            msg = self.get(timeout=1.0)
+            if msg is not None:
+                yield msg
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.proxy.unsubscribe_telemetry(self)
+        with self._cond:
+            self._cond.notify_all()
+
+    def __enter__(self) -> "TelemetrySubscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -4,59 +4,44 @@ import json
 import threading
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Callable, Tuple, Any
+from typing import TYPE_CHECKING, Dict, List, Optional, Callable, Tuple, Any
 import math
 from dataclasses import dataclass
 
-# История ввода (POSIX)
-try:
-    import readline  # noqa: F401 – side-effect import
-except ImportError:
-    pass
-else:
-    # Файл истории команд (persist между сессиями)
-    _HIST_PATH = Path.home() / ".piper_terminal_history"
-    try:
-        readline.read_history_file(_HIST_PATH)
-    except FileNotFoundError:
-        pass
-
-    import atexit
-
-    def _save_history():
-        try:
-            readline.write_history_file(_HIST_PATH)
-        except Exception:
-            pass
-
-    atexit.register(_save_history)
-
-from interface.piper_interface_v2 import C_PiperInterface_V2 as SDK
 from demo.V2.settings import CAN_LEFT, CAN_RIGHT
 import logging
-from demo.V2.manage.track import TrackBase, TrackV2, TrackPoint, TrackV3Timed
-from demo.V2.manage.scene import Scene, SceneElement
+from demo.V2.manage.track import (
+    TrackBase, TrackV2, TrackPoint, TrackArrays, TrackV3Timed, TrackV4, convert_to_v4, INTERPOLATION_PROFILES,
+)
+from demo.V2.manage.rate import RateScheduler, SKIP
+from demo.V2.manage.playback import PLAYBACK, PLAYBACK_FILE
+
+if TYPE_CHECKING:
+    from demo.V2.manage.plan import SetpointPlan
+    from demo.V2.manage.shared_plan import PlanHandle
+
+# Импорт модуля не должен иметь побочных эффектов (его импортирует каждый
+# процесс-воркер arm_ipc): логирование, каталоги и история readline
+# настраиваются при запуске REPL / создании терминала, а SDK (python-can),
+# планы (plan / shared_plan), потоковая запись (track_stream / sampler),
+# сцены и retime подгружаются при первом использовании.
 
 
 # ------------------------------------------------------------------------------------
 # Если одна из рук недоступна – будем хранить в атрибуте *None* (без лишних классов).
 # ------------------------------------------------------------------------------------
 
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(filename)s:%(lineno)d - %(message)s",
-)
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(filename)s:%(lineno)d - %(message)s"
 
 TRACK_DIR = Path("tracks")
-TRACK_DIR.mkdir(exist_ok=True)
-
 SAFE_DIR = TRACK_DIR / "_safe"
-SAFE_DIR.mkdir(exist_ok=True)
 
 PAUSE_FILE = Path(__file__).parent / 'pause.txt'
-logging.info(f"[PAUSE_FILE] Using file: {PAUSE_FILE.resolve()}")
+# Poll period while paused – one control tick at 50 Hz
+PAUSE_POLL_S = 0.02
+
+# Файл истории команд (persist между сессиями)
+HISTORY_PATH = Path.home() / ".piper_terminal_history"
 
 ZERO_POS_PATH = SAFE_DIR / "zero_position.json"
 # The gripper torque, in 0.001 N/m. Range 0-5000 (corresponds 0-5 N/m)
@@ -72,6 +57,10 @@ ZERO_POSE: List[int] = [0, 0, 0, 0, 0, 0, 0]
 # ---------- Настройки ----------
 DELAY_BETWEEN_TRACKS = 3  # секунд паузы между треками
 
+# Частота записи обычных треков (Гц); меняется командой rec_hz <hz>
+REC_HZ = 50
+REC_HZ_MAX = 500
+
 # Значение суставов SDK измеряются в «0.001 °» (тысячных долей градуса).
 # Поэтому 1 ° = 1000 единиц SDK.
 # Будем считать «близко», если ошибка ≤ 3 °.
@@ -86,6 +75,47 @@ IGNORED_JOINTS = [
 
 # ------------------------------------------------- helpers -------------------------------------------------
 
+def _sdk():
+    """SDK class, imported on first use (pulls in python-can)."""
+    from interface.piper_interface_v2 import C_PiperInterface_V2
+
+    return C_PiperInterface_V2
+
+
+def _ensure_dirs() -> None:
+    TRACK_DIR.mkdir(exist_ok=True)
+    SAFE_DIR.mkdir(exist_ok=True)
+
+
+_history_enabled = False
+
+
+def enable_history() -> None:
+    """Load readline history and save it at exit (POSIX; REPL only)."""
+    global _history_enabled
+    if _history_enabled:
+        return
+    try:
+        import readline
+    except ImportError:
+        return
+    import atexit
+
+    _history_enabled = True
+    try:
+        readline.read_history_file(HISTORY_PATH)
+    except (FileNotFoundError, OSError):
+        pass
+
+    def _save_history():
+        try:
+            readline.write_history_file(HISTORY_PATH)
+        except Exception:
+            pass
+
+    atexit.register(_save_history)
+
+
 def _track_path(full_name: str) -> Path:
     """Путь к основному .json трека."""
     return TRACK_DIR / f"{full_name}.json"
@@ -144,6 +174,11 @@ class PiperTerminal:
 
         play_v2 <t1> [t2 ...]       – воспроизвести гибридный трек(и)
         p2 <t1> [t2 ...]            – alias play_v2
+        profile <t> [name]          – интерполяция v3: linear|trapezoidal|min_jerk|spline
+        playback [<t> [k=v ...]]    – параметры воспроизведения v3 (playback.json)
+        speed <t> <speed_up>        – изменить speed_up и показать новую длительность
+        retime <t1> [t2 ...] [save] – минимальные длительности v3 под лимиты суставов
+        limits [read [left|right]]  – лимиты скорости/ускорения суставов для retime
 
     Доп. сервисные:
         r-0-pos                     – сохранить текущую позу как Zero-позицию
@@ -151,10 +186,14 @@ class PiperTerminal:
         check-0-pos                 – проверить отклонение от Zero-позиции
         check-0-track               – минимальная дельта до Zero-треков
         get_track_range <name>      – min/max значений суставов на треке
+        rec_hz [hz]                 – частота записи обычных треков (до 500 Гц)
+        convert_v4 <t1> [t2 ...]    – перевести v1/v2 треки в бинарный формат v4
+        plan_cache [clear [disk]]   – кэш скомпилированных уставок play_v2
     """
 
-    # Track implementation to use by default (can be overridden in subclasses)
-    track_cls = TrackV2
+    # Track implementation to use by default (can be overridden in subclasses).
+    # v4 – бинарный колоночный формат, открывается без парсинга JSON точек.
+    track_cls = TrackV4
     # Default duration (seconds) for a control point when no duration is specified
     DEFAULT_POINT_DURATION_SEC = 1.0
 
@@ -162,13 +201,25 @@ class PiperTerminal:
         self,
         left_can: Optional[str] = CAN_LEFT,
         right_can: Optional[str] = CAN_RIGHT,
+        arm_names: Optional[Dict[str, str]] = None,
     ) -> None:
         # Инициализируем каждую руку отдельно и не падаем, если одна из них недоступна.
+        t_start = time.perf_counter()
+        # Время этапов запуска (с), логируется в конце и отдаётся arm_ipc
+        self.startup_phases: Dict[str, float] = {}
+        _ensure_dirs()
+        t_phase = time.perf_counter()
+        try:
+            _sdk()
+        except Exception:  # noqa: BLE001 – reported by the per-arm connect below
+            pass
+        self.startup_phases["import_sdk"] = time.perf_counter() - t_phase
 
         # Левая рука ------------------------------------------------------------------
+        t_phase = time.perf_counter()
         try:
             if left_can is not None:
-                _left_candidate = SDK.get_instance(left_can)
+                _left_candidate = _sdk().get_instance(left_can)
                 try:
                     _left_candidate.ConnectPort()
                     self.left_arm = _left_candidate
@@ -182,11 +233,14 @@ class PiperTerminal:
         except Exception as exc:
             logging.warning(f"LEFT ({left_can}) initialisation failed: {exc}")
             self.left_arm = None
+        if left_can is not None:
+            self.startup_phases["connect_left"] = time.perf_counter() - t_phase
 
         # Правая рука ----------------------------------------------------------------
+        t_phase = time.perf_counter()
         try:
             if right_can is not None:
-                _right_candidate = SDK.get_instance(right_can)  # type: ignore[arg-type]
+                _right_candidate = _sdk().get_instance(right_can)  # type: ignore[arg-type]
                 try:
                     _right_candidate.ConnectPort()
                     self.right_arm = _right_candidate
@@ -200,6 +254,8 @@ class PiperTerminal:
         except Exception as exc:
             logging.warning(f"RIGHT ({right_can}) initialisation failed: {exc}")
             self.right_arm = None
+        if right_can is not None:
+            self.startup_phases["connect_right"] = time.perf_counter() - t_phase
 
         # Запись
         self._rec_thread: Optional[threading.Thread] = None
@@ -208,6 +264,18 @@ class PiperTerminal:
         self._play_thread: Optional[threading.Thread] = None
         self._play_stop = threading.Event()
         self._play_stop.set()  # not playing initially
+        # Set when the running play command returns – stop_play(wait=True) waits on it
+        self._play_done = threading.Event()
+        self._play_done.set()
+        # Set by the out-of-band control channel (arm_ipc) – checked every tick
+        self._play_pause = threading.Event()
+        self._speed_override: float = 1.0
+        # Progress of the running track for the live state block (live_state.py);
+        # replaced as whole objects so the publisher thread never sees a torn pair
+        self._live_track: str = ""
+        self._live_progress: Tuple[int, int] = (0, 0)  # (row, total)
+        self._live_sched: Optional[RateScheduler] = None
+        self._live_paused = False  # play loop is holding in a pause (file or control channel)
 
         # Optional callback invoked for each point sent during playback.
         # Signature: hook(pt: List[int]) where pt is 7-length list (deg001 units)
@@ -223,14 +291,41 @@ class PiperTerminal:
         # Remember CAN names for helper methods
         self._left_can = left_can
         self._right_can = right_can
+        # Track-name prefix of each arm slot. A registry arm (arm_registry.py)
+        # running in a slot is addressed by its own name instead: {"left": "a3"}
+        # makes the left slot answer to "a3__…" only.
+        self._slot_prefixes: Dict[str, str] = {"left": "left__", "right": "right__"}
+        for slot, arm_name in (arm_names or {}).items():
+            self._slot_prefixes[slot] = f"{arm_name}__"
 
         # Current default duration (seconds) for new control points in hybrid recording.
         # Can be changed at runtime with the "default <sec>" command.
         self._default_point_duration: float = self.DEFAULT_POINT_DURATION_SEC
 
+        # Sampling rate (Hz) for regular (dense) recordings
+        self._rec_hz: int = REC_HZ
+
         # Log pause-file location for the user (printed once at startup)
         logging.info("[PAUSE_FILE] Using file: %s (write 1 to pause, 0 to resume)", PAUSE_FILE.resolve())
 
+        # Repair recordings interrupted by a crash / power loss (*.rec streams)
+        t_phase = time.perf_counter()
+        try:
+            from demo.V2.manage.track_stream import recover_pending
+
+            # only this terminal's arms: every arm worker starts its own terminal
+            own = [self._slot_prefixes[slot] for slot, can in (("left", left_can), ("right", right_can)) if can]
+            recover_pending(self.track_cls, prefixes=own)
+        except Exception:
+            logging.exception("[REC-STREAM] recovery failed")
+        self.startup_phases["recover"] = time.perf_counter() - t_phase
+        self.startup_phases["init_total"] = time.perf_counter() - t_start
+        logging.info(
+            "[STARTUP] terminal ready in %.0f ms (%s)",
+            self.startup_phases["init_total"] * 1000,
+            ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in self.startup_phases.items() if k != "init_total"),
+        )
+
     def __dangerous_reset(self, arm, can_name):
         # это код полное говно, но работает
         # надо разобраться что тут реально нужно а что нет (либо забить хуй)
@@ -246,7 +341,7 @@ class PiperTerminal:
 
         time.sleep(1)  # даём контроллеру перезапуститься
 
-        arm = SDK.get_instance(can_name)  # важно пересоздать руку (я хз почему)
+        arm = _sdk().get_instance(can_name)  # важно пересоздать руку (я хз почему)
         arm.ConnectPort(can_init=True)  # этот аргумент важен
 
 
@@ -322,13 +417,13 @@ class PiperTerminal:
         """Плавно ведёт руку к target_pt за ~steps/hz секунд."""
         curr = self._current_point(arm)
         diffs = [(t - c) / steps for c, t in zip(curr, target_pt)]
-        period = 1.0 / hz
+        sched = RateScheduler(hz)
 
         logging.info(f'[SEND] sending points started')
         for i in range(steps):
             pt = [int(c + d * i) for c, d in zip(curr, diffs)]
             self._send_point(arm, pt)
-            time.sleep(period)  # todo: too aggressive
+            sched.wait()
         logging.info(f'[SEND] sending points finished')
 
         if not self._is_close_strict(self._current_point(arm), target_pt):
@@ -459,7 +554,7 @@ class PiperTerminal:
             if idx in IGNORED_JOINTS:
                 continue
             if d > max_delta:
-                /////
+                max_delta = d
                 worst_joint = idx
         return max_delta, worst_joint if worst_joint is not None else -1
 
@@ -536,18 +631,62 @@ class PiperTerminal:
             logging.error(f"[ERROR] {exc}")
             return
 
-        # Инициализируем списки длиной 7 (6 суставов + захват)
-        mins = [math.inf] * 7
-        maxs = [-math.inf] * 7
-        for tp in data:
-            for i, val in enumerate(tp.coordinates):
-                mins[i] = min(mins[i], val)
-                maxs[i] = max(maxs[i], val)
+        if len(data) == 0:
+            logging.info(f"get_track_range: трек {track} пуст")
+            return
+
+        # min/max по каждому из 7 столбцов (6 суставов + захват)
+        mins = data.coordinates.min(axis=0).tolist()
+        maxs = data.coordinates.max(axis=0).tolist()
 
         joint_names = ["j1", "j2", "j3", "j4", "j5", "j6", "gripper"]
         for i, name in enumerate(joint_names):
             logging.info(f"{name}: min={mins[i]}, max={maxs[i]}")
 
+    def cmd_convert_v4(self, *tracks: str):
+        """Перевести v1/v2 треки в бинарный формат v4 (оригиналы → *.bak).
+
+        usage: convert_v4 <t1> [t2 ...]   |   convert_v4 all
+        """
+        if not tracks:
+            logging.info("convert_v4: требуется >=1 трек или 'all'")
+            return
+        if tracks == ("all",):
+            tracks = tuple(self.list_tracks())
+        for name in tracks:
+            try:
+                trk = TrackBase.read_track(name)
+                if isinstance(trk, (TrackV3Timed, TrackV4)):
+                    logging.info(f"[CONVERT] {name}: {trk.version} – пропускаю.")
+                    continue
+                convert_to_v4(name)
+            except Exception as exc:
+                logging.error(f"[CONVERT] {name}: {exc}")
+
+    def cmd_track_cache(self, *args: str):
+        """Статистика кэша разобранных треков; 'track_cache clear' – сбросить."""
+        if args and args[0] == "clear":
+            TrackBase.invalidate_cache()
+        stats = TrackBase.cache_stats()
+        logging.info(
+            "[TRACK_CACHE] hits=%d misses=%d evictions=%d size=%d/%d",
+            stats["hits"], stats["misses"], stats["evictions"], stats["size"], stats["capacity"],
+        )
+        return stats
+
+    def cmd_plan_cache(self, *args: str):
+        """Статистика кэша скомпилированных планов v3; 'plan_cache clear [disk]' – сбросить."""
+        from demo.V2.manage.plan import clear_plan_cache, plan_cache_stats
+
+        if args and args[0] == "clear":
+            clear_plan_cache(disk=len(args) > 1 and args[1] == "disk")
+        stats = plan_cache_stats()
+        logging.info(
+            "[PLAN_CACHE] hits=%d misses=%d evictions=%d size=%d/%d on_disk=%d",
+            stats["hits"], stats["misses"], stats["evictions"], stats["size"], stats["capacity"], stats["on_disk"],
+        )
+        return stats
+
     # --------------------------------- record / stop ----------------------------------------------------
     def cmd_record(self, *args: str):
         if self._rec_thread and self._rec_thread.is_alive():
@@ -576,6 +715,23 @@ class PiperTerminal:
         )
         self._rec_thread.start()
 
+    def cmd_rec_hz(self, *args: str):
+        """Показать / задать частоту записи обычных треков.
+
+        usage: rec_hz [hz]      (1…REC_HZ_MAX, по умолчанию REC_HZ)
+        """
+        if args:
+            try:
+                hz = int(args[0])
+                if not 1 <= hz <= REC_HZ_MAX:
+                    raise ValueError
+            except ValueError:
+                logging.error(f"rec_hz: требуется целое 1…{REC_HZ_MAX}")
+                return None
+            self._rec_hz = hz
+        logging.info(f"[REC] sampling rate = {self._rec_hz} Hz")
+        return self._rec_hz
+
     def cmd_r_0_pos(self):
         """Сохранить текущую позу как Zero-позицию."""
         pos = self._current_point(self.left_arm)
@@ -611,154 +767,75 @@ class PiperTerminal:
         self._rec_thread.start()
 
     # --------------------------------- workers ----------------------------------------------------------
-    def _rec_worker(self, arm, full_name: str, hz: int = 50):
-        """Работник записи обычного трека."""
-        period = 1.0 / hz
+    def _rec_worker(self, arm, full_name: str, hz: Optional[int] = None):
+        """Работник записи обычного трека.
+
+        Samples are read straight into a preallocated SampleRing (no per-sample
+        dict/list) on absolute deadlines; the streaming writer drains the ring
+        in the background. Acquisition latency percentiles and missed deadlines
+        are logged and stored in the track metadata.
+        """
+        from demo.V2.manage.sampler import DEFAULT_RING_CAPACITY, LatencyStats, SampleRing, read_arm_sample
+        from demo.V2.manage.track_stream import StreamingTrackWriter
+
+        hz = hz or self._rec_hz
         logging.info("MotionCtrl_1: grag_teach_ctrl=0x01   (start recording)")
         arm.MotionCtrl_1(grag_teach_ctrl=0x01)
-        data: List[List[int]] = []  # points only
-        details: List[dict] = []    # telemetry with ts (first field is ts)
-        _acq_times: List[float] = []  # seconds
+        # Samples go straight to the streaming writer (chunked, crash-safe);
+        # nothing accumulates in memory and the loop never waits on disk.
+        ring = SampleRing(max(DEFAULT_RING_CAPACITY, hz * 4))
+        writer = StreamingTrackWriter(full_name, self.track_cls, ring=ring)
+        chunk = writer.chunk_samples
+        stats = LatencyStats()
         zero_start: Optional[float] = None
         zero_warned_at = time.time()
+        # absolute deadlines: latency of one sample never shifts the grid;
+        # after a stall (GC, swap…) missed ticks are skipped, not bunched up
+        sched = RateScheduler(hz, policy=SKIP)
         try:
             while not self._rec_stop.is_set():
                 _acq_start = time.perf_counter()
-                js = arm.GetArmJointMsgs().joint_state
-                gr = arm.GetArmGripperMsgs().gripper_state
-                curr_point = [
-                    js.joint_1,
-                    js.joint_2,
-                    js.joint_3,
-                    js.joint_4,
-                    js.joint_5,
-                    js.joint_6,
-                    gr.grippers_angle,
-                ]
-
-                if all(v == 0 for v in curr_point):
+                slot = ring.reserve()
+                if not read_arm_sample(arm, ring, slot, time.time()):
                     if zero_start is None:
                         zero_start = time.time()
                     elif time.time() - zero_start > 1:
                         if time.time() - zero_warned_at > 1:
                             logging.error("[REC] Получаем нулевые данные >1s – проверьте соединение.")
                             zero_warned_at = time.time()
-                    time.sleep(period)
-                    continue
                 else:
                     zero_start = None
                     zero_warned_at = time.time()
-
-                data.append(curr_point)
-                hs = arm.GetArmHighSpdInfoMsgs()
-                ls = arm.GetArmLowSpdInfoMsgs()
-                details.append(
-                    {
-                        "ts": time.time(),
-                        "joints_deg001": [
-                            js.joint_1,
-                            js.joint_2,
-                            js.joint_3,
-                            js.joint_4,
-                            js.joint_5,
-                            js.joint_6,
-                        ],
-                        "gripper_deg001": gr.grippers_angle,
-                        # High-speed feedback
-                        "motor_speed_rpm": [
-                            hs.motor_1.motor_speed,
-                            hs.motor_2.motor_speed,
-                            hs.motor_3.motor_speed,
-                            hs.motor_4.motor_speed,
-                            hs.motor_5.motor_speed,
-                            hs.motor_6.motor_speed,
-                        ],
-                        "motor_current_ma": [
-                            hs.motor_1.current,
-                            hs.motor_2.current,
-                            hs.motor_3.current,
-                            hs.motor_4.current,
-                            hs.motor_5.current,
-                            hs.motor_6.current,
-                        ],
-                        "motor_pos_deg001": [
-                            hs.motor_1.pos,
-                            hs.motor_2.pos,
-                            hs.motor_3.pos,
-                            hs.motor_4.pos,
-                            hs.motor_5.pos,
-                            hs.motor_6.pos,
-                        ],
-                        "motor_effort_mNm": [
-                            hs.motor_1.effort,
-                            hs.motor_2.effort,
-                            hs.motor_3.effort,
-                            hs.motor_4.effort,
-                            hs.motor_5.effort,
-                            hs.motor_6.effort,
-                        ],
-                        # Low-speed feedback
-                        "voltage_mv": [
-                            ls.motor_1.vol,
-                            ls.motor_2.vol,
-                            ls.motor_3.vol,
-                            ls.motor_4.vol,
-                            ls.motor_5.vol,
-                            ls.motor_6.vol,
-                        ],
-                        "foc_temp_c": [
-                            ls.motor_1.foc_temp,
-                            ls.motor_2.foc_temp,
-                            ls.motor_3.foc_temp,
-                            ls.motor_4.foc_temp,
-                            ls.motor_5.foc_temp,
-                            ls.motor_6.foc_temp,
-                        ],
-                        "motor_temp_c": [
-                            ls.motor_1.motor_temp,
-                            ls.motor_2.motor_temp,
-                            ls.motor_3.motor_temp,
-                            ls.motor_4.motor_temp,
-                            ls.motor_5.motor_temp,
-                            ls.motor_6.motor_temp,
-                        ],
-                        "bus_current_ma": [
-                            ls.motor_1.bus_current,
-                            ls.motor_2.bus_current,
-                            ls.motor_3.bus_current,
-                            ls.motor_4.bus_current,
-                            ls.motor_5.bus_current,
-                            ls.motor_6.bus_current,
-                        ],
-                    }
-                )
-                _acq_end = time.perf_counter()
-                _acq_times.append(_acq_end - _acq_start)
-                time.sleep(period)
+                    ring.commit()
+                    stats.add(time.perf_counter() - _acq_start)
+                    if ring.pending() >= chunk:
+                        writer.wake()
+                sched.wait()
         finally:
             self._finalize_record(arm)
-            # Transform to (pt, ts) tuples expected by write_from_record
-            points_ts = [
-                (pt, d["ts"]) for pt, d in zip(data, details)
-            ]
             # Report acquisition timing statistics
-            if _acq_times:
-                times_ms = [t * 1000 for t in _acq_times]
-                times_sorted = sorted(times_ms)
-                n = len(times_sorted)
-                p10 = times_sorted[int(n * 0.1)]
-                p90 = times_sorted[int(n * 0.9)-1]
-               
-
-            # Persist using the configured track_cls
-            self.track_cls.write_from_record(full_name, points_ts, details)
+            stats.missed = sched.missed
+            summary = stats.summary()
+            summary["hz"] = hz
+            summary["jitter_hist"] = sched.histogram()
+            if stats.count:
+                logging.info(
+                    f"[REC] acquisition @ {hz} Hz: p50={summary['p50_ms']:.3f} ms, "
+                    f"p90={summary['p90_ms']:.3f} ms, p99={summary['p99_ms']:.3f} ms, "
+                    f"max={summary['max_ms']:.3f} ms, missed deadlines={stats.missed}"
+                )
+            if ring.grown:
+                logging.warning(f"[REC] sample ring grew {ring.grown}x (writer fell behind)")
+
+            # Flush the tail and convert the stream into the configured track_cls
+            out_path = writer.close(meta={"acquisition": summary})
             logging.info(
-                f"[REC] Сохранено {len(data)} точек -> {_track_path(full_name)}."
+                f"[REC] Сохранено {writer.written} точек -> {out_path or writer.path}."
             )
 
     def _rec_worker_safe(self, arm, safe_name: str, hz: int = 50):
         """Работник записи безопасного Zero-трека."""
-        period = 1.0 / hz
+        sched = RateScheduler(hz, policy=SKIP)
         logging.info("MotionCtrl_1: grag_teach_ctrl=0x01   (start recording SAFE)")
         arm.MotionCtrl_1(grag_teach_ctrl=0x01)
         data: List[List[int]] = []
@@ -785,7 +862,7 @@ class PiperTerminal:
                     elif time.time() - zero_start > 0.1 and not zero_warned:
                         logging.error("[REC-SAFE] Получаем нулевые данные >0.1s – проверьте соединение.")
                         zero_warned = True
-                    time.sleep(period)
+                    sched.wait()
                     continue
                 else:
                     zero_start = None
@@ -793,7 +870,7 @@ class PiperTerminal:
 
                 data.append(curr_point)
                 details.append({"ts": time.time()})
-                time.sleep(period)
+                sched.wait()
         finally:
             self._finalize_record(arm)
             json_path = _zero_track_path(safe_name)
@@ -818,60 +895,59 @@ class PiperTerminal:
         if not tracks:
             logging.info("play: требуется >=1 трек")
             return
-        self._play_stop.clear()
-        # Remember the thread that executes playback so we can join later
-        self._play_thread = threading.current_thread()
-
-        # for prev, curr in zip(tracks, tracks[1:]):
-        #     if not curr.startswith(prev + "__"):
-        #         logging.info(f"Ошибка порядка: '{curr}' не является потомком '{prev}'.")
-        #         return
-
-        # Проверка безопасности перед reset-ом
-        arm0 = self._arm_from_name(tracks[0])
-        arm0_can_name = self._arm_can_from_name(tracks[0])
-        result = self._maybe_reset_from_safe_pose_and_move_to_0(arm0, arm0_can_name)
-        if not result.ok:
-            logging.error(f'bad status: {result}')
-            return
-
-        # Теперь проверка стартовой позиции трека
-        first_track_start = self._load(tracks[0])[0].coordinates
-        if not self._is_close_ignored(self._current_point(arm0), first_track_start):
-            logging.info("[INFO] Перемещаю робота в начало трека…")
-            if not self._safe_move_smooth(arm0, first_track_start):
-                logging.error("[PLAY] Движение к стартовой точке отменено из соображений безопасности.")
+        self._begin_play()
+        try:
+            # for prev, curr in zip(tracks, tracks[1:]):
+            #     if not curr.startswith(prev + "__"):
+            #         logging.info(f"Ошибка порядка: '{curr}' не является потомком '{prev}'.")
+            #         return
+
+            # Проверка безопасности перед reset-ом
+            arm0 = self._arm_from_name(tracks[0])
+            arm0_can_name = self._arm_can_from_name(tracks[0])
+            result = self._maybe_reset_from_safe_pose_and_move_to_0(arm0, arm0_can_name)
+            if not result.ok:
+                logging.error(f'bad status: {result}')
                 return
-            time.sleep(0.2)
 
-        for i, full_name in enumerate(tracks):
-            if self._play_stop.is_set():
-                logging.info("[PLAY] Стоп запрошен – прерываем воспроизведение после трека.")
-                break
+            # Теперь проверка стартовой позиции трека
+            first_track_start = self._load(tracks[0])[0].coordinates
+            if not self._is_close_ignored(self._current_point(arm0), first_track_start):
+                logging.info("[INFO] Перемещаю робота в начало трека…")
+                if not self._move_smooth(arm0, first_track_start).ok:
+                    logging.error("[PLAY] Движение к стартовой точке отменено из соображений безопасности.")
+                    return
+                time.sleep(0.2)
 
-            data = self._load(full_name)
-            arm = self._arm_from_name(full_name)
-            logging.info(f"[PLAY] {full_name} ({len(data)} pts)…")
-            self._run_track(arm, data)
+            for i, full_name in enumerate(tracks):
+                if self._play_stop.is_set():
+                    logging.info("[PLAY] Стоп запрошен – прерываем воспроизведение после трека.")
+                    break
 
-            if self._play_stop.is_set():
-                logging.info("[PLAY] Стоп запрошен – останавливаем дальнейшие треки.")
-                break
+                data = self._load(full_name)
+                arm = self._arm_from_name(full_name)
+                logging.info(f"[PLAY] {full_name} ({len(data)} pts)…")
+                self._live_track = full_name
+                self._run_track(arm, data)
 
-            if i < len(tracks) - 1:
-                logging.info(f"…пауза {DELAY_BETWEEN_TRACKS} c…")
-                # Если во время паузы поступил запрос на остановку – уходим сразу
-                for _ in range(DELAY_BETWEEN_TRACKS * 10):
-                    if self._play_stop.is_set():
-                        break
-                    time.sleep(0.1)
                 if self._play_stop.is_set():
-                    logging.info("[PLAY] Стоп запрошен во время паузы – прерываем.")
+                    logging.info("[PLAY] Стоп запрошен – останавливаем дальнейшие треки.")
                     break
 
-        logging.info("✓ Воспроизведение завершено.")
-        self._play_thread = None
-        self._play_stop.set()
+                if i < len(tracks) - 1:
+                    logging.info(f"…пауза {DELAY_BETWEEN_TRACKS} c…")
+                    # Если во время паузы поступил запрос на остановку – уходим сразу
+                    for _ in range(DELAY_BETWEEN_TRACKS * 10):
+                        if self._play_stop.is_set():
+                            break
+                        time.sleep(0.1)
+                    if self._play_stop.is_set():
+                        logging.info("[PLAY] Стоп запрошен во время паузы – прерываем.")
+                        break
+
+            logging.info("✓ Воспроизведение завершено.")
+        finally:
+            self._end_play()
 
     # --------------------------------- play_parallel ----------------------------------------------------
     def cmd_play_parallel(self, left_track: str = "", right_track: str = ""):
@@ -910,12 +986,12 @@ class PiperTerminal:
         # При необходимости доводим каждую руку до стартовой точки
         for full_name in tracks:
             arm = self._arm_from_name(full_name)
-            first_pt = self._load(full_name)[0]
+            first_pt = self._load(full_name).coordinates[0].tolist()
             if not self._is_close_ignored(self._current_point(arm), first_pt):
                 logging.info(
                     f"[PP] Перемещаю {'левую' if arm is self.left_arm else 'правую'} руку в начало трека…"
                 )
-                if not self._safe_move_smooth(arm, first_pt):
+                if not self._move_smooth(arm, first_pt).ok:
                     logging.error("[PP] Движение к стартовой точке отменено (небезопасно).")
                     return
                 time.sleep(0.2)
@@ -939,23 +1015,23 @@ class PiperTerminal:
         logging.info("✓ Параллельное воспроизведение завершено.")
 
     # --------------------------------- low-level helpers -----------------------------------------------
+    def _slot_from_name(self, full_name: str) -> str:
+        for slot, prefix in self._slot_prefixes.items():
+            if full_name.startswith(prefix):
+                return slot
+        raise ValueError(f"Имя должно начинаться с {' или '.join(self._slot_prefixes.values())}")
+
     def _arm_can_from_name(self, full_name: str):
-        if full_name.startswith("left__"):
-            return self._left_can
-        if full_name.startswith("right__"):
-            return self._right_can
-        raise ValueError("Имя должно начинаться с left__ или right__")
+        return self._left_can if self._slot_from_name(full_name) == "left" else self._right_can
 
     def _arm_from_name(self, full_name: str):
-        if full_name.startswith("left__"):
+        if self._slot_from_name(full_name) == "left":
             if self.left_arm is None:
                 raise RuntimeError("Left arm is not initialised/connected.")
             return self.left_arm
-        if full_name.startswith("right__"):
-            if self.right_arm is None:
-                raise RuntimeError("Right arm is not initialised/connected.")
-            return self.right_arm
-        raise ValueError("Имя должно начинаться с left__ или right__")
+        if self.right_arm is None:
+            raise RuntimeError("Right arm is not initialised/connected.")
+        return self.right_arm
 
     def _send_point(self, arm, pt):
         eff_pt = self._effective_target(pt)
@@ -970,13 +1046,24 @@ class PiperTerminal:
                 # Do not let GUI errors break control loop
                 logging.debug("point_hook raised", exc_info=True)
 
+    def _send_setpoint(self, arm, eff_pt, pt):
+        """Send an already tightened setpoint *eff_pt* (precompiled plans); *pt* goes to the hook."""
+        arm.JointCtrl(*eff_pt[:6])
+        arm.GripperCtrl(eff_pt[6], GRIPPER_EFFORT, 0x01, 0)
+
+        if self._point_hook is not None:
+            try:
+                self._point_hook(pt)
+            except Exception:
+                logging.debug("point_hook raised", exc_info=True)
+
     def _prepare_track_play(self, arm):
         """Один раз перед отправкой траектории настраиваем режим."""
         arm.EnableArm(7)
         arm.ModeCtrl(ctrl_mode=0x01, move_mode=0x01, move_spd_rate_ctrl=50)
         time.sleep(0.01)
 
-    def _run_track(self, arm, data: List[TrackPoint], details=None, hz: int = 50):
+    def _run_track(self, arm, data: TrackArrays, details=None, hz: int = 50):
         """Play the given trajectory with accuracy gating.
 
         The next point will not be issued until the arm is within 0.2° (≈200 units)
@@ -986,6 +1073,8 @@ class PiperTerminal:
         """
         if details is None:
             details = []
+        if not isinstance(data, TrackArrays):
+            data = TrackArrays.from_track_points(data)
         use_timestamps = True  # always rely on coordinates_timestamp
 
         logging.info("ModeCtrl: ctrl_mode=0x01, move_mode=0x01   (start track)")
@@ -993,29 +1082,35 @@ class PiperTerminal:
         total_pts = len(data)
         last_pct = -10
 
-        started_at = time.time() if use_timestamps else None
-        first_ts: float = data[0].coordinates_timestamp if use_timestamps else 0.0
+        # Plain Python lists once per track – no per-sample objects in the loop
+        coords = data.coordinates.tolist()
+        offsets = (data.timestamps - data.timestamps[0]).tolist() if total_pts else []
+
+        sched = RateScheduler(hz)  # anchored now; offsets are relative to this
+        self._live_sched = sched
 
         paused_by_file = False  # remember state between iterations
         
-        for idx, tp in enumerate(data):
+        for idx in range(total_pts):
             if self._play_stop.is_set():
                 logging.info("[PLAY] Стоп запрошен – прерываем трек.")
                 break
+            self._live_progress = (idx + 1, total_pts)
 
             # ----- pause handling -----
             # (event-based pause removed)
 
             # Synchronize with original timing (best-effort) before gating
+            if sched.speed != self._speed_override:
+                sched.set_speed(self._speed_override)
             if use_timestamps:
-                target_offset = tp.coordinates_timestamp - first_ts
-                while True:
-                    run_time = time.time() - (started_at or 0.0)
-                    if run_time >= target_offset or self._play_stop.is_set():
-                        break
-                    time.sleep(0.001)
+                if not sched.wait_until(offsets[idx], abort=self._play_stop):
+                    logging.info("[PLAY] Стоп запрошен – прерываем трек.")
+                    break
+            else:
+                sched.wait()
 
-            self._send_point(arm, tp.coordinates)
+            self._send_point(arm, coords[idx])
 
             # # -------------------- accuracy gating --------------------
             # first_send_ts = time.time()
@@ -1069,26 +1164,32 @@ class PiperTerminal:
                 last_pct = pct
                 logging.info(f"[PLAY] progress {pct}% ({idx+1}/{total_pts})")
 
-            # External pause via pause.txt ----------------------------------------
-            if self._external_pause_active():
+            # External pause via pause.txt or control channel ------------------------
+            if self._pause_requested():
                 if not paused_by_file:
                     try:
                         arm.ModeCtrl(ctrl_mode=0x00, move_mode=0x00)
                     except Exception:
                         pass
                     paused_by_file = True
+                    self._live_paused = True
                     logging.debug("[PAUSE_FILE] Enter pause (track).")
-                while self._external_pause_active() and not self._play_stop.is_set():
-                    time.sleep(0.2)
-            if paused_by_file and not self._external_pause_active():
+                paused_at = time.perf_counter()
+                while self._pause_requested() and not self._play_stop.is_set():
+                    self._play_stop.wait(PAUSE_POLL_S)
+                # continue from the paused point instead of bursting to catch up
+                sched.shift(time.perf_counter() - paused_at)
+            if paused_by_file and not self._pause_requested():
                 try:
                     arm.ModeCtrl(ctrl_mode=0x01, move_mode=0x01, move_spd_rate_ctrl=50)
                 except Exception:
                     pass
                 paused_by_file = False
+                self._live_paused = False
                 logging.debug("[PAUSE_FILE] Resume (track).")
 
         arm.ModeCtrl(ctrl_mode=0x00, move_mode=0x00)
+        sched.log_summary("[PLAY]", level=logging.DEBUG)
         if self._play_stop.is_set():
             logging.info("[PLAY] Трек остановлен досрочно.")
         logging.info("ModeCtrl: ctrl_mode=0x00, move_mode=0x00   (end track)")
@@ -1152,9 +1253,9 @@ class PiperTerminal:
         return PiperTerminal._max_delta_and_joint_ignored(pt_a, pt_b)[0] <= tol
 
     @staticmethod
-    def _load(full_name: str) -> List[TrackPoint]:
-        """Load trajectory as list of TrackPoint objects."""
-        return TrackBase.read_track(full_name).track_points
+    def _load(full_name: str) -> TrackArrays:
+        """Load trajectory as struct-of-arrays (indexable like List[TrackPoint])."""
+        return TrackBase.read_track(full_name).arrays
 
     # --- New helper: load *.details.json for a track (may be absent) --------------
     @staticmethod
@@ -1186,14 +1287,9 @@ class PiperTerminal:
     def play_tracks(self, *tracks: str):
         """Play one or more tracks sequentially (blocking call).
 
-        Stores the playing thread reference so that `stop_play()` can join it from outside.
+        `stop_play(wait=True)` from another thread returns once this call does.
         """
-        try:
-            self.cmd_play(*tracks)
-        finally:
-            # Ensure flags reset even on exception
-            self._play_thread = None
-            self._play_stop.set()
+        self.cmd_play(*tracks)
 
     def is_recording(self) -> bool:
         """Return True if a recording thread is currently active."""
@@ -1203,14 +1299,53 @@ class PiperTerminal:
         """Return True if a playing thread is currently active."""
         return self._play_thread is not None and self._play_thread.is_alive()
 
-    def stop_play(self):
-        """Stop the current playing session (if any)."""
-        self._play_stop.set()
-        # Join from a different thread only
-        if self._play_thread and self._play_thread is not threading.current_thread():
-            self._play_thread.join()
+    def pause_play(self):
+        """Pause playback at the next control tick (same effect as pause.txt = 1)."""
+        self._play_pause.set()
+        logging.info("[CTRL] pause")
+
+    def resume_play(self):
+        """Resume playback paused by pause_play()."""
+        self._play_pause.clear()
+        logging.info("[CTRL] resume")
+
+    def set_speed_override(self, factor: float):
+        """Playback rate multiplier applied live on top of track params (1.0 – as planned)."""
+        factor = float(factor)
+        if not 0.05 <= factor <= 3.0:
+            raise ValueError("speed override must be within 0.05..3.0")
+        self._speed_override = factor
+        logging.info(f"[CTRL] speed override ×{factor:g}")
+
+    def _pause_requested(self) -> bool:
+        return self._play_pause.is_set() or self._external_pause_active()
+
+    def _begin_play(self) -> None:
+        self._play_stop.clear()
+        self._play_done.clear()
+        self._play_thread = threading.current_thread()
+
+    def _end_play(self) -> None:
         self._play_thread = None
+        self._live_paused = False
+        self._play_stop.set()
+        self._play_done.set()
+
+    def stop_play(self, wait: bool = False, timeout: Optional[float] = None) -> bool:
+        """Stop the current playing session (if any) at the next control tick.
+
+        Only raises the flags – safe to call from the control channel while
+        the executor thread is playing. *wait* blocks until the play command
+        has returned (never from the playing thread itself); returns False
+        if that did not happen within *timeout*.
+        """
+        self._play_stop.set()
+        self._play_pause.clear()
+        done = True
+        if wait and self._play_thread is not threading.current_thread():
+            done = self._play_done.wait(timeout)
         logging.info("✓ Воспроизведение остановлено.")
+        return done
 
     def shutdown(self):
         """Cleanup resources (disconnect CAN) – call when GUI exits."""
@@ -1225,6 +1360,7 @@ class PiperTerminal:
 
     # --------------------------------- цикл ввода ------------------------------------------------------
     def repl(self):
+        enable_history()
         logging.info(
             "Piper terminal v2. help – список команд. Ctrl+D/Ctrl+C – выход."
         )
@@ -1413,69 +1549,261 @@ class PiperTerminal:
         if not tracks:
             logging.info("play_v2: требуется >=1 трек")
             return
-        self._play_stop.clear()
-        self._play_thread = threading.current_thread()
-
-        # Safety pre-checks (reuse existing helpers)
-        arm0 = self._arm_from_name(tracks[0])
-        arm0_can = self._arm_can_from_name(tracks[0])
-        # res = self._maybe_reset_from_safe_pose_and_move_to_0(arm0, arm0_can)
-        # if not res.ok:
-        #     logging.error(f"[PLAY_V2] Предусловия безопасности не выполнены: {res.error}")
-        #     return
-
-        # Move to first control point if needed
-        first_pts_obj = TrackBase.read_track(tracks[0])
-        if not isinstance(first_pts_obj, TrackV3Timed):
-            logging.error("[PLAY_V2] Файл не является треком v3 (timed).")
-            return
-        first_pt = first_pts_obj.points[0]
-        if not self._is_close_ignored(self._current_point(arm0), first_pt):
-            logging.info("[PLAY_V2] Перемещаю робот в начальную точку…")
-            if not self._safe_move_smooth(arm0, first_pt, steps=25):
-                logging.error("[PLAY_V2] Движение к стартовой точке отменено (небезопасно).")
+        self._begin_play()
+        try:
+            # Safety pre-checks (reuse existing helpers)
+            arm0 = self._arm_from_name(tracks[0])
+            arm0_can = self._arm_can_from_name(tracks[0])
+            # res = self._maybe_reset_from_safe_pose_and_move_to_0(arm0, arm0_can)
+            # if not res.ok:
+            #     logging.error(f"[PLAY_V2] Предусловия безопасности не выполнены: {res.error}")
+            #     return
+
+            # Move to first control point if needed
+            first_pts_obj = TrackBase.read_track(tracks[0])
+            if not isinstance(first_pts_obj, TrackV3Timed):
+                logging.error("[PLAY_V2] Файл не является треком v3 (timed).")
                 return
-            time.sleep(0.2)
+            first_pt = first_pts_obj.points[0]
+            start_tol = first_pts_obj.playback.start_tolerance
+            if start_tol is None:
+                start_tol = TOLERANCE_ANGLE_UNITS
+            if not self._is_close_ignored(self._current_point(arm0), first_pt, tol=start_tol):
+                logging.info("[PLAY_V2] Перемещаю робот в начальную точку…")
+                if not self._move_smooth(arm0, first_pt, steps=25).ok:
+                    logging.error("[PLAY_V2] Движение к стартовой точке отменено (небезопасно).")
+                    return
+                time.sleep(0.2)
 
-        for i, full_name in enumerate(tracks):
-            if self._play_stop.is_set():
-                logging.info("[PLAY_V2] Стоп запрошен – прерываем воспроизведение после трека.")
-                break
+            for i, full_name in enumerate(tracks):
+                if self._play_stop.is_set():
+                    logging.info("[PLAY_V2] Стоп запрошен – прерываем воспроизведение после трека.")
+                    break
 
-            trk_obj = TrackBase.read_track(full_name)
-            if not isinstance(trk_obj, TrackV3Timed):
-                logging.error(f"[PLAY_V2] '{full_name}' не является треком v3 – пропускаю.")
-                continue
-            arm = self._arm_from_name(full_name)
-            logging.info(f"[PLAY_V2] {full_name} ({len(trk_obj.points)} pts)…")
-            self._run_timed_track(arm, trk_obj)
+                trk_obj = TrackBase.read_track(full_name)
+                if not isinstance(trk_obj, TrackV3Timed):
+                    logging.error(f"[PLAY_V2] '{full_name}' не является треком v3 – пропускаю.")
+                    continue
+                arm = self._arm_from_name(full_name)
+                logging.info(f"[PLAY_V2] {full_name} ({len(trk_obj.points)} pts)…")
+                self._live_track = full_name
+                self._run_timed_track(arm, trk_obj)
 
-            if self._play_stop.is_set():
-                logging.info("[PLAY_V2] Стоп запрошен – останавливаем дальнейшие треки.")
-                break
-            # if i < len(tracks) - 1:
-            #     logging.info(f"…пауза {DELAY_BETWEEN_TRACKS} c…")
-            #     for _ in range(DELAY_BETWEEN_TRACKS * 10):
-            #         if self._play_stop.is_set():
-            #             break
-            #         time.sleep(0.1)
-            #     if self._play_stop.is_set():
-            #         logging.info("[PLAY_V2] Стоп запрошен во время паузы – прерываем.")
-            #         break
+                if self._play_stop.is_set():
+                    logging.info("[PLAY_V2] Стоп запрошен – останавливаем дальнейшие треки.")
+                    break
+                # if i < len(tracks) - 1:
+                #     logging.info(f"…пауза {DELAY_BETWEEN_TRACKS} c…")
+                #     for _ in range(DELAY_BETWEEN_TRACKS * 10):
+                #         if self._play_stop.is_set():
+                #             break
+                #         time.sleep(0.1)
+                #     if self._play_stop.is_set():
+                #         logging.info("[PLAY_V2] Стоп запрошен во время паузы – прерываем.")
+                #         break
+
+            logging.info("✓ Воспроизведение v2 завершено.")
+        finally:
+            self._end_play()
 
-        logging.info("✓ Воспроизведение v2 завершено.")
-        self._play_thread = None
-        self._play_stop.set()
+    def play_plan_handle(self, *handles: PlanHandle):
+        """Play plans compiled by the orchestrator, straight from shared memory.
+
+        Counterpart of ``ArmProxy.play_plans``: each handle names a
+        shared-memory block with the setpoints (see shared_plan.py) and a label
+        like a track name (``left__…`` / ``right__…``) selecting the arm.
+        """
+        from demo.V2.manage.shared_plan import open_shared_plan
+
+        if not handles:
+            return
+        self._begin_play()
+        try:
+            for i, handle in enumerate(handles):
+                if self._play_stop.is_set():
+                    logging.info("[PLAY_PLAN] Стоп запрошен – прерываем воспроизведение.")
+                    break
+                arm = self._arm_from_name(handle.label)
+                with open_shared_plan(handle) as plan:
+                    if len(plan) == 0:
+                        logging.warning(f"[PLAY_PLAN] {handle.label}: пустой план – пропускаю.")
+                        continue
+                    if i == 0:
+                        first_pt = plan.targets[0].tolist()
+                        if not self._is_close_ignored(self._current_point(arm), first_pt):
+                            logging.info("[PLAY_PLAN] Перемещаю робот в начальную точку…")
+                            if not self._move_smooth(arm, first_pt, steps=25).ok:
+                                logging.error("[PLAY_PLAN] Движение к стартовой точке отменено (небезопасно).")
+                                return
+                            time.sleep(0.2)
+                    logging.info(f"[PLAY_PLAN] {handle.label} ({handle.rows} rows, {plan.duration:.2f}s, shm)…")
+                    self._live_track = handle.label
+                    self._run_plan(arm, plan)
+            logging.info("✓ Воспроизведение плана завершено.")
+        finally:
+            self._end_play()
 
     # Alias
     def cmd_p2(self, *args: str):
         """Alias for play_v2."""
         self.cmd_play_v2(*args)
 
+    @staticmethod
+    def _gripper_tight(trk: TrackV3Timed) -> float:
+        """Gripper tightening for *trk*: registry override or the global coefficient."""
+        override = trk.playback.gripper_tight
+        return GRIPPER_TIGHT_COEFFICEINT if override is None else float(override)
+
+    def cmd_playback(self, *args: str):
+        """Show or change per-track playback parameters (playback.json).
+
+        Usage:
+            playback                          – all tracks with non-default params
+            playback <track>                  – params + effective duration
+            playback <track> key=value ...    – set speed_up (0..0.9) / profile / gripper_tight / start_tolerance
+                                                (value 'none' resets to default)
+            playback reload                   – re-read playback.json now
+        """
+        if not args:
+            for name, prm in sorted(PLAYBACK.items().items()):
+                logging.info(f"[PLAYBACK] {name}: {prm.to_json()}")
+            return
+        if args[0] == "reload":
+            PLAYBACK.reload()
+            logging.info(f"[PLAYBACK] {len(PLAYBACK.items())} треков в {PLAYBACK_FILE.name}")
+            return
+        trk = TrackBase.read_track(args[0])
+        if not isinstance(trk, TrackV3Timed):
+            logging.error("[PLAYBACK] Файл не является треком v3 (timed).")
+            return
+        before = self._timed_duration(trk)
+        if len(args) > 1:
+            changes: Dict[str, Any] = {}
+            try:
+                for token in args[1:]:
+                    key, _, val = token.partition("=")
+                    if val.lower() == "none":
+                        changes[key] = None if key != "speed_up" else 0.0
+                    elif key == "profile":
+                        if val not in INTERPOLATION_PROFILES:
+                            raise ValueError(f"Неизвестный профиль '{val}'; доступны: {', '.join(INTERPOLATION_PROFILES)}")
+                        changes[key] = val
+                    elif key == "start_tolerance":
+                        changes[key] = int(val)
+                    else:
+                        changes[key] = float(val)
+                PLAYBACK.update(trk.name, **changes)
+            except (KeyError, ValueError) as exc:
+                logging.error(f"[PLAYBACK] {exc}")
+                return
+        after = self._timed_duration(trk)
+        logging.info(f"[PLAYBACK] {trk.name}: {trk.playback.to_json() or 'defaults'}")
+        if len(args) > 1:
+            logging.info(f"[PLAYBACK] длительность {before:.2f}s → {after:.2f}s")
+        else:
+            logging.info(f"[PLAYBACK] длительность {after:.2f}s")
+
+    def cmd_speed(self, *args: str):
+        """Set speed factor of a timed track: speed <track> <speed_up 0..0.9>."""
+        if len(args) != 2:
+            logging.info("speed: требуется <track> <speed_up>")
+            return
+        self.cmd_playback(args[0], f"speed_up={args[1]}")
+
+    def _timed_duration(self, trk: TrackV3Timed, hz: int = 50) -> float:
+        """Exact playback time of *trk* with current params (also warms the plan cache)."""
+        from demo.V2.manage.plan import compile_plan
+
+        if len(trk.points) < 2:
+            return 0.0
+        return compile_plan(trk, hz=hz, gripper_tight=self._gripper_tight(trk)).duration
+
+    def cmd_profile(self, *args: str):
+        """Show or set interpolation profile of a timed (v3) track.
+
+        Usage: profile <track> [linear|trapezoidal|min_jerk|spline]
+        """
+        if not args or len(args) > 2:
+            logging.info(f"profile: требуется <track> [{'|'.join(INTERPOLATION_PROFILES)}]")
+            return
+        trk = TrackBase.read_track(args[0])
+        if not isinstance(trk, TrackV3Timed):
+            logging.error("[PROFILE] Файл не является треком v3 (timed).")
+            return
+        if len(args) == 1:
+            logging.info(f"[PROFILE] {trk.name}: {trk.profile}")
+            return
+        if args[1] not in INTERPOLATION_PROFILES:
+            logging.error(f"[PROFILE] Неизвестный профиль '{args[1]}'; доступны: {', '.join(INTERPOLATION_PROFILES)}")
+            return
+        trk.set_profile(args[1])
+        logging.info(f"[PROFILE] {trk.name}: {trk.profile} → {args[1]}")
+
+    def cmd_retime(self, *args: str):
+        """Retime v3 tracks as fast as per-joint limits allow and report savings.
+
+        Usage: retime <t1> [t2 ...] [profile=<name>] [scale=<0..1>] [save]
+          profile – interpolation to retime for (default: the track's own;
+                    linear tracks are retimed and saved as trapezoidal);
+          scale   – share of joint limits to use (default 0.8);
+          save    – write result as <track>_rt.
+        """
+        from demo.V2.manage.retime import DEFAULT_LIMIT_SCALE, JointLimits, retime_report, retime_track, write_retimed
+
+        names = [a for a in args if "=" not in a and a != "save"]
+        opts = dict(a.split("=", 1) for a in args if "=" in a)
+        if not names:
+            logging.info("retime: требуется >=1 трек")
+            return
+        try:
+            scale = float(opts.get("scale", DEFAULT_LIMIT_SCALE))
+        except ValueError:
+            logging.error("[RETIME] scale должен быть числом")
+            return
+        limits = JointLimits.load().scaled(scale)
+        results = []
+        for name in names:
+            trk = TrackBase.read_track(name)
+            if not isinstance(trk, TrackV3Timed):
+                logging.warning(f"[RETIME] {name}: не трек v3 (timed) – пропуск")
+                continue
+            try:
+                results.append(retime_track(trk, limits, profile=opts.get("profile")))
+            except ValueError as exc:
+                logging.error(f"[RETIME] {name}: {exc}")
+        logging.info(f"[RETIME] limits: {limits.source}")
+        retime_report(results)
+        if "save" in args:
+            for res in results:
+                write_retimed(res)
+        return results
+
+    def cmd_limits(self, *args: str):
+        """Show joint velocity/acceleration limits used by retime; 'limits read [left|right]' – query arm."""
+        from demo.V2.manage.retime import LIMITS_FILE, JointLimits, read_limits_from_arm
+
+        if args and args[0] == "read":
+            side = args[1] if len(args) > 1 else "left"
+            arm = self.left_arm if side == "left" else self.right_arm
+            if arm is None:
+                logging.error(f"[LIMITS] Рука '{side}' не подключена.")
+                return
+            try:
+                limits = read_limits_from_arm(arm)
+            except Exception as exc:
+                logging.error(f"[LIMITS] Не удалось прочитать лимиты: {exc}")
+                return
+            limits.save()
+            logging.info(f"[LIMITS] сохранено → {LIMITS_FILE}")
+        limits = JointLimits.load()
+        logging.info(f"[LIMITS] source={limits.source}")
+        logging.info(f"  max_vel (0.001°/s): {[int(v) for v in limits.max_vel]}")
+        logging.info(f"  max_acc (0.001°/s²): {[int(a) for a in limits.max_acc]}")
+        return limits
+
     # ---------------------- timed track low-level ----------------------
     def _run_timed_track(self, arm, trk_obj: TrackV3Timed, hz: int = 50):
         points = trk_obj.points
-        durations = trk_obj.durations
         if len(points) == 0:
             logging.warning("[PLAY_V2] Трек пуст – ничего воспроизводить.")
             return
@@ -1490,51 +1818,78 @@ class PiperTerminal:
             logging.warning("[PLAY_V2] Трек содержит <2 точек – нечего воспроизводить.")
             return
 
+        from demo.V2.manage.plan import compile_plan
+
+        # Setpoints for the whole track are computed up-front (and cached);
+        # the timed loop below only indexes and sends.
+        plan = compile_plan(trk_obj, hz=hz, gripper_tight=self._gripper_tight(trk_obj))
+        self._run_plan(arm, plan, points)
+
+    def _run_plan(self, arm, plan: SetpointPlan, points: Optional[List[List[int]]] = None):
+        """Send the rows of a compiled *plan* on its rate grid.
+
+        Rows are read straight from the plan arrays, which may be views into a
+        shared-memory block (``play_plan_handle``). *points* – the track's
+        control points, only for progress logging.
+        """
+        targets = plan.targets
+        setpoints = plan.setpoints
+        seg_starts = plan.segment_starts.tolist()
+
         self._prepare_track_play(arm)
-        period = 1.0 / hz
-
-        for idx in range(1, len(points)):
-            start_pt = points[idx - 1]
-            end_pt = points[idx]
-            logging.info(f'playing point #{idx}: {end_pt}')
-            dur = float(durations[idx] * (1 - trk_obj.speed_up))  # duration associated with this target
-            steps = max(1, int(dur * hz))
-            diffs = [(e - s) / steps for s, e in zip(start_pt, end_pt)]
-
-            paused_by_file = False
-            for step in range(1, steps + 1):
-                pt = [int(start_pt[i] + diffs[i] * step) for i in range(7)]
-                # External pause file handling ---------------------------------
-                if self._external_pause_active():
-                    if not paused_by_file:
-                        # First detection – stop motion
-                        try:
-                            arm.ModeCtrl(ctrl_mode=0x00, move_mode=0x00)
-                        except Exception:
-                            pass
-                        paused_by_file = True
-                        logging.debug("[PAUSE_FILE] Enter pause (track).")
-                    # Stay in loop until unpaused or stop requested
-                    while self._external_pause_active() and not self._play_stop.is_set():
-                        time.sleep(0.2)
-                if paused_by_file and not self._external_pause_active():
-                    # Resume
+        # One grid for the whole track: segment boundaries don't accumulate drift
+        sched = RateScheduler(plan.hz)
+        self._live_sched = sched
+        planned_s = plan.duration
+        total_rows = len(plan)
+
+        seg = 0
+        paused_by_file = False
+        for row in range(total_rows):
+            if seg < len(seg_starts) and row == seg_starts[seg]:
+                seg += 1
+                if points is not None:
+                    logging.info(f'playing point #{seg}: {points[seg]}')
+                else:
+                    logging.info(f'playing segment #{seg}/{len(seg_starts)}')
+                paused_by_file = False
+            # External pause (file or control channel) -------------------
+            if self._pause_requested():
+                if not paused_by_file:
+                    # First detection – stop motion
                     try:
-                        arm.ModeCtrl(ctrl_mode=0x01, move_mode=0x01, move_spd_rate_ctrl=50)
+                        arm.ModeCtrl(ctrl_mode=0x00, move_mode=0x00)
                     except Exception:
                         pass
-                    paused_by_file = False
-                    logging.debug("[PAUSE_FILE] Resume (track).")
+                    paused_by_file = True
+                    self._live_paused = True
+                    logging.debug("[PAUSE_FILE] Enter pause (track).")
+                # Stay in loop until unpaused or stop requested
+                paused_at = time.perf_counter()
+                while self._pause_requested() and not self._play_stop.is_set():
+                    self._play_stop.wait(PAUSE_POLL_S)
+                sched.shift(time.perf_counter() - paused_at)
+            if paused_by_file and not self._pause_requested():
+                # Resume
+                try:
+                    arm.ModeCtrl(ctrl_mode=0x01, move_mode=0x01, move_spd_rate_ctrl=50)
+                except Exception:
+                    pass
+                paused_by_file = False
+                self._live_paused = False
+                logging.debug("[PAUSE_FILE] Resume (track).")
 
-                self._send_point(arm, pt)
-                if self._play_stop.is_set():
-                    logging.info("[PLAY_V2] Стоп запрошен – прерываю текущий сегмент.")
-                    break
-                time.sleep(period)
+            self._send_setpoint(arm, setpoints[row].tolist(), targets[row].tolist())
+            self._live_progress = (row + 1, total_rows)
             if self._play_stop.is_set():
+                logging.info("[PLAY_V2] Стоп запрошен – прерываю текущий сегмент.")
                 break
+            if sched.speed != self._speed_override:
+                sched.set_speed(self._speed_override)
+            sched.wait()
 
         arm.ModeCtrl(ctrl_mode=0x00, move_mode=0x00)
+        sched.log_summary("[PLAY_V2]", expected_s=planned_s)
         if self._play_stop.is_set():
             logging.info("[PLAY_V2] Трек остановлен досрочно.")
         logging.info("ModeCtrl: ctrl_mode=0x00, move_mode=0x00   (end track v2)")
@@ -1644,14 +1999,15 @@ class PiperTerminal:
         if isinstance(obj, TrackV3Timed):
             return sum(obj.durations)
         # legacy – use timestamp diff if available
-        if obj.track_points:
-            first = obj.track_points[0]
-            last = obj.track_points[-1]
-            return max(0.0, last.coordinates_timestamp - first.coordinates_timestamp)
+        ts = obj.timestamps
+        if ts:
+            return max(0.0, ts[-1] - ts[0])
         return None
 
     # --------------------------- Scene commands ---------------------------
     def cmd_scene_add(self, scene_name: str):
+        from demo.V2.manage.scene import Scene, SceneElement
+
         if not scene_name.startswith("scene__"):
             logging.error("Scene name must start with 'scene__'")
             return
@@ -1684,11 +2040,13 @@ class PiperTerminal:
         logging.info("[SCENE ADD] building RIGHT arm timeline – type 'done' to finish")
         right = _collect("RIGHT")
 
-        scene = Scene(name=scene_name, left=left, right=right)
+        scene = Scene(name=scene_name, arms={"left": left, "right": right})
         scene.save()
         logging.info(f"Scene saved → {scene.path}")
 
     def cmd_scene_show(self, scene_name: str):
+        from demo.V2.manage.scene import Scene
+
         try:
             scene = Scene.load(scene_name)
         except Exception as exc:
@@ -1713,6 +2071,8 @@ class PiperTerminal:
                     t_cursor += dur
 
     def cmd_scene_play(self, scene_name: str):
+        from demo.V2.manage.scene import Scene
+
         try:
             scene = Scene.load(scene_name)
         except Exception as exc:
@@ -1746,8 +2106,7 @@ class PiperTerminal:
                 if isinstance(track_obj, TrackV3Timed):
                     self._run_timed_track(arm, track_obj)
                 else:
-                    data = track_obj.track_points
-                    self._run_track(arm, data)
+                    self._run_track(arm, track_obj.arrays)
 
         left_thread = threading.Thread(target=_worker, args=(scene.left, "left"), daemon=True)
         right_thread = threading.Thread(target=_worker, args=(scene.right, "right"), daemon=True)
@@ -2034,5 +2393,6 @@ class PiperTerminal:
 
 # -------------------------------------------------------------------- MAIN
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     terminal = PiperTerminal()
     terminal.repl()
@@ -1,4 +1,6 @@
-from demo.V2.manage.terminal_v2 import PiperTerminal
+import logging
+
+from demo.V2.manage.terminal_v2 import LOG_FORMAT, PiperTerminal
 from demo.V2.settings import CAN_LEFT
 
 
@@ -16,4 +18,5 @@ class PiperTerminalLeft(PiperTerminal):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     PiperTerminalLeft().repl() 
\ No newline at end of file
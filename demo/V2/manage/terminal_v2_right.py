@@ -1,4 +1,6 @@
-from demo.V2.manage.terminal_v2 import PiperTerminal
+import logging
+
+from demo.V2.manage.terminal_v2 import LOG_FORMAT, PiperTerminal
 from demo.V2.settings import CAN_RIGHT
 
 
@@ -11,4 +13,5 @@ class PiperTerminalRight(PiperTerminal):
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
     PiperTerminalRight().repl() 
\ No newline at end of file
@@ -7,64 +7,115 @@ from __future__ import annotations
 import logging
 import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
 from typing import List, Optional, Any, cast, Dict, Tuple
 
-from demo.V2.manage.arm_ipc import ArmProxy
-from demo.V2.settings import CAN_LEFT, CAN_RIGHT
+from demo.V2.manage.arm_ipc import ArmProxy, ArmSupervisor
+from demo.V2.manage.arm_registry import ArmRegistry
+from demo.V2.manage.fanout import FanOut, start_skew_ms
+from demo.V2.manage.pipeline import OrderPipeline
 
 # для автоподстановки файлов
 from demo.V2.manage.terminal_v2 import (
     _track_path,  # noqa: F401 – re-export для совместимости
     TRACK_DIR,
     PiperTerminal as _InnerTerminal,  # типы для подсказок
+    enable_history,
 )
 
 
 class PiperTerminalV3:
-    """Orchestrator REPL: управляет двумя ArmProxy (LEFT/RIGHT).
+    """Orchestrator REPL: по одному ArmProxy на каждую руку из реестра.
 
     Команды совпадают с PiperTerminal v2, но внутренняя работа выполняется в
-    отдельных процессах, поэтому GIL не блокирует вторую руку.
+    отдельных процессах, поэтому GIL не блокирует другие руки. Набор рук –
+    ``arm_registry.ArmRegistry.load()`` (по умолчанию LEFT/RIGHT из settings).
     """
 
-    def __init__(self) -> None:
-        self.left: Optional[ArmProxy] = None
-        self.right: Optional[ArmProxy] = None
+    def __init__(self, registry: Optional[ArmRegistry] = None) -> None:
+        self._registry = registry or ArmRegistry.load()
+        self.arms: Dict[str, ArmProxy] = {}
         # Default duration for hybrid (r2) recording when user presses Enter
         self._default_duration: float = 2.0
         # store last 10 entered commands for quick repeat ("_", "__", ...)
         self._cmd_history: list[str] = []
-        if CAN_LEFT is not None:
-            self.left = ArmProxy(CAN_LEFT, side="left")
-            logging.info("Left arm proxy ready (%s)", CAN_LEFT)
-        if CAN_RIGHT is not None:
-            self.right = ArmProxy(CAN_RIGHT, side="right")
-            logging.info("Right arm proxy ready (%s)", CAN_RIGHT)
+        # Set by stop_play / Ctrl+C: scene timelines stop before their next element
+        self._stop_event = threading.Event()
+        # Order queue (cmd_order), created on first use
+        self._pipeline: Optional[OrderPipeline] = None
+        # All workers are spawned first and initialise in parallel; then we
+        # wait for each to report ready (CAN connected) and log the phases.
+        t0 = time.perf_counter()
+        for spec in self._registry:
+            self.arms[spec.name] = ArmProxy(spec.can, side=spec.name, standby=True, cpu=spec.cpu)
+        for name, proxy in self.arms.items():
+            if not proxy.wait_ready():
+                logging.error("%s arm worker (%s) not ready – commands will queue", name.upper(), proxy.can_name)
+                continue
+            rep = proxy.startup_report()
+            logging.info(
+                "%s arm proxy ready (%s) in %.0f ms [%s]",
+                name.upper(),
+                proxy.can_name,
+                (rep["ready_s"] or 0.0) * 1000,
+                ", ".join(f"{k} {v * 1000:.0f}" for k, v in rep["phases"].items()),
+            )
+        logging.info("[STARTUP] arms ready in %.0f ms", (time.perf_counter() - t0) * 1000)
+        # Heartbeat watchdog: a dead/hung worker is swapped for its warm standby
+        self._supervisor = ArmSupervisor(dict(self.arms))
+        self._supervisor.start()
+        # Broadcast commands go to all arms concurrently
+        self._fanout = FanOut(self.arms)
 
     # --------------------- util helpers ---------------------
+    @property
+    def left(self) -> Optional[ArmProxy]:
+        return self.arms.get("left")
+
+    @property
+    def right(self) -> Optional[ArmProxy]:
+        return self.arms.get("right")
+
     def _proxy_for_track(self, name: str) -> ArmProxy:
         name = self._canon_name(name)
-        if name.startswith("left__"):
-            if not self.left:
-                raise RuntimeError("Left arm not initialised")
-            return self.left
-        if name.startswith("right__"):
-            if not self.right:
-                raise RuntimeError("Right arm not initialised")
-            return self.right
-        raise ValueError("track name must start with left__ or right__")
+        arm = self._registry.arm_for_track(name)
+        if arm is None:
+            raise ValueError(f"track name must start with <arm>__ ({', '.join(self._registry.names)})")
+        if arm not in self.arms:
+            raise RuntimeError(f"{arm} arm not initialised")
+        return self.arms[arm]
+
+    def _tracks_by_arm(self, tracks: Tuple[str, ...]) -> Optional[Dict[str, List[str]]]:
+        """Canonical track names grouped by arm (in order); None if a name is invalid."""
+        per_arm: Dict[str, List[str]] = {}
+        for t in (self._canon_name(t) for t in tracks):
+            arm = self._registry.arm_for_track(t)
+            if arm is None:
+                logging.error("Неверное имя трека %s", t)
+                return None
+            per_arm.setdefault(arm, []).append(t)
+        return per_arm
 
-    def _call_both(self, method: str, *args, **kwargs):
-        """Invoke *method* on both proxies if they exist (fire-and-forget)."""
-        for proxy in (self.left, self.right):
-            if proxy is None:
-                continue
+    @staticmethod
+    def _wait_all(futures: List[Future]) -> List[Any]:
+        """Wait for proxy calls started with call_async; errors are logged, not raised."""
+        results: List[Any] = []
+        for fut in futures:
             try:
-                getattr(proxy, method)(*args, **kwargs)
+                results.append(fut.result())
             except Exception:
-                # Логируем, но продолжаем – команды могут быть специфичны для руки
-                logging.debug("proxy error", exc_info=True)
+                logging.exception("proxy call failed")
+                results.append(None)
+        return results
+
+    def _call_both(self, method: str, *args, **kwargs):
+        """Invoke *method* on all proxies concurrently and wait for all of them.
+
+        Errors are logged per arm, not raised – команды могут быть специфичны
+        для руки. Returns ``{arm: ArmResult}``.
+        """
+        return self._fanout.call(method, *args, **kwargs)
 
     # --------------------- commands (delegation) ---------------------
     def cmd_record(self, *args):
@@ -144,49 +195,31 @@ class PiperTerminalV3:
             logging.info("play: требуется >=1 трек")
             return
         # Группируем треки по рукам
-        tracks = tuple(self._canon_name(t) for t in tracks)
-        left_tracks: List[str] = []
-        right_tracks: List[str] = []
-        for t in tracks:
-            if t.startswith("left__"):
-                left_tracks.append(t)
-            elif t.startswith("right__"):
-                right_tracks.append(t)
-            else:
-                logging.error("Неверное имя трека %s", t)
-                return
-        threads = []
-        if left_tracks and self.left:
-            threads.append(threading.Thread(target=self.left.cmd_play, args=left_tracks, daemon=True))
-        if right_tracks and self.right:
-            threads.append(threading.Thread(target=self.right.cmd_play, args=right_tracks, daemon=True))
-        for t in threads:
-            t.start()
-        for t in threads:
-            t.join()
+        per_arm = self._tracks_by_arm(tracks)
+        if per_arm is None:
+            return
+        futures = [self.arms[arm].call_async("cmd_play", *ts) for arm, ts in per_arm.items() if arm in self.arms]
+        self._wait_all(futures)
 
     # alias
     cmd_p = cmd_play  # type: ignore[assignment]
 
-    def cmd_play_parallel(self, left_track: str = "", right_track: str = ""):
-        if not left_track or not right_track:
-            logging.info("pp: нужно 2 трека – левый и правый")
-            return
-        left_track = self._canon_name(left_track)
-        right_track = self._canon_name(right_track)
-        if not (left_track.startswith("left__") and right_track.startswith("right__")):
-            logging.error("pp: треки должны начинаться с left__/right__")
-            return
-        th_left = threading.Thread(target=self.left.cmd_play, args=(left_track,), daemon=True) if self.left else None
-        th_right = threading.Thread(target=self.right.cmd_play, args=(right_track,), daemon=True) if self.right else None
-        if th_left:
-            th_left.start()
-        if th_right:
-            th_right.start()
-        if th_left:
-            th_left.join()
-        if th_right:
-            th_right.join()
+    def cmd_play_parallel(self, *tracks: str):
+        """Одновременный старт: pp <track> <track> [...] – по одному треку на руку."""
+        if len(tracks) < 2:
+            logging.info("pp: нужно ≥2 трека – по одному на руку")
+            return
+        per_arm = self._tracks_by_arm(tracks)
+        if per_arm is None:
+            return
+        if any(len(ts) > 1 for ts in per_arm.values()):
+            logging.error("pp: по одному треку на каждую руку")
+            return
+        # Barrier: all workers start on the same instant, not one IPC latency apart
+        results = self._fanout.call("cmd_play", barrier=True, args_by_arm={arm: ts for arm, ts in per_arm.items()})
+        skew = start_skew_ms(results)
+        if skew is not None:
+            logging.info("pp: start skew %.2f ms", skew)
 
     # alias
     cmd_pp = cmd_play_parallel  # type: ignore[assignment]
@@ -196,30 +229,163 @@ class PiperTerminalV3:
         if not tracks:
             logging.info("play_v2: требуется >=1 трек")
             return
-        tracks = tuple(self._canon_name(t) for t in tracks)
-        left_tracks: List[str] = []
-        right_tracks: List[str] = []
-        for t in tracks:
-            if t.startswith("left__"):
-                left_tracks.append(t)
-            elif t.startswith("right__"):
-                right_tracks.append(t)
-            else:
-                logging.error("Неверное имя трека %s", t)
-                return
-        th: List[threading.Thread] = []
-        if left_tracks and self.left:
-            th.append(threading.Thread(target=self.left.cmd_play_v2, args=left_tracks, daemon=True))
-        if right_tracks and self.right:
-            th.append(threading.Thread(target=self.right.cmd_play_v2, args=right_tracks, daemon=True))
-        for t in th:
-            t.start()
-        for t in th:
-            t.join()
+        per_arm = self._tracks_by_arm(tracks)
+        if per_arm is None:
+            return
+        futures = [self.arms[arm].call_async("cmd_play_v2", *ts) for arm, ts in per_arm.items() if arm in self.arms]
+        self._wait_all(futures)
 
     # alias
     cmd_p2 = cmd_play_v2  # type: ignore[assignment]
 
+    def cmd_play_plan(self, *tracks: str):
+        """Как play_v2, но планы компилируются здесь и передаются рукам через shared memory.
+
+        Usage: play_plan <t1> [t2 ...]  (timed v3 tracks; arms play in parallel)
+        """
+        from demo.V2.manage.plan import compile_plan
+        from demo.V2.manage.track import TrackBase, TrackV3Timed
+
+        if not tracks:
+            logging.info("play_plan: требуется >=1 трек")
+            return
+        names = self._tracks_by_arm(tracks)
+        if names is None:
+            return
+        per_arm: Dict[str, List[Tuple[str, Any]]] = {}
+        for arm, arm_tracks in names.items():
+            for t in arm_tracks:
+                trk = TrackBase.read_track(t)
+                if not isinstance(trk, TrackV3Timed):
+                    logging.error("play_plan: '%s' не является треком v3", t)
+                    return
+                plan = compile_plan(trk, gripper_tight=_InnerTerminal._gripper_tight(trk))
+                per_arm.setdefault(arm, []).append((t, plan))
+        futures = [self.arms[arm].play_plans(*plans) for arm, plans in per_arm.items() if arm in self.arms]
+        self._wait_all(futures)
+
+    # ----------------------- out-of-band playback control -----------------------
+    def _proxies_for(self, side: str = "all") -> List[ArmProxy]:
+        if self._norm_side(side) == "all":
+            return list(self.arms.values())
+        arm = self._registry.resolve(side)
+        return [self.arms[arm]] if arm in self.arms else []
+
+    def cmd_stop_play(self, side: str = "all"):
+        """Остановить воспроизведение (через управляющий канал, не ждёт трек): stop_play [<arm>|all]."""
+        self._stop_event.set()
+        for proxy in self._proxies_for(side):
+            proxy.stop_play()
+
+    def cmd_pause(self, side: str = "all"):
+        """Пауза воспроизведения на ближайшем такте: pause [<arm>|all]."""
+        for proxy in self._proxies_for(side):
+            proxy.pause()
+
+    def cmd_resume(self, side: str = "all"):
+        """Продолжить после pause: resume [<arm>|all]."""
+        for proxy in self._proxies_for(side):
+            proxy.resume()
+
+    def cmd_override(self, factor: str, side: str = "all"):
+        """Живой множитель скорости воспроизведения: override <0.05..3> [<arm>|all]."""
+        try:
+            value = float(factor)
+        except ValueError:
+            logging.error("override: множитель должен быть числом")
+            return
+        for proxy in self._proxies_for(side):
+            proxy.set_speed(value)
+
+    def cmd_live(self, side: str = "all"):
+        """Живое состояние рук из shared memory (без IPC): live [<arm>|all]."""
+        for proxy in self._proxies_for(side):
+            st = proxy.live_state()
+            label = proxy.side.upper()
+            if not st["seq"]:
+                logging.info("%s: no live data yet", label)
+                continue
+            flags = [k for k in ("playing", "paused", "recording", "hybrid_recording") if st[k]] or ["idle"]
+            logging.info(
+                "%s %s | %s %s %d/%d | jitter %.2f ms (max %.2f) | age %.0f ms",
+                label,
+                st["joints"],
+                ",".join(flags),
+                st["track"] or "-",
+                st["progress"],
+                st["total"],
+                st["jitter_ms"],
+                st["max_jitter_ms"],
+                (st["age_s"] or 0.0) * 1000,
+            )
+            logging.info(
+                "%s rpm %s | mA %s | temp motor %s foc %s",
+                label,
+                st["motor_speed_rpm"],
+                st["motor_current_ma"],
+                st["motor_temp_c"],
+                st["foc_temp_c"],
+            )
+
+    def cmd_workers(self, *args: str):
+        """Состояние процессов рук и счётчики перезапусков: workers [restart <arm>]."""
+        if args and args[0] == "restart":
+            arm = self._registry.resolve(args[1]) if len(args) > 1 else None
+            proxies = self._proxies_for(arm) if arm else []
+            if not proxies:
+                logging.error("workers restart: укажите руку (%s)", ", ".join(self.arms))
+                return
+            for proxy in proxies:
+                proxy.failover("manual restart")
+            return
+        for side, st in self._supervisor.stats().items():
+            logging.info(
+                "%s pid=%s alive=%s hb=%sms | standby pid=%s alive=%s | restarts=%d (failures %d, standby respawns %d)"
+                " last: %s %sms",
+                side.upper(),
+                st["pid"],
+                st["alive"],
+                st["heartbeat_age_ms"],
+                st["standby_pid"],
+                st["standby_alive"],
+                st["restarts"],
+                st["detected_failures"],
+                st["standby_respawns"],
+                st["last_restart_reason"] or "-",
+                st["last_failover_ms"] if st["last_failover_ms"] is not None else "-",
+            )
+
+    def cmd_telemetry(self, *args: str):
+        """Поток телеметрии из процессов рук (без второго подключения к CAN):
+        telemetry [<arm>|all] [channels=foc_temp_c,motor_temp_c] [hz=1] [secs=10]; Ctrl+C – стоп."""
+        from demo.V2.manage.telemetry import STREAM_CHANNELS
+
+        opts = dict(a.split("=", 1) for a in args if "=" in a)
+        side = next((a for a in args if "=" not in a), "all")
+        channels = [c for c in opts.get("channels", "").split(",") if c] or None
+        try:
+            hz = float(opts.get("hz", 1.0))
+            secs = float(opts["secs"]) if "secs" in opts else None
+            subs = [
+                (proxy.side.upper(), proxy.subscribe_telemetry(channels, hz=hz))
+                for proxy in self._proxies_for(side)
+            ]
+        except ValueError as exc:
+            logging.error("telemetry: %s (channels: %s)", exc, ", ".join(STREAM_CHANNELS))
+            return
+        deadline = time.monotonic() + secs if secs is not None else None
+        try:
+            while deadline is None or time.monotonic() < deadline:
+                for label, sub in subs:
+                    msg = sub.get(timeout=0.05)
+                    if msg is not None:
+                        logging.info("%s %s", label, " | ".join(f"{k} {v}" for k, v in sorted(msg["data"].items())))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for _label, sub in subs:
+                sub.close()
+
     # ----------------------- zero helpers routed to left arm -----------------------
     def cmd_r_0_pos(self):
         if self.left:
@@ -246,56 +412,42 @@ class PiperTerminalV3:
         """Reset arms.
 
         Usage:
-            reset all   – обе руки
-            reset left  – только левая
-            reset right – только правая
-        По умолчанию сбрасываются обе руки.
+            reset all   – все руки (параллельно)
+            reset <arm> – только указанная (left/right/…)
+        По умолчанию сбрасываются все руки.
         """
-        target = self._norm_side(target) or target.lower()
-        if target in {"all", "both"}:
+        if self._norm_side(target) == "all":
             self._call_both("cmd_reset")
             return
-        if target == "left":
-            if self.left:
-                self.left.cmd_reset()
-            else:
-                logging.warning("Left arm not initialised.")
-            return
-        if target == "right":
-            if self.right:
-                self.right.cmd_reset()
-            else:
-                logging.warning("Right arm not initialised.")
+        arm = self._registry.resolve(target)
+        if arm is None:
+            logging.error("reset: аргумент должен быть all или имя руки (%s)", ", ".join(self._registry.names))
             return
-        logging.error("reset: аргумент должен быть all/left/right")
+        if arm in self.arms:
+            self.arms[arm].cmd_reset()
+        else:
+            logging.warning("%s arm not initialised.", arm.capitalize())
 
     # --------------------------- Scene helpers ---------------------------
     def _track_duration(self, name: str) -> float | None:
-        """Return approximate duration of a track in seconds if known."""
+        """Return the playback duration of a track in seconds if known."""
+        from demo.V2.manage.scene_compiler import track_timing  # local import to avoid cycles
+
         try:
-            from demo.V2.manage.track import TrackBase, TrackV3Timed  # local import to avoid cycles
-            obj = TrackBase.read_track(name)
+            return track_timing(name)[0]
         except Exception:
             return None
-        if hasattr(obj, "durations"):
-            # TrackV3Timed
-            return sum(getattr(obj, "durations", []))
-        if getattr(obj, "track_points", None):
-            first = obj.track_points[0]
-            last = obj.track_points[-1]
-            return max(0.0, last.coordinates_timestamp - first.coordinates_timestamp)
-        return None
 
     # --------------------------- Scene commands ---------------------------
     def cmd_scene_add(self, scene_name: str):
         from demo.V2.manage.scene import Scene, SceneElement  # local import
+        from demo.V2.manage.scene_compiler import compile_scene
+
         scene_name = self._canon_name(scene_name)
         if not scene_name.startswith("scene__"):
             logging.error("Scene name must start with 'scene__'")
             return
 
-        logging.info("[SCENE ADD] building LEFT arm timeline – type 'done' to finish")
-
         def _collect(arm_name: str):
             out: list[SceneElement] = []
             while True:
@@ -313,105 +465,92 @@ class PiperTerminalV3:
                         out.append(SceneElement(type="pause", duration=dur))
                     except ValueError:
                         logging.warning("bad duration")
+                elif parts[0] in ("signal", "wait") and len(parts) == 2:
+                    out.append(SceneElement(type=parts[0], event=parts[1]))
+                elif parts[0] in ("acquire", "release") and len(parts) == 2:
+                    out.append(SceneElement(type=parts[0], resource=parts[1]))
                 else:
-                    logging.warning("unknown input; use 'track <name>' or 'pause <sec>' or 'done'")
+                    logging.warning(
+                        "unknown input; use 'track <name>', 'pause <sec>', 'signal <event>', 'wait <event>', "
+                        "'acquire <resource>', 'release <resource>' or 'done'"
+                    )
             return out
 
-        left_seq = _collect("LEFT")
-        logging.info("[SCENE ADD] building RIGHT arm timeline – type 'done' to finish")
-        right_seq = _collect("RIGHT")
+        arms: Dict[str, list[SceneElement]] = {}
+        for arm in self._registry.names:
+            logging.info("[SCENE ADD] building %s arm timeline – type 'done' to finish", arm.upper())
+            arms[arm] = _collect(arm.upper())
 
-        Scene(name=scene_name, left=left_seq, right=right_seq).save()
+        scene = Scene(name=scene_name, arms=arms)
+        try:
+            compile_scene(scene, timing=lambda _name, _hz: (0.0, None))  # handoff consistency only
+        except ValueError as exc:
+            logging.warning("[SCENE ADD] %s", exc)
+        scene.save()
         logging.info("Scene saved → %s", Path(f"scenes/{scene_name}.json"))
 
     def cmd_scene_show(self, scene_name: str):
+        """Абсолютное расписание сцены (точные длительности треков): scene_show <scene>."""
         from demo.V2.manage.scene import Scene
+        from demo.V2.manage.scene_compiler import compile_scene, log_schedule
+
         scene_name = self._canon_name(scene_name)
         try:
-            scene = Scene.load(scene_name)
+            compiled = compile_scene(Scene.load(scene_name))
         except Exception as exc:
             logging.error("Failed: %s", exc)
             return
+        log_schedule(compiled)
+        for arm, items in compiled.by_arm().items():
+            busy = sum(it.duration for it in items if it.kind == "track")
+            logging.info("%s busy %.2fs of %.2fs", arm.upper(), busy, compiled.makespan)
 
-        from typing import Any, cast, Dict, List, Tuple
-        tl = cast(Dict[str, List[Tuple[Any, float, float | None]]], scene.timeline_with_times())
-        for arm in ("left", "right"):
-            logging.info("--- %s ---", arm.upper())
-            t_cursor = 0.0
-            for item, start, _ in tl[arm]:
-                if item.type == "pause":
-                    dur = item.duration or 0
-                    logging.info("pause %ss  (t=%.2f→%.2f)", dur, start, start + dur)
-                    t_cursor += dur
-                else:
-                    dur = self._track_duration(item.name) or 0
-                    logging.info("track %s (%.2fs) (t=%.2f→%.2f)", item.name, dur, start, start + dur)
-                    t_cursor += dur
+    def _preflight(self, scenes: List[Any]) -> Optional[List[Any]]:
+        """Pre-flight *scenes* (preflight.py); problems are logged, None if any."""
+        from demo.V2.manage.preflight import PreflightError, preflight  # local import to avoid cycles
+
+        try:
+            return preflight(scenes)
+        except PreflightError as exc:
+            for problem in exc.problems:
+                logging.error("[PREFLIGHT] %s", problem)
+            logging.error("[PREFLIGHT] %d problem(s) – nothing started", len(exc.problems))
+        except Exception as exc:
+            logging.error("[PREFLIGHT] failed: %s", exc)
+        return None
+
+    def _load_scenes(self, scene_names: Tuple[str, ...]) -> Optional[List[Any]]:
+        from demo.V2.manage.scene import Scene  # local import to avoid cycles
+
+        scenes = []
+        for name in scene_names:
+            name = self._canon_name(name)
+            try:
+                scenes.append(Scene.load(name))
+            except Exception as exc:
+                logging.error("Failed to load scene '%s': %s", name, exc)
+                return None
+        return scenes
 
     def _scene_play_once(self, scene_name: str):
         """Play a single scene *scene_name* synchronously.
 
-        Internal helper used by cmd_scene_play to support sequential playback.
+        Every track is loaded, compiled and checked first (preflight.py) – a
+        missing or broken track rejects the scene before any arm moves – and
+        the scene then runs time-triggered on one monotonic clock, the workers
+        playing the plans from shared memory.
         """
-        from demo.V2.manage.scene import Scene, SceneElement  # local import to avoid cycles
-        scene_name = self._canon_name(scene_name)
-        try:
-            scene = Scene.load(scene_name)
-        except Exception as exc:
-            logging.error("Failed to load scene '%s': %s", scene_name, exc)
-            return
-
-        stop_flag = threading.Event()
+        scenes = self._load_scenes((scene_name,))
+        prepared = self._preflight(scenes) if scenes else None
+        if not prepared:
+            return None
+        return self._run_prepared(prepared[0])
 
-        def _worker(seq: list[SceneElement], proxy: Optional[ArmProxy]):
-            if proxy is None or not seq:
-                return
-            for el in seq:
-                if stop_flag.is_set():
-                    break
-                if el.type == "pause":
-                    # Respect external pause.txt (same semantics as in terminal_v2)
-                    target_dur = float(el.duration or 0)
-                    slept = 0.0
-                    chk = 0.2  # poll interval
-
-                    def _external_pause_active() -> bool:
-                        from pathlib import Path
-                        pf = Path(__file__).parent / "pause.txt"
-                        try:
-                            val = pf.read_text().strip()
-                            logging.debug("[PAUSE_FILE] scene check %s -> %r", pf, val)
-                            return val == "1"
-                        except Exception:
-                            return False
-
-                    while slept < target_dur and not stop_flag.is_set():
-                        if _external_pause_active():
-                            time.sleep(chk)
-                            continue  # do NOT accumulate
-                        step = min(chk, target_dur - slept)
-                        time.sleep(step)
-                        slept += step
-                    continue
-                track_name = el.name
-                if not track_name:
-                    continue
-                from demo.V2.manage.track import TrackBase, TrackV3Timed
-                trk_obj = TrackBase.read_track(track_name)
-                try:
-                    if isinstance(trk_obj, TrackV3Timed):
-                        proxy.cmd_play_v2(track_name)
-                    else:
-                        proxy.cmd_play(track_name)
-                except Exception:
-                    logging.exception("scene track play error")
+    def _run_prepared(self, prepared):
+        from demo.V2.manage.scene_compiler import SceneExecutor  # local import to avoid cycles
 
-        th_left = threading.Thread(target=_worker, args=(scene.left, self.left), daemon=True)
-        th_right = threading.Thread(target=_worker, args=(scene.right, self.right), daemon=True)
-        th_left.start()
-        th_right.start()
-        th_left.join()
-        th_right.join()
+        with prepared:
+            return SceneExecutor(self.arms, stop_event=self._stop_event).run(prepared.compiled, plans=prepared.handles)
 
     def cmd_scene_play(self, *scene_names: str):
         """Play one or several scenes sequentially.
@@ -419,30 +558,152 @@ class PiperTerminalV3:
         Usage:
             scene_play <scene1> [scene2 ...]
 
-        Scenes are executed back-to-back without extra delay; the next scene
-        starts immediately after the previous one completes.
+        All scenes are loaded and checked up front (preflight) – nothing moves
+        if any of them is broken. Scenes are executed back-to-back without
+        extra delay; the next scene starts immediately after the previous one
+        completes.
         """
         if not scene_names:
             logging.info("scene_play: требуется ≥1 имя сцены")
             return
 
-        for idx, sc_name in enumerate(scene_names, 1):
-            logging.info("[SCENE PLAY] %d/%d → %s", idx, len(scene_names), sc_name)
-            self._scene_play_once(sc_name)
+        scenes = self._load_scenes(scene_names)
+        prepared = self._preflight(scenes) if scenes else None
+        if not prepared:
+            return
+        self._stop_event.clear()
+        try:
+            for idx, ps in enumerate(prepared, 1):
+                if self._stop_event.is_set():
+                    logging.info("[SCENE PLAY] stop requested – remaining scenes skipped")
+                    break
+                logging.info("[SCENE PLAY] %d/%d → %s", idx, len(prepared), ps.compiled.name)
+                self._run_prepared(ps)
+        finally:
+            for ps in prepared:
+                ps.close()
+
+    def cmd_scene_check(self, *scene_names: str):
+        """Проверить сцены без движения (треки, стыки, handoff-ы): scene_check <scene> [scene ...]."""
+        if not scene_names:
+            logging.info("scene_check: требуется ≥1 имя сцены")
+            return
+        scenes = self._load_scenes(scene_names)
+        prepared = self._preflight(scenes) if scenes else None
+        for ps in prepared or []:
+            logging.info("[PREFLIGHT] %s ok – makespan %.2fs", ps.compiled.name, ps.compiled.makespan)
+            ps.close()
+
+    # --------------------------- Recipe commands ---------------------------
+    def _recipe_schedule(self, recipe_name: str):
+        from demo.V2.manage.recipe import Recipe, schedule_recipe  # local import to avoid cycles
+
+        recipe_name = self._canon_name(recipe_name)
+        try:
+            return schedule_recipe(Recipe.load(recipe_name), arms=self._registry.names)
+        except Exception as exc:
+            logging.error("Failed to schedule recipe '%s': %s", recipe_name, exc)
+            return None
+
+    def cmd_recipe_plan(self, recipe_name: str, scene_name: str = ""):
+        """Расставить задачи рецепта по рукам: recipe_plan <recipe> [scene].
+
+        Печатает расписание и критический путь; сохраняет сцену
+        (по умолчанию scene__<recipe>), которую можно запустить scene_play.
+        """
+        sched = self._recipe_schedule(recipe_name)
+        if sched is None:
+            return
+        logging.info("[RECIPE] %s: %d tasks, makespan %.2fs", sched.recipe.name, len(sched.slots), sched.makespan)
+        for arm, slots in sched.by_arm().items():
+            busy = sum(s.duration for s in slots)
+            logging.info("--- %s (busy %.2fs) ---", arm.upper(), busy)
+            for s in slots:
+                logging.info("  %8.2f → %8.2f  %-16s %s", s.start, s.end, s.task, s.track)
+        path = sched.critical_path()
+        logging.info(
+            "[RECIPE] critical path (%.2fs): %s",
+            sum(s.duration for s in path),
+            " → ".join(f"{s.task}[{s.arm} {s.duration:.2f}s]" for s in path),
+        )
+        base = sched.recipe.name.split("__", 1)[-1]
+        scene = sched.to_scene(self._canon_name(scene_name) if scene_name else f"scene__{base}")
+        scene.save()
+        logging.info("Scene saved → %s", Path(f"scenes/{scene.name}.json"))
+        return sched
+
+    def cmd_recipe_play(self, recipe_name: str):
+        """Спланировать рецепт и сразу выполнить полученную сцену: recipe_play <recipe>."""
+        sched = self._recipe_schedule(recipe_name)
+        if sched is None:
+            return None
+        prepared = self._preflight([sched.to_scene(f"scene__{sched.recipe.name.split('__', 1)[-1]}")])
+        if not prepared:
+            return None
+        self._stop_event.clear()
+        return self._run_prepared(prepared[0])
+
+    # --------------------------- Order pipeline ---------------------------
+    def cmd_order(self, *scene_names: str):
+        """Поставить заказы в очередь (выполняются в фоне, с перекрытием): order <scene> [scene ...].
+
+        Соседние заказы перекрываются там, где позволяют таймлайны рук и
+        общие ресурсы (acquire/release в сценах), см. pipeline.py.
+        """
+        if not scene_names:
+            logging.info("order: требуется ≥1 имя сцены")
+            return
+        if self._pipeline is None:
+            self._pipeline = OrderPipeline(self.arms, stop_event=self._stop_event)
+        self._stop_event.clear()
+        for name in scene_names:
+            order = self._pipeline.submit(self._canon_name(name))
+            logging.info("[PIPELINE] order %d queued → %s", order.id, order.scene)
+        self._pipeline.start()
+
+    def cmd_orders(self):
+        """Очередь заказов, dishes/hour и задержка заказов: orders."""
+        if self._pipeline is None:
+            logging.info("[PIPELINE] no orders yet")
+            return
+        st = self._pipeline.stats()
+        logging.info(
+            "[PIPELINE] done %d, failed %d, queued %d | %s dishes/h | latency avg %s, max %s",
+            st["done"],
+            st["failed"],
+            st["queued"],
+            f"{st['dishes_per_hour']:.1f}" if st["dishes_per_hour"] else "-",
+            f"{st['latency_avg_s']:.1f}s" if st["latency_avg_s"] is not None else "-",
+            f"{st['latency_max_s']:.1f}s" if st["latency_max_s"] is not None else "-",
+        )
+        for o in self._pipeline.history[-10:]:
+            logging.info(
+                "  #%d %-24s %s latency %s cook %s",
+                o.id,
+                o.scene,
+                "ok    " if o.ok else "FAILED",
+                f"{o.latency_s:.1f}s" if o.latency_s is not None else "-",
+                f"{o.cook_s:.1f}s" if o.cook_s is not None else "-",
+            )
+        for o in self._pipeline.pending():
+            logging.info("  #%d %-24s queued", o.id, o.scene)
 
     # ----------------------- generic fallback -----------------------
     def __getattr__(self, item):
-        """If method unknown, try to broadcast to both proxies."""
-        def _wrapper(*args, **kwargs):
-            for proxy in (self.left, self.right):
-                if proxy is None:
-                    continue
-                if hasattr(proxy, item):
-                    try:
-                        return getattr(proxy, item)(*args, **kwargs)
-                    except Exception:
-                        logging.debug("proxy %s.%s failed", proxy, item, exc_info=True)
+        """If method unknown, broadcast it to all proxies concurrently.
+
+        Returns the arm's result with one arm, ``{arm: result}`` with several;
+        AttributeError if no arm accepted the call.
+        """
+        if item.startswith("_"):
             raise AttributeError(item)
+
+        def _wrapper(*args, **kwargs):
+            results = self._fanout.call(item, *args, **kwargs)
+            ok = {arm: res.result for arm, res in results.items() if res.ok}
+            if not ok:
+                raise AttributeError(item)
+            return next(iter(ok.values())) if len(results) == 1 else ok
         return _wrapper
 
     # ----------------------- alias helper -----------------------
@@ -461,7 +722,7 @@ class PiperTerminalV3:
     # ----------------- name canonicalisation -----------------
     @staticmethod
     def _canon_name(name: str) -> str:
-        """Convert short prefixes (l_, r_, scene_) to canonical double-underscore form."""
+        """Convert short prefixes (l_, r_, scene_, recipe_) to canonical double-underscore form."""
         if name.startswith("l_"):
             return "left__" + name[2:]
         if name.startswith("left_"):
@@ -472,6 +733,8 @@ class PiperTerminalV3:
             return "right__" + name[6:]
         if name.startswith("scene_") and not name.startswith("scene__"):
             return "scene__" + name[6:]
+        if name.startswith("recipe_") and not name.startswith("recipe__"):
+            return "recipe__" + name[7:]
         return name
 
     # ----------------------- new get/set commands -----------------------
@@ -479,31 +742,29 @@ class PiperTerminalV3:
         """Получить текущие координаты.
 
         Использование:
-            get                         – вывести coords обеих рук
-            get <side>                  – вывести coords указанной руки (left/right)
+            get                         – вывести coords всех рук
+            get <side>                  – вывести coords указанной руки (left/right/…)
             get <side> <joint_idx>      – coords конкретного сустава
         """
         if not args:
-            # both arms full coords
-            for label, proxy in (("LEFT", self.left), ("RIGHT", self.right)):
-                if proxy is None:
-                    continue
+            # all arms full coords
+            for arm, proxy in self.arms.items():
                 try:
                     coords = proxy.cmd_get()
-                    logging.info("%s %s", label, coords)
+                    logging.info("%s %s", arm.upper(), coords)
                 except Exception:
-                    logging.exception("[GET] proxy error (%s)", label)
+                    logging.exception("[GET] proxy error (%s)", arm.upper())
             return
 
-        side_norm = self._norm_side(args[0]) if args else None
-        if side_norm is None:
-            logging.error("[GET] first arg must be l/left or r/right")
+        side = self._registry.resolve(args[0])
+        if side is None:
+            logging.error("[GET] first arg must be an arm: %s", ", ".join(self._registry.names))
             return
-        side = side_norm
-        proxy = self.left if side == "left" else self.right
+        proxy = self.arms.get(side)
         if proxy is None:
             logging.error("[GET] %s arm not initialised", side.upper())
             return
+        slot = self._registry[side].slot
         if len(args) == 1:
             # full coords for side
             try:
@@ -511,8 +772,8 @@ class PiperTerminalV3:
             except Exception:
                 logging.exception("[GET] proxy error")
                 return
-            # Worker returns dict {"left": .., "right": ..}
-            coords = res.get(side) if isinstance(res, dict) else res
+            # Worker returns dict {"left": .., "right": ..} keyed by its terminal slot
+            coords = res.get(slot) if isinstance(res, dict) else res
             logging.info("%s %s", side.upper(), coords)
             return
         if len(args) == 2:
@@ -522,7 +783,7 @@ class PiperTerminalV3:
             except Exception:
                 logging.exception("[GET] failed to get joint")
                 return
-            val = res.get(side) if isinstance(res, dict) else res
+            val = res.get(slot) if isinstance(res, dict) else res
             logging.info("%s joint[%s] = %s", side.upper(), joint_idx, val)
             return
         logging.error("[GET] wrong args")
@@ -536,15 +797,14 @@ class PiperTerminalV3:
         #   set <side> <joint_idx> <value>
         #   set <side> [list-of-7-ints]
         if len(args) < 2:
-            logging.info("[SET] usage: set <left|right> <joint_idx> <value>   |   set <left|right> [list]")
+            logging.info("[SET] usage: set <arm> <joint_idx> <value>   |   set <arm> [list]")
             return
 
-        side_norm = self._norm_side(args[0]) if args else None
-        if side_norm not in {"left", "right"}:
-            logging.error("[SET] first arg must be l/left or r/right")
+        side = self._registry.resolve(args[0])
+        if side is None:
+            logging.error("[SET] first arg must be an arm: %s", ", ".join(self._registry.names))
             return
-        side = side_norm  # type: ignore[assignment]
-        proxy = self.left if side == "left" else self.right
+        proxy = self.arms.get(side)
         if proxy is None:
             logging.error("[SET] %s arm not initialised", side.upper())
             return
@@ -579,11 +839,11 @@ class PiperTerminalV3:
 
         # Case 2: joint_idx value
         if len(args) != 3:
-            logging.info("[SET] usage: set <left|right> <joint_idx> <value>")
+            logging.info("[SET] usage: set <arm> <joint_idx> <value>")
             return
         joint_idx, value = args[1], args[2]
         try:
-            ok = proxy.cmd_set(side, joint_idx, value)
+            ok = proxy.cmd_set(self._registry[side].slot, joint_idx, value)
             logging.info("[SET] result: %s", ok)
         except Exception:
             logging.exception("[SET] proxy error")
@@ -591,22 +851,20 @@ class PiperTerminalV3:
     def cmd_incr(self, side: str, *args):
         """Increment joint or gripper on selected arm.
 
-        incr <left|right> [joint_idx] <delta>
+        incr <arm> [joint_idx] <delta>
         If joint_idx omitted – gripper (6).
         """
-        side_n = self._norm_side(side)
-        proxy = self.left if side_n == "left" else self.right if side_n == "right" else None
+        proxy = self.arms.get(self._registry.resolve(side) or "")
         if proxy is None:
-            logging.error("incr: first arg must be left/right and arm must be initialised")
+            logging.error("incr: first arg must be an initialised arm (%s)", ", ".join(self.arms))
             return
         proxy.cmd_incr(*args)
 
     def cmd_decr(self, side: str, *args):
         """Decrement joint (negative delta)."""
-        side_n = self._norm_side(side)
-        proxy = self.left if side_n == "left" else self.right if side_n == "right" else None
+        proxy = self.arms.get(self._registry.resolve(side) or "")
         if proxy is None:
-            logging.error("decr: first arg must be left/right and arm must be initialised")
+            logging.error("decr: first arg must be an initialised arm (%s)", ", ".join(self.arms))
             return
         proxy.cmd_decr(*args)
 
@@ -619,12 +877,15 @@ class PiperTerminalV3:
 
     # ----------------------- lifecycle -----------------------
     def shutdown(self):
-        for proxy in (self.left, self.right):
-            if proxy:
-                proxy.shutdown()
+        if self._pipeline is not None:
+            self._pipeline.close()
+        self._supervisor.stop()
+        for proxy in self.arms.values():
+            proxy.shutdown()
 
     # ----------------------- simple REPL -----------------------
     def repl(self):
+        enable_history()
         logging.info("Piper terminal v3. Ctrl+D/Ctrl+C – exit.")
         while True:
             try:
@@ -658,6 +919,10 @@ class PiperTerminalV3:
                 getattr(self, attr)(*args)  # type: ignore[attr-defined]
             except AttributeError:
                 logging.warning("Unknown command: %s", cmd)
+            except KeyboardInterrupt:
+                # Ctrl+C during a blocking play: stop the arms via control channel
+                logging.warning("Ctrl+C – stopping playback")
+                self.cmd_stop_play()
             except Exception:
                 logging.exception("Unhandled error")
 
@@ -673,12 +938,14 @@ class PiperTerminalV3:
         """Return the single proxy that is currently in hybrid recording mode.
 
         If none or more than one proxies are recording – return None.
+        Checked before every REPL line, so it reads the shared-memory live
+        state instead of two IPC round trips.
         """
-        active = [p for p in (self.left, self.right) if p and p.is_hybrid_recording()]
+        active = [p for p in self.arms.values() if p.live_state()["hybrid_recording"]]
         if len(active) == 1:
             return active[0]
         if len(active) > 1:
-            logging.warning("Both arms are recording – specify left/right explicitly.")
+            logging.warning("Several arms are recording – specify the arm explicitly.")
         return None
 
     def _handle_hybrid_input(self, raw: str) -> bool:
@@ -738,7 +1005,7 @@ class PiperTerminalV3:
         """
         from demo.V2.manage.track import TRACK_DIR, TrackBase, TrackV3Timed  # local import to avoid cycles
 
-        timed_tracks = []  # (name, pts_cnt, duration, speed_up)
+        timed_tracks = []  # (name, pts_cnt, duration, speed_up, profile)
         for json_path in TRACK_DIR.glob("*.json"):
             name = json_path.stem
             try:
@@ -753,15 +1020,17 @@ class PiperTerminalV3:
                 eff_duration = sum(
                     dur * (1 - trk_obj.speed_up) for dur in trk_obj.durations[1:]
                 )
-                timed_tracks.append((name, pts_cnt, eff_duration, trk_obj.speed_up))
+                timed_tracks.append((name, pts_cnt, eff_duration, trk_obj.speed_up, trk_obj.profile))
 
         if not timed_tracks:
             logging.info("[LIST_TIMED] Нет треков v3 (timed).")
             return
 
         logging.info("[LIST_TIMED] Найдено %d трек(ов) v3:", len(timed_tracks))
-        for name, pts_cnt, eff_dur, spdup in sorted(timed_tracks):
-            logging.info("%s :: %d pts, duration=%.2fs (speed_up=%.2f)", name, pts_cnt, eff_dur, spdup)
+        for name, pts_cnt, eff_dur, spdup, profile in sorted(timed_tracks):
+            logging.info(
+                "%s :: %d pts, duration=%.2fs (speed_up=%.2f, profile=%s)", name, pts_cnt, eff_dur, spdup, profile
+            )
 
     # alias for convenience
     cmd_lt = cmd_list_timed  # type: ignore[assignment]
@@ -0,0 +1,86 @@
+"""Fakes shared by the scheduling tests: track durations and in-process arm proxies."""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from demo.V2.manage.rate import sleep_until
+
+
+class FakeProxy:
+    """Stands in for ``ArmProxy``: one executor thread, tracks "play" by sleeping.
+
+    Honours ``start_at`` and ``cancel`` like the worker does and records
+    every started track as ``(name, monotonic start, monotonic end)``.
+    """
+
+    def __init__(self, durations, fail=()):
+        self.durations = durations
+        self.fail = set(fail)
+        self.played = []
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1)
+
+    def call_async(self, method, *args, start_at=None, **kwargs):
+        fut: Future = Future()
+        name = args[0]
+
+        def _run():
+            if start_at is not None:
+                sleep_until(start_at)
+            if fut.cancelled():
+                return
+            started = time.monotonic()
+            fut.ipc_started = started
+            time.sleep(self.durations[name])
+            with self._lock:
+                self.played.append((name, started, time.monotonic()))
+            if name in self.fail:
+                fut.set_exception(RuntimeError(f"{name} failed"))
+            else:
+                fut.set_result(None)
+
+        self._pool.submit(_run)
+        return fut
+
+    def cancel(self, fut):
+        return fut.cancel()
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+@pytest.fixture
+def timing_of():
+    """``timing=`` callable for compile_scene / schedule_recipe from a {track: seconds} dict.
+
+    The default method is not a real worker method, so no play overhead is
+    added and the schedules come out in round numbers.
+    """
+
+    def _make(durations, method="fake_play"):
+        def timing(name, hz):
+            if name not in durations:
+                raise FileNotFoundError(name)
+            return durations[name], method
+
+        return timing
+
+    return _make
+
+
+@pytest.fixture
+def proxies():
+    """``{arm: FakeProxy}`` factory; the proxies are shut down after the test."""
+    made = []
+
+    def _make(durations, arms=("left", "right"), fail=()):
+        out = {arm: FakeProxy(durations, fail) for arm in arms}
+        made.extend(out.values())
+        return out
+
+    yield _make
+    for p in made:
+        p.close()
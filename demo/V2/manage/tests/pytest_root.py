@@ -0,0 +1,17 @@
+"""pytest plugin (``-p`` in pyproject.toml): collect the repository root as a plain directory.
+
+The root ``__init__.py`` is the SDK package and imports modules that are not
+part of this tree, so pytest must not import it as a package.
+"""
+
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[4]
+
+
+def pytest_collect_directory(path, parent):
+    if path == ROOT:
+        return pytest.Dir.from_parent(parent, path=path)
+    return None
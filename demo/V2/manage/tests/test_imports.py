@@ -0,0 +1,12 @@
+import importlib
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["terminal_v2", "terminal_v3", "arm_ipc", "preflight", "pipeline", "live_state", "track_stream"],
+)
+def test_module_imports_without_hardware(module):
+    # the SDK / CAN imports are deferred; importing must not touch the arm
+    importlib.import_module(f"demo.V2.manage.{module}")
@@ -0,0 +1,28 @@
+import threading
+import time
+
+import pytest
+
+from demo.V2.manage.live_state import LiveStateBlock
+
+
+@pytest.fixture
+def block():
+    b = LiveStateBlock(create=True)
+    yield b
+    b.close()
+
+
+def test_read_waits_out_a_preempted_writer(block):
+    block.write(progress=7)
+    block._seq[0] += 1  # writer stopped mid-update…
+    threading.Timer(0.01, block.recover).start()  # …and resumes 10 ms later
+    assert block.read()["progress"] == 7
+
+
+def test_read_gives_up_on_a_stuck_writer(block):
+    block._seq[0] += 1
+    t0 = time.monotonic()
+    with pytest.raises(RuntimeError, match="stuck"):
+        block.read_raw(timeout_s=0.02)
+    assert time.monotonic() - t0 < 0.5
@@ -0,0 +1,144 @@
+"""Order merging and the batch pipeline (pipeline.py)."""
+
+import pytest
+
+from demo.V2.manage.pipeline import OrderPipeline, merge_orders
+from demo.V2.manage.scene import Scene, SceneElement as E
+from demo.V2.manage.scene_compiler import compile_scene
+
+# right prepares, hands over, left cooks
+DISH = Scene("scene__dish", {
+    "right": [E("track", "right__prep"), E("signal", event="ready")],
+    "left": [E("wait", event="ready"), E("track", "left__cook")],
+})
+# the stove is used by left first, then by right
+STOVE = Scene("scene__stove", {
+    "left": [E("acquire", resource="stove"), E("track", "left__fry"), E("release", resource="stove"),
+             E("signal", event="fried")],
+    "right": [E("wait", event="fried"), E("acquire", resource="stove"), E("track", "right__finish"),
+              E("release", resource="stove")],
+})
+DUR = {"right__prep": 1.0, "left__cook": 1.0, "left__fry": 1.0, "right__finish": 1.0}
+
+
+def _without_resources(scene):
+    return Scene(scene.name, {
+        arm: [el for el in seq if el.type not in ("acquire", "release")] for arm, seq in scene.arms.items()
+    })
+
+
+def _stove_intervals(compiled):
+    out = []
+    for items in compiled.by_arm().values():
+        for it in items:
+            if it.kind == "acquire":
+                start = it.end
+            elif it.kind == "release":
+                out.append((start, it.start))
+    return sorted(out)
+
+
+# ------------------------------ merging ------------------------------
+def test_merge_concatenates_per_arm_and_namespaces_events():
+    merged, owner = merge_orders([("o1", DISH), ("o2", DISH)])
+    assert [el.event or el.name for el in merged.arms["right"]] == [
+        "right__prep", "o1:ready", "right__prep", "o2:ready",
+    ]
+    assert [owner[("left", i)] for i in range(len(merged.arms["left"]))] == ["o1", "o1", "o2", "o2"]
+
+
+def test_pipelined_orders_overlap(timing_of):
+    timing = timing_of(DUR)
+    single = compile_scene(DISH, timing=timing).makespan
+    merged, _ = merge_orders([("o1", DISH), ("o2", DISH), ("o3", DISH)])
+    assert single == 2.0
+    assert compile_scene(merged, timing=timing).makespan == 4.0  # back to back: 6.0
+
+
+def test_resource_is_handed_over_between_orders(timing_of):
+    timing = timing_of(DUR)
+    merged, _ = merge_orders([("o1", STOVE), ("o2", STOVE)])
+    # o2's first acquire waits for every release of o1
+    left = merged.arms["left"]
+    assert [el.type for el in left[5:7]] == ["wait", "wait"]
+    assert {el.event for el in left[5:7]} == {"o1:release:stove:left:2", "o1:release:stove:right:3"}
+
+    compiled = compile_scene(merged, timing=timing)
+    assert compiled.makespan == 4.0
+    intervals = _stove_intervals(compiled)
+    for a, b in zip(intervals, intervals[1:]):
+        assert a[1] <= b[0]
+    # without the resource o2 would fry while o1 finishes on the stove
+    unguarded, _ = merge_orders([("o1", _without_resources(STOVE)), ("o2", _without_resources(STOVE))])
+    assert compile_scene(unguarded, timing=timing).makespan == 3.0
+
+
+# ------------------------------ pipeline ------------------------------
+FAST = {"right__prep": 0.1, "left__cook": 0.1}
+
+
+def _pipeline(timing_of, proxies, scenes, durations=FAST, fail=()):
+    def loader(name):
+        if name not in scenes:
+            raise FileNotFoundError(name)
+        return scenes[name]
+
+    return OrderPipeline(
+        proxies(durations, fail=fail),
+        pause_active=lambda: False,
+        loader=loader,
+        timing=timing_of(durations),
+        check_tracks=False,
+    )
+
+
+def test_batch_runs_orders_and_records_latency(timing_of, proxies):
+    pipe = _pipeline(timing_of, proxies, {"scene__dish": DISH})
+    orders = [pipe.submit("scene__dish") for _ in range(3)]
+    batch = pipe.run_pending()
+    assert batch.planned_s == pytest.approx(0.4)
+    assert batch.sequential_s == pytest.approx(0.6)
+    assert all(o.ok for o in orders)
+    assert all(o.latency_s >= o.cook_s > 0 for o in orders)
+    assert [o.finished for o in orders] == sorted(o.finished for o in orders)
+    stats = pipe.stats()
+    assert (stats["done"], stats["failed"], stats["queued"]) == (3, 0, 0)
+    assert stats["dishes_per_hour"] > 0
+
+
+def test_bad_orders_are_rejected_alone(timing_of, proxies):
+    broken = Scene("scene__broken", {"left": [E("wait", event="never")]})
+    pipe = _pipeline(timing_of, proxies, {"scene__dish": DISH, "scene__broken": broken})
+    good = pipe.submit("scene__dish")
+    missing = pipe.submit("scene__nope")
+    bad = pipe.submit("scene__broken")
+    batch = pipe.run_pending()
+    assert batch.orders == [good]
+    assert good.ok
+    assert missing.ok is False and bad.ok is False
+    assert pipe.stats()["failed"] == 2
+
+
+def test_failed_track_fails_only_its_order(timing_of, proxies):
+    other = Scene("scene__other", {"left": [E("track", "left__burn")]})
+    durations = dict(FAST, left__burn=0.05)
+    pipe = _pipeline(timing_of, proxies, {"scene__dish": DISH, "scene__other": other}, durations, fail={"left__burn"})
+    burnt = pipe.submit("scene__other")
+    dish = pipe.submit("scene__dish")
+    pipe.run_pending()
+    assert burnt.ok is False
+    assert dish.ok
+
+
+def test_trackless_order_is_rejected(timing_of, proxies):
+    idle = Scene("scene__idle", {"left": [E("pause", duration=0.05), E("signal", event="x")],
+                                 "right": [E("wait", event="x")]})
+    pipe = _pipeline(timing_of, proxies, {"scene__dish": DISH, "scene__idle": idle})
+    noop = pipe.submit("scene__idle")
+    dish = pipe.submit("scene__dish")
+    batch = pipe.run_pending()
+    assert batch.orders == [dish]
+    assert noop.ok is False
+    stats = pipe.stats()
+    assert (stats["done"], stats["failed"]) == (1, 1)
+    assert stats["dishes_per_hour"] > 0
@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from demo.V2.manage.playback import PlaybackParams, PlaybackRegistry
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"speed_up": 1.0}, "speed_up"),
+        ({"profile": "cubic"}, "Unknown interpolation profile"),
+        ({"gripper_tight": -0.1}, "gripper_tight"),
+        ({"gripper_tight": 2}, "gripper_tight"),
+    ],
+)
+def test_bad_params_are_rejected(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        PlaybackParams(**kwargs)
+
+
+def test_bad_entries_are_skipped_on_load(tmp_path):
+    path = tmp_path / "playback.json"
+    path.write_text(json.dumps({
+        "left__ok": {"speed_up": 0.3, "profile": "spline", "gripper_tight": 0.05},
+        "left__profile": {"profile": "cubic"},
+        "left__grip": {"gripper_tight": 5},
+    }))
+    reg = PlaybackRegistry(path)
+    assert reg.get("left__ok") == PlaybackParams(0.3, "spline", 0.05)
+    assert reg.get("left__profile") == PlaybackParams()
+    assert reg.get("left__grip") == PlaybackParams()
@@ -0,0 +1,21 @@
+import numpy as np
+
+from demo.V2.manage.preflight import PreparedTrack, check_scenes
+from demo.V2.manage.scene import Scene, SceneElement as E
+
+
+def test_known_tracks_are_not_loaded_again():
+    loaded = []
+
+    def loader(name, hz):
+        loaded.append(name)
+        return PreparedTrack(name, np.zeros(7, np.int32), np.zeros(7, np.int32), None)
+
+    a = Scene("scene__a", {"left": [E("track", "left__a")]})
+    b = Scene("scene__b", {"left": [E("track", "left__a"), E("track", "left__b")]})
+    tracks, _compiled, problems = check_scenes([a], loader=loader, is_close=lambda *_: True)
+    assert loaded == ["left__a"]
+    tracks, compiled, problems = check_scenes([b], loader=loader, is_close=lambda *_: True, tracks=tracks)
+    assert loaded == ["left__a", "left__b"]
+    assert set(tracks) == {"left__a", "left__b"}
+    assert problems == [[]] and compiled[0] is not None
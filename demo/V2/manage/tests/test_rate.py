@@ -0,0 +1,21 @@
+import threading
+import time
+
+from demo.V2.manage.rate import RateScheduler
+
+
+def test_wait_until_hits_the_offset():
+    sched = RateScheduler(50)
+    assert sched.wait_until(0.05)
+    assert sched.elapsed >= 0.05
+    assert sched.ticks == 1
+
+
+def test_wait_until_returns_early_on_abort():
+    sched = RateScheduler(50)
+    stop = threading.Event()
+    threading.Timer(0.05, stop.set).start()
+    t0 = time.monotonic()
+    assert sched.wait_until(5.0, abort=stop) is False
+    assert time.monotonic() - t0 < 1.0
+    assert sched.ticks == 0
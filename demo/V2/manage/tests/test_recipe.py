@@ -0,0 +1,132 @@
+"""Recipe graph validation and list scheduling onto the arms (recipe.py)."""
+
+import pytest
+
+from demo.V2.manage.recipe import Recipe, RecipeTask, schedule_recipe
+from demo.V2.manage.scene_compiler import compile_scene
+
+
+def _recipe(*tasks):
+    return Recipe("recipe__t", [RecipeTask.from_json(t) for t in tasks])
+
+
+def _no_overlap(sched):
+    for seq in sched.by_arm().values():
+        for a, b in zip(seq, seq[1:]):
+            assert a.end <= b.start + 1e-9
+
+
+def _deps_respected(sched):
+    for slot in sched.slots.values():
+        for dep in sched.recipe.task(slot.task).after:
+            assert sched.slots[dep].end <= slot.start + 1e-9
+
+
+# ------------------------------ recipe graph ------------------------------
+def test_shorthand_expands_to_arm_tracks():
+    t = RecipeTask.from_json({"id": "take", "track": "take_pan", "arms": ["left", "right"]})
+    assert t.tracks == {"left": "left__take_pan", "right": "right__take_pan"}
+
+
+@pytest.mark.parametrize(
+    "tasks, message",
+    [
+        ([{"id": "a", "tracks": {"left": "l"}}, {"id": "a", "tracks": {"left": "l"}}], "duplicate task id"),
+        ([{"id": "a", "tracks": {"left": "l"}, "after": ["x"]}], "depends on unknown x"),
+        (
+            [{"id": "a", "tracks": {"left": "l"}, "after": ["b"]},
+             {"id": "b", "tracks": {"left": "l"}, "after": ["a"]}],
+            "dependency cycle",
+        ),
+        ([{"id": "a"}], "has no tracks"),
+    ],
+)
+def test_bad_recipes_are_rejected(tasks, message):
+    with pytest.raises(ValueError, match=message):
+        _recipe(*tasks)
+
+
+def test_topo_order_puts_dependencies_first():
+    r = _recipe(
+        {"id": "c", "tracks": {"left": "l"}, "after": ["a", "b"]},
+        {"id": "a", "tracks": {"left": "l"}},
+        {"id": "b", "tracks": {"left": "l"}, "after": ["a"]},
+    )
+    assert r.topo_order() == ["a", "b", "c"]
+
+
+# ------------------------------ scheduling ------------------------------
+def test_task_goes_to_the_arm_where_it_finishes_first(timing_of):
+    r = _recipe({"id": "t", "tracks": {"left": "left__slow", "right": "right__fast"}})
+    sched = schedule_recipe(r, timing=timing_of({"left__slow": 3.0, "right__fast": 1.0}))
+    assert sched.slots["t"].arm == "right"
+    assert sched.makespan == 1.0
+
+
+def test_independent_tasks_run_on_both_arms(timing_of):
+    r = _recipe(
+        {"id": "a", "track": "a", "arms": ["left", "right"]},
+        {"id": "b", "track": "b", "arms": ["left", "right"]},
+    )
+    dur = {"left__a": 2.0, "right__a": 2.0, "left__b": 2.0, "right__b": 2.0}
+    sched = schedule_recipe(r, timing=timing_of(dur))
+    assert {s.arm for s in sched.slots.values()} == {"left", "right"}
+    assert sched.makespan == 2.0
+
+
+def test_short_task_fills_an_idle_gap(timing_of):
+    # x waits on y (right); z is short, ranked last and fits before x on left
+    r = _recipe(
+        {"id": "y", "tracks": {"right": "right__y"}},
+        {"id": "x", "tracks": {"left": "left__x"}, "after": ["y"]},
+        {"id": "z", "tracks": {"left": "left__z"}},
+    )
+    sched = schedule_recipe(r, timing=timing_of({"right__y": 2.0, "left__x": 3.0, "left__z": 1.0}))
+    assert (sched.slots["x"].start, sched.slots["x"].end) == (2.0, 5.0)
+    assert (sched.slots["z"].start, sched.slots["z"].end) == (0.0, 1.0)
+    assert sched.makespan == 5.0
+    _no_overlap(sched)
+    _deps_respected(sched)
+
+
+def test_critical_path_adds_up_to_the_makespan(timing_of):
+    r = _recipe(
+        {"id": "open", "tracks": {"right": "right__open"}},
+        {"id": "take", "track": "take", "arms": ["left", "right"]},
+        {"id": "insert", "tracks": {"left": "left__insert"}, "after": ["open", "take"]},
+        {"id": "wipe", "tracks": {"right": "right__wipe"}},
+    )
+    dur = {"right__open": 1.5, "left__take": 1.0, "right__take": 1.0, "left__insert": 2.0, "right__wipe": 0.5}
+    sched = schedule_recipe(r, timing=timing_of(dur))
+    path = sched.critical_path()
+    assert [s.task for s in path] == ["open", "insert"]
+    assert path[-1].end == sched.makespan
+    assert sum(s.duration for s in path) == pytest.approx(sched.makespan)
+    for a, b in zip(path, path[1:]):
+        assert a.end == pytest.approx(b.start)
+    _no_overlap(sched)
+    _deps_respected(sched)
+
+
+def test_scene_from_schedule_compiles_to_the_same_makespan(timing_of):
+    r = _recipe(
+        {"id": "open", "tracks": {"right": "right__open"}},
+        {"id": "take", "tracks": {"left": "left__take"}},
+        {"id": "insert", "tracks": {"left": "left__insert"}, "after": ["open", "take"]},
+        {"id": "close", "tracks": {"right": "right__close"}, "after": ["insert"]},
+    )
+    dur = {"right__open": 2.0, "left__take": 1.0, "left__insert": 1.5, "right__close": 0.5}
+    timing = timing_of(dur)
+    sched = schedule_recipe(r, timing=timing)
+    scene = sched.to_scene("scene__from_recipe")
+    assert [el.type for el in scene.arms["left"]] == ["track", "wait", "track", "signal"]
+    assert [el.type for el in scene.arms["right"]] == ["track", "signal", "wait", "track"]
+    assert compile_scene(scene, timing=timing).makespan == pytest.approx(sched.makespan) == 4.0
+
+
+def test_unavailable_arm_and_unknown_track_are_errors(timing_of):
+    r = _recipe({"id": "t", "tracks": {"third": "third__t"}})
+    with pytest.raises(ValueError, match="no available arm for task 't'"):
+        schedule_recipe(r, timing=timing_of({}), arms=["left", "right"])
+    with pytest.raises(ValueError, match="task 't' track 'third__t'"):
+        schedule_recipe(r, timing=timing_of({}))
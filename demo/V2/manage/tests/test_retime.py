@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from demo.V2.manage.plan import compile_plan
+from demo.V2.manage.retime import JointLimits, retime_track
+from demo.V2.manage.track import TrackV3Timed
+
+HZ = 50
+POINTS = [
+    [0, 0, 0, 0, 0, 0, 0],
+    [30000, -20000, 15000, 0, 10000, 0, 40000],
+    [30000, -20000, 15000, 0, 10000, 0, 40000],   # dwell
+    [-45000, 25000, -5000, 8000, -12000, 3000, 0],
+    [-44000, 25500, -5000, 8000, -12000, 3000, 0],
+]
+
+
+def _timed(durations, profile="trapezoidal", points=POINTS):
+    raw = {
+        "version": TrackV3Timed.version,
+        "profile": profile,
+        "points": [{"pt": pt, "duration": d} for pt, d in zip(points, durations)],
+    }
+    return TrackV3Timed("t__retime", raw=raw)
+
+
+def test_plan_length_follows_the_grid():
+    # 0.58 * 50 is 28.999… in floating point; it must still be 29 rows
+    trk = _timed([0, 0.58], points=POINTS[:2])
+    assert len(compile_plan(trk, hz=HZ, speed_up=0.0, use_cache=False)) == 29
+
+
+@pytest.mark.parametrize("profile", ["linear", "trapezoidal", "min_jerk", "spline"])
+def test_retimed_duration_equals_compiled_plan(profile):
+    res = retime_track(_timed([0, 3.0, 1.0, 4.0, 0.5], profile), limits=JointLimits(), hz=HZ)
+    assert all(round(d * HZ, 6).is_integer() for d in res.durations[1:])
+    retimed = _timed(res.durations, res.profile)
+    plan = compile_plan(retimed, hz=HZ, speed_up=0.0, use_cache=False)
+    assert plan.duration == pytest.approx(res.total, abs=1e-9)
+    assert len(plan.segment_starts) == len(POINTS) - 1
+    # the spline ends on the point up to float truncation
+    np.testing.assert_allclose(plan.targets[-1], POINTS[-1], atol=1)
@@ -0,0 +1,175 @@
+import threading
+import time
+
+import pytest
+
+from demo.V2.manage.scene import Scene, SceneElement as E
+from demo.V2.manage.scene_compiler import PLAY_SETUP_S, START_MOVE_S, SceneExecutor, compile_scene
+
+DUR = {"left__a": 1.0, "left__b": 0.5, "right__c": 2.0, "right__d": 0.25}
+
+
+def _items(compiled, arm):
+    return [(it.kind, it.start, it.end) for it in compiled.by_arm()[arm]]
+
+
+# ------------------------------ compilation ------------------------------
+def test_tracks_and_pauses_are_back_to_back(timing_of):
+    sc = Scene("scene__t", {
+        "left": [E("track", "left__a"), E("pause", duration=0.5), E("track", "left__b")],
+        "right": [E("track", "right__c")],
+    })
+    c = compile_scene(sc, timing=timing_of(DUR))
+    assert _items(c, "left") == [("track", 0.0, 1.0), ("pause", 1.0, 1.5), ("track", 1.5, 2.0)]
+    assert c.makespan == 2.0
+    assert [it.start for it in c.items] == sorted(it.start for it in c.items)
+    assert {it.method for it in c.tracks()} == {"fake_play"}
+
+
+def test_play_overhead_is_part_of_the_schedule(timing_of):
+    # the first track of an arm includes the move to its start, every one the setup
+    sc = Scene("scene__o", {
+        "left": [E("track", "left__a"), E("signal", event="go"), E("track", "left__b")],
+        "right": [E("wait", event="go"), E("track", "right__c")],
+    })
+    c = compile_scene(sc, timing=timing_of(DUR, method="cmd_play_v2"))
+    first = 1.0 + PLAY_SETUP_S + START_MOVE_S["cmd_play_v2"]
+    left = _items(c, "left")
+    assert left[0] == ("track", 0.0, pytest.approx(first))
+    assert left[2] == ("track", pytest.approx(first), pytest.approx(first + 0.5 + PLAY_SETUP_S))
+    assert _items(c, "right")[1][2] == pytest.approx(first + 2.0 + PLAY_SETUP_S + START_MOVE_S["cmd_play_v2"])
+
+
+def test_wait_ends_at_partner_signal(timing_of):
+    sc = Scene("scene__h", {
+        "right": [E("track", "right__c"), E("signal", event="door"), E("track", "right__d")],
+        "left": [E("wait", event="door"), E("track", "left__a")],
+    })
+    c = compile_scene(sc, timing=timing_of(DUR))
+    assert _items(c, "left") == [("wait", 0.0, 2.0), ("track", 2.0, 3.0)]
+    assert c.makespan == 3.0
+
+
+def test_wait_for_past_signal_takes_no_time(timing_of):
+    sc = Scene("scene__h", {
+        "right": [E("signal", event="go"), E("track", "right__c")],
+        "left": [E("track", "left__a"), E("wait", event="go"), E("track", "left__b")],
+    })
+    c = compile_scene(sc, timing=timing_of(DUR))
+    assert _items(c, "left") == [("track", 0.0, 1.0), ("wait", 1.0, 1.0), ("track", 1.0, 1.5)]
+
+
+def test_handoffs_in_both_directions(timing_of):
+    # left waits for right, then right waits for left
+    sc = Scene("scene__h", {
+        "left": [E("wait", event="x"), E("track", "left__a"), E("signal", event="y")],
+        "right": [E("track", "right__d"), E("signal", event="x"), E("wait", event="y"), E("track", "right__c")],
+    })
+    c = compile_scene(sc, timing=timing_of(DUR))
+    assert _items(c, "left")[1] == ("track", 0.25, 1.25)
+    assert _items(c, "right")[-1] == ("track", 1.25, 3.25)
+
+
+def test_resource_markers_take_no_time(timing_of):
+    sc = Scene("scene__r", {"left": [E("acquire", resource="stove"), E("track", "left__a"),
+                                     E("release", resource="stove")]})
+    c = compile_scene(sc, timing=timing_of(DUR))
+    assert _items(c, "left") == [("acquire", 0.0, 0.0), ("track", 0.0, 1.0), ("release", 1.0, 1.0)]
+    assert c.by_arm()["left"][0].resource == "stove"
+
+
+@pytest.mark.parametrize(
+    "arms, message",
+    [
+        ({"left": [E("wait", event="x")]}, "never signalled"),
+        ({"left": [E("signal", event="x")], "right": [E("signal", event="x")]}, "signalled twice"),
+        (
+            {"left": [E("wait", event="y"), E("signal", event="x")],
+             "right": [E("wait", event="x"), E("signal", event="y")]},
+            "circular waits",
+        ),
+        ({"left": [E("track", "left__missing")]}, "left[0] track 'left__missing'"),
+    ],
+)
+def test_bad_scenes_are_rejected(timing_of, arms, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        compile_scene(Scene("scene__bad", arms), timing=timing_of(DUR))
+
+
+# ------------------------------ execution ------------------------------
+FAST = {"left__a": 0.1, "left__b": 0.05, "right__c": 0.15, "right__d": 0.05}
+
+
+def test_executor_plays_everything_on_schedule(timing_of, proxies):
+    sc = Scene("scene__x", {
+        "left": [E("track", "left__a"), E("track", "left__b")],
+        "right": [E("track", "right__c")],
+    })
+    compiled = compile_scene(sc, timing=timing_of(FAST))
+    arms = proxies(FAST)
+    report = SceneExecutor(arms, pause_active=lambda: False).run(compiled)
+    assert (report.completed, report.failed, report.skipped) == (3, 0, 0)
+    assert report.max_late_ms < 20
+    (a, a0, a1), (b, b0, _b1) = arms["left"].played
+    assert (a, b) == ("left__a", "left__b")
+    assert b0 - a0 == pytest.approx(0.1, abs=0.02)
+    assert set(report.track_times) == {("left", 0), ("left", 1), ("right", 0)}
+
+
+def test_late_partner_delays_the_waiting_arm(timing_of, proxies):
+    sc = Scene("scene__h", {
+        "right": [E("track", "right__c"), E("signal", event="door")],
+        "left": [E("wait", event="door"), E("track", "left__a")],
+    })
+    compiled = compile_scene(sc, timing=timing_of(FAST))
+    actual = dict(FAST, right__c=0.35)  # runs 0.2 s over its plan
+    arms = proxies(actual)
+    report = SceneExecutor(arms, pause_active=lambda: False).run(compiled)
+    assert report.completed == 2
+    right_end = arms["right"].played[0][2]
+    left_start = arms["left"].played[0][1]
+    assert 0.0 <= left_start - right_end < 0.03
+    assert report.handoff_ms["door"] == pytest.approx(200, abs=30)
+
+
+def test_failure_before_signal_aborts_the_waiting_arm(timing_of, proxies):
+    sc = Scene("scene__h", {
+        "right": [E("track", "right__c"), E("signal", event="door")],
+        "left": [E("wait", event="door"), E("track", "left__a")],
+    })
+    compiled = compile_scene(sc, timing=timing_of(FAST))
+    arms = proxies(FAST, fail={"right__c"})
+    report = SceneExecutor(arms, pause_active=lambda: False).run(compiled)
+    assert report.failed == 1
+    assert report.skipped == 1
+    assert sorted(report.aborted) == ["left", "right"]
+    assert arms["left"].played == []
+
+
+def test_stop_before_start_skips_all_tracks(timing_of, proxies):
+    sc = Scene("scene__s", {"left": [E("track", "left__a"), E("track", "left__b")]})
+    stop = threading.Event()
+    stop.set()
+    report = SceneExecutor(proxies(FAST), stop_event=stop, pause_active=lambda: False).run(
+        compile_scene(sc, timing=timing_of(FAST))
+    )
+    assert report.stopped
+    assert (report.completed, report.skipped) == (0, 2)
+
+
+def test_pause_after_dispatch_delays_the_track(timing_of, proxies):
+    # the track is already with the worker (lead 0.5 s) when the pause starts
+    sc = Scene("scene__p", {"left": [E("pause", duration=0.6), E("track", "left__a")]})
+    paused = threading.Event()
+    arms = proxies(FAST, arms=("left",))
+    threading.Timer(0.3, paused.set).start()
+    threading.Timer(0.8, paused.clear).start()
+    t0 = time.monotonic()
+    report = SceneExecutor(arms, pause_active=paused.is_set, lead_s=0.5).run(
+        compile_scene(sc, timing=timing_of(FAST))
+    )
+    assert report.completed == 1
+    assert len(arms["left"].played) == 1
+    started = arms["left"].played[0][1] - t0
+    assert started == pytest.approx(0.7 + report.paused_s, abs=0.05)
+    assert report.paused_s > 0.3
@@ -0,0 +1,40 @@
+import fcntl
+
+import numpy as np
+import pytest
+
+from demo.V2.manage import track, track_stream
+from demo.V2.manage.track import TrackBase
+from demo.V2.manage.track_stream import FILE_MAGIC, _encode_chunk, recover_pending
+
+
+@pytest.fixture
+def track_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(track, "TRACK_DIR", tmp_path)
+    monkeypatch.setattr(track_stream, "TRACK_DIR", tmp_path)
+    return tmp_path
+
+
+def _crashed_stream(track_dir, name, n=5):
+    coords = np.arange(n * 7, dtype=np.int32).reshape(n, 7)
+    path = track_dir / f"{name}.rec"
+    # a complete chunk followed by a torn one
+    path.write_bytes(FILE_MAGIC + _encode_chunk(coords, np.arange(n) / 50.0, None, None) + b"PTRF\x00")
+    return path
+
+
+def test_recovery_is_limited_to_own_prefixes(track_dir):
+    left = _crashed_stream(track_dir, "left__a")
+    right = _crashed_stream(track_dir, "right__b")
+    assert recover_pending(prefixes=["left__"]) == ["left__a"]
+    assert not left.exists() and right.exists()
+    assert len(TrackBase.read_track("left__a")) == 5
+
+
+def test_locked_stream_is_left_alone(track_dir):
+    path = _crashed_stream(track_dir, "left__live")
+    with path.open("ab") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert recover_pending() == []
+    assert path.exists()
+    assert recover_pending() == ["left__live"]
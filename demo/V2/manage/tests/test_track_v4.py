@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pytest
+
+from demo.V2.manage import track
+from demo.V2.manage.track import TrackBase, TrackV4
+
+
+@pytest.fixture
+def track_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(track, "TRACK_DIR", tmp_path)
+    return tmp_path
+
+
+def _write(n, value):
+    TrackV4.write_columns("left__t", np.full((n, 7), value), np.arange(n) / 50.0)
+
+
+def test_rewrite_leaves_mapped_columns_intact(track_dir):
+    _write(10, 1)
+    old = TrackV4("left__t")
+    mapped = old.coordinates
+    _write(20, 2)
+    assert mapped.shape == (10, 7) and (mapped == 1).all()
+    new = TrackBase.read_track("left__t")
+    assert len(new) == 20 and (new.coordinates == 2).all()
+    # the previous generation stays for readers of the old header, older ones go
+    _write(5, 3)
+    assert sorted(d.name for d in track_dir.iterdir() if d.is_dir()) == ["left__t.v4.2", "left__t.v4.3"]
+
+
+def test_write_interrupted_before_header_keeps_the_old_track(track_dir, monkeypatch):
+    _write(10, 1)
+
+    def crash(*_a, **_k):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "save", crash)
+    with pytest.raises(OSError):
+        _write(20, 2)
+    header = json.loads((track_dir / "left__t.json").read_text())
+    assert header["length"] == 10
+    assert (TrackV4("left__t").coordinates == 1).all()
+
+
+def test_legacy_column_dir_is_still_read(track_dir):
+    _write(4, 7)
+    path = track_dir / "left__t.json"
+    header = json.loads(path.read_text())
+    (track_dir / header.pop("dir")).rename(track_dir / "left__t.v4")
+    path.write_text(json.dumps(header))
+    assert (TrackV4("left__t").coordinates == 7).all()
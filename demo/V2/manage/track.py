@@ -7,20 +7,38 @@ Provides:
     - TrackV1  : legacy format (list[list[int]] in JSON + optional *.details.json).
     - TrackV2  : enhanced format with per-point timestamps embedded into the
                  main JSON file and a top-level version tag.
+    - TrackV3Timed: control points with per-segment durations.
+    - TrackV4  : binary columnar format (small JSON header + one ``.npy`` file
+                 per column) opened lazily through memory mapping.
 
 The public API intentionally stays minimal and stable so that other parts of
 codebase interact only with TrackBase class methods.
 """
 
+import glob
+import hashlib
 import json
+import logging
+import shutil
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Callable, Iterator
 from dataclasses import dataclass, field
 
+import numpy as np
+
+from demo.V2.manage.playback import INTERPOLATION_PROFILES, PLAYBACK, PlaybackParams
+
 # Directory layout is the same as used by terminal_v2.py
 BASE_DIR = Path(__file__).parent  # manage/
 TRACK_DIR = BASE_DIR / "tracks"
-TRACK_DIR.mkdir(exist_ok=True)
+
+
+def ensure_track_dir() -> Path:
+    """Create tracks/ on first write (importing this module touches no files)."""
+    TRACK_DIR.mkdir(exist_ok=True)
+    return TRACK_DIR
 
 # ------------------------------ data structures ------------------------------
 @dataclass
@@ -44,6 +62,185 @@ class TrackPoint:
     bus_current_ma: List[int]
 
 
+# Per-motor telemetry channels recorded by PiperTerminal._rec_worker (6 values
+# per sample each) together with the dtype used for the binary v4 columns.
+TELEMETRY_CHANNELS: Dict[str, str] = {
+    "motor_speed_rpm": "int32",
+    "motor_current_ma": "int32",
+    "voltage_mv": "int32",
+    "motor_pos_deg001": "int32",
+    "motor_effort_mNm": "float64",  # SDK reports effort already scaled (float)
+    "foc_temp_c": "int32",
+    "motor_temp_c": "int32",
+    "bus_current_ma": "int32",
+}
+
+# ------------------------------ struct-of-arrays view ------------------------------
+class TrackArrays:
+    """Struct-of-arrays view of a trajectory (replaces per-sample TrackPoint lists).
+
+    Attributes:
+        coordinates:        int32   (N, 7) – joints + gripper, deg001 units.
+        timestamps:         float64 (N,)   – per-point timestamps (seconds).
+        details_timestamps: float64 (N,)   – telemetry timestamps (= timestamps
+                            when the track has no telemetry).
+        <channel>:          (N, 6) for every name in TELEMETRY_CHANNELS, built
+                            lazily on first access via *channel_loader*.
+
+    For backward compatibility the object also behaves like the former
+    ``List[TrackPoint]``: ``len()``, iteration and ``data[i]`` (returns a
+    TrackPoint built on demand) keep working for existing callers.
+    """
+
+    def __init__(
+        self,
+        coordinates: Any,
+        timestamps: Any,
+        details_timestamps: Any = None,
+        channel_loader: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        self.coordinates: np.ndarray = np.asarray(coordinates, dtype=np.int32).reshape(-1, 7)
+        self.timestamps: np.ndarray = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        if len(self.timestamps) != len(self.coordinates):
+            raise ValueError("coordinates and timestamps must be same length")
+        self._details_ts = details_timestamps
+        self._channel_loader = channel_loader
+        self._channels: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_track_points(cls, points: List[TrackPoint]) -> "TrackArrays":
+        """Build arrays from an existing list of TrackPoint objects."""
+        return cls(
+            [tp.coordinates for tp in points],
+            [tp.coordinates_timestamp for tp in points],
+            [tp.details_timestamp for tp in points],
+            lambda ch: [getattr(tp, ch) for tp in points],
+        )
+
+    # ----------------------------------------------------------------- columns
+    @property
+    def details_timestamps(self) -> np.ndarray:
+        if not isinstance(self._details_ts, np.ndarray):
+            if self._details_ts is None:
+                self._details_ts = self.timestamps
+            else:
+                self._details_ts = np.asarray(self._details_ts, dtype=np.float64).reshape(-1)
+        return self._details_ts
+
+    def channel(self, name: str) -> np.ndarray:
+        """Return telemetry channel *name* as (N, 6) array; zeros if not recorded."""
+        arr = self._channels.get(name)
+        if arr is not None:
+            return arr
+        if name not in TELEMETRY_CHANNELS:
+            raise KeyError(f"Unknown telemetry channel '{name}'")
+        raw = self._channel_loader(name) if self._channel_loader is not None else None
+        if raw is None:
+            arr = np.zeros((len(self), 6), dtype=TELEMETRY_CHANNELS[name])
+        else:
+            arr = np.asarray(raw, dtype=TELEMETRY_CHANNELS[name]).reshape(-1, 6)
+            if len(arr) != len(self):
+                raise ValueError(f"Channel '{name}' length {len(arr)} != {len(self)}")
+        self._channels[name] = arr
+        return arr
+
+    def __getattr__(self, item: str) -> Any:
+        # Only reached for attributes not found normally → telemetry channels.
+        if item in TELEMETRY_CHANNELS:
+            return self.channel(item)
+        raise AttributeError(item)
+
+    # ------------------------------------------------ List[TrackPoint] compat
+    def __len__(self) -> int:
+        return len(self.coordinates)
+
+    def __getitem__(self, idx: Any) -> Any:
+        if isinstance(idx, slice):
+            sub = TrackArrays(
+                self.coordinates[idx],
+                self.timestamps[idx],
+                self.details_timestamps[idx],
+                lambda ch: self.channel(ch)[idx],
+            )
+            return sub
+        idx = range(len(self))[idx]  # normalise negatives / raise IndexError
+        return TrackPoint(
+            coordinates_timestamp=float(self.timestamps[idx]),
+            coordinates=self.coordinates[idx].tolist(),
+            details_timestamp=float(self.details_timestamps[idx]),
+            **{ch: self.channel(ch)[idx].tolist() for ch in TELEMETRY_CHANNELS},
+        )
+
+    def __iter__(self) -> Iterator[TrackPoint]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+
+# Max number of parsed tracks kept in the process-wide cache (LRU eviction).
+TRACK_CACHE_SIZE = 64
+
+
+# ------------------------------ parsed-track cache ------------------------------
+class TrackCache:
+    """Process-wide LRU cache of parsed tracks keyed on (path, mtime, size).
+
+    An entry is valid only while the file's ``st_mtime_ns``/``st_size`` match
+    the values seen at parse time, so every file is parsed once per change.
+    Thread-safe: scene playback reads tracks from several threads.
+    """
+
+    def __init__(self, capacity: int = TRACK_CACHE_SIZE) -> None:
+        self.capacity = capacity
+        self._entries: "OrderedDict[Path, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def signature(path: Path) -> Tuple[int, int]:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, path: Path, sig: Tuple[int, int]) -> Any:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != sig:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, path: Path, sig: Tuple[int, int], value: Any) -> None:
+        with self._lock:
+            self._entries[path] = (sig, value)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+            }
+
+
+_TRACK_CACHE = TrackCache()
+
+
 class TrackBase:
     """Common interface for trajectory files."""
 
@@ -51,6 +248,9 @@ class TrackBase:
 
     def __init__(self, name: str) -> None:
         self.name = name  # e.g. "left__wave"
+        # (signature, parsed) of *.details.json – re-read only when file changes
+        self._details_memo: Optional[Tuple[Tuple[int, int], List[Dict[str, Any]]]] = None
+        self._arrays: Optional[TrackArrays] = None
 
     # ------------------------------------------------------------------ paths
     @property
@@ -77,38 +277,84 @@ class TrackBase:
         """Per-point telemetry details. May be empty list."""
         try:
             if self.details_path.exists():
-                return json.loads(self.details_path.read_text())
+                sig = TrackCache.signature(self.details_path)
+                if self._details_memo is None or self._details_memo[0] != sig:
+                    self._details_memo = (sig, json.loads(self.details_path.read_text()))
+                return self._details_memo[1]
         except Exception:
             # degraded mode – caller will handle
             pass
         return []
 
     @property
-    def track_points(self) -> List["TrackPoint"]:  # noqa: D401 – property for API
-        """Return the trajectory as a list of *TrackPoint* objects."""
+    def arrays(self) -> TrackArrays:
+        """Struct-of-arrays view of the trajectory (built once per instance)."""
+        if self._arrays is None:
+            self._arrays = self._build_arrays()
+        return self._arrays
+
+    def _build_arrays(self) -> TrackArrays:
         raise NotImplementedError
 
+    def _details_channel(self, name: str) -> Optional[List[Any]]:
+        """Extract one telemetry channel from *details* (None if not recorded)."""
+        details = self.details
+        if not details or any(name not in det for det in details):
+            return None
+        return [det[name] for det in details]
+
+    @property
+    def track_points(self) -> TrackArrays:  # noqa: D401 – property for API
+        """Return the trajectory; sequence of *TrackPoint* (see TrackArrays)."""
+        return self.arrays
+
     # ----------------------------------------------------------------- factories
     @classmethod
     def read_track(cls, name: str) -> "TrackBase":
-        """Auto-detect json format and return appropriate Track* instance."""
+        """Auto-detect json format and return appropriate Track* instance.
+
+        The file is parsed once per change: instances are shared through the
+        process-wide cache, callers must treat them as read-only.
+        """
         path = TRACK_DIR / f"{name}.json"
-        if not path.exists():
-            raise FileNotFoundError(path)
+        try:
+            sig = TrackCache.signature(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(path) from None
+
+        cached = _TRACK_CACHE.get(path, sig)
+        if cached is not None:
+            return cached
 
         try:
             obj = json.loads(path.read_text())
         except Exception as exc:
             raise ValueError(f"Failed to read track {name}: {exc}") from exc
 
+        # -------------------------------- binary v4 detection -------------------------
+        if isinstance(obj, dict) and obj.get("version") == TrackV4.version:
+            trk: TrackBase = TrackV4(name, raw=obj)
         # -------------------------------- new v3 detection -----------------------------
-        if isinstance(obj, dict) and obj.get("version") == TrackV3Timed.version:
-            return TrackV3Timed(name)
+        elif isinstance(obj, dict) and obj.get("version") == TrackV3Timed.version:
+            trk = TrackV3Timed(name, raw=obj)
         # -------------------------------- existing v2 detection -------------------------
-        if isinstance(obj, dict) and obj.get("version") == "v2.0":
-            return TrackV2(name)
+        elif isinstance(obj, dict) and obj.get("version") == "v2.0":
+            trk = TrackV2(name, raw=obj)
         # Fallback to legacy v1 format
-        return TrackV1(name)
+        else:
+            trk = TrackV1(name, raw=obj)
+        _TRACK_CACHE.put(path, sig, trk)
+        return trk
+
+    @staticmethod
+    def cache_stats() -> Dict[str, int]:
+        """Hit/miss counters of the process-wide track cache."""
+        return _TRACK_CACHE.stats()
+
+    @staticmethod
+    def invalidate_cache(name: Optional[str] = None) -> None:
+        """Drop *name* (or every track) from the process-wide cache."""
+        _TRACK_CACHE.invalidate(None if name is None else TRACK_DIR / f"{name}.json")
 
     # ----------------------------------------------------------------- writers
     @classmethod
@@ -135,42 +381,28 @@ class TrackV1(TrackBase):
     version: str = "v1"
 
     # ----------------------------- cached raw ------------------------
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, raw: Optional[List[List[int]]] = None) -> None:
         super().__init__(name)
-        self._data: List[List[int]] = json.loads(self.path.read_text())
+        self._data: List[List[int]] = raw if raw is not None else json.loads(self.path.read_text())
 
     # -------------------------------- API ---------------------------
+    @property
+    def points(self) -> List[List[int]]:
+        return self._data
 
     @property
-    def track_points(self) -> List[TrackPoint]:
+    def timestamps(self) -> List[float]:
+        # v1 keeps timestamps only in *.details.json
+        return [det["ts"] for det in self.details if "ts" in det]
+
+    def _build_arrays(self) -> TrackArrays:
         details = self.details
         if len(details) != len(self._data):
             raise ValueError("Details length must match points length for v1 track")
-
-        combined: List[TrackPoint] = []
-        for idx, pt in enumerate(self._data):
-            if idx >= len(details):
-                raise ValueError("Missing details entry for point index {idx}")
-            det: Dict[str, Any] = details[idx]
-            if "ts" not in det:
-                raise ValueError("Missing 'ts' in details for v1 track")
-            coords_ts = det["ts"]
-            combined.append(
-                TrackPoint(
-                    coordinates_timestamp=coords_ts,
-                    coordinates=pt,
-                    details_timestamp=det["ts"],
-                    motor_speed_rpm=det["motor_speed_rpm"],
-                    motor_current_ma=det["motor_current_ma"],
-                    voltage_mv=det["voltage_mv"],
-                    motor_pos_deg001=det["motor_pos_deg001"],
-                    motor_effort_mNm=det["motor_effort_mNm"],
-                    foc_temp_c=det["foc_temp_c"],
-                    motor_temp_c=det["motor_temp_c"],
-                    bus_current_ma=det["bus_current_ma"],
-                )
-            )
-        return combined
+        if any("ts" not in det for det in details):
+            raise ValueError("Missing 'ts' in details for v1 track")
+        ts = [det["ts"] for det in details]
+        return TrackArrays(self._data, ts, ts, self._details_channel)
 
     # ----------------------------- writers --------------------------
     @classmethod
@@ -181,8 +413,9 @@ class TrackV1(TrackBase):
         details: List[Dict[str, Any]],
     ) -> None:
         pts_only = [pt for pt, _ in points_with_ts]
-        path = TRACK_DIR / f"{name}.json"
+        path = ensure_track_dir() / f"{name}.json"
         path.write_text(json.dumps(pts_only))
+        _TRACK_CACHE.invalidate(path)
 
         details_path = TRACK_DIR / f"{name}.details.json"
         details_path.write_text(json.dumps(details))
@@ -193,9 +426,9 @@ class TrackV2(TrackBase):
 
     version: str = "v2.0"
 
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, raw: Optional[Dict[str, Any]] = None) -> None:
         super().__init__(name)
-        obj = json.loads(self.path.read_text())
+        obj = raw if raw is not None else json.loads(self.path.read_text())
         if not (isinstance(obj, dict) and obj.get("version") == self.version):
             raise ValueError(f"File {self.path} is not a v2.0 track")
         self._raw: Dict[str, Any] = obj
@@ -220,36 +453,20 @@ class TrackV2(TrackBase):
             return ext_details
         return [{"ts": ts} for ts in self.timestamps]
 
-    @property
-    def track_points(self) -> List[TrackPoint]:
+    def _build_arrays(self) -> TrackArrays:
+        if any("pt" not in item or "ts" not in item for item in self._pts):
+            raise ValueError("Each point entry must contain 'pt' and 'ts' in v2 track")
         details = self.details
-        combined: List[TrackPoint] = []
-        for idx, item in enumerate(self._pts):
-            if "pt" not in item or "ts" not in item:
-                raise ValueError("Each point entry must contain 'pt' and 'ts' in v2 track")
-            pt_coords = item["pt"]
-            coords_ts = item["ts"]
-            if idx >= len(details):
-                raise ValueError("Missing details entry for point index {idx}")
-            det: Dict[str, Any] = details[idx]
-            if "ts" not in det:
-                raise ValueError("Missing 'ts' in details for v2 track")
-            combined.append(
-                TrackPoint(
-                    coordinates_timestamp=coords_ts,
-                    coordinates=pt_coords,
-                    details_timestamp=det["ts"],
-                    motor_speed_rpm=det["motor_speed_rpm"],
-                    motor_current_ma=det["motor_current_ma"],
-                    voltage_mv=det["voltage_mv"],
-                    motor_pos_deg001=det["motor_pos_deg001"],
-                    motor_effort_mNm=det["motor_effort_mNm"],
-                    foc_temp_c=det["foc_temp_c"],
-                    motor_temp_c=det["motor_temp_c"],
-                    bus_current_ma=det["bus_current_ma"],
-                )
-            )
-        return combined
+        if len(details) < len(self._pts):
+            raise ValueError("Missing details entries for v2 track")
+        if any("ts" not in det for det in details):
+            raise ValueError("Missing 'ts' in details for v2 track")
+        return TrackArrays(
+            [item["pt"] for item in self._pts],
+            [item["ts"] for item in self._pts],
+            [det["ts"] for det in details[: len(self._pts)]],
+            self._details_channel,
+        )
 
     # ----------------------------- writers --------------------------
     @classmethod
@@ -259,7 +476,7 @@ class TrackV2(TrackBase):
         points_with_ts: List[Tuple[List[int], float]],
         details: List[Dict[str, Any]],
     ) -> None:
-        path = TRACK_DIR / f"{name}.json"
+        path = ensure_track_dir() / f"{name}.json"
         content = {
             "version": cls.version,
             "points": [
@@ -267,16 +484,22 @@ class TrackV2(TrackBase):
             ],
         }
         path.write_text(json.dumps(content))
+        _TRACK_CACHE.invalidate(path)
         details_path = TRACK_DIR / f"{name}.details.json"
         details_path.write_text(json.dumps(details)) 
 
 # ------------------------------ NEW – Timed control-point track ------------------------------
+# Interpolation between control points: see playback.INTERPOLATION_PROFILES
+# (defined there so that the registry can validate overrides).
+DEFAULT_PROFILE = "linear"
+
 class TrackV3Timed(TrackBase):
     """Trajectory represented as a sequence of control points with per-segment duration.
 
     The JSON structure is::
         {
           "version": "v3.0",
+          "profile": "linear",                              # optional, see INTERPOLATION_PROFILES
           "points": [
             {"pt": [..7 ints..], "duration": 0},           # first point, duration ignored
             {"pt": [..], "duration": 2.5},                 # seconds to move from previous → current
@@ -288,9 +511,9 @@ class TrackV3Timed(TrackBase):
     version: str = "v3.0"
 
     # ----------------------------- cached raw ------------------------
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, raw: Optional[Dict[str, Any]] = None) -> None:
         super().__init__(name)
-        obj = json.loads(self.path.read_text())
+        obj = raw if raw is not None else json.loads(self.path.read_text())
         if not (isinstance(obj, dict) and obj.get("version") == self.version):
             raise ValueError(f"File {self.path} is not a v3.0 timed track")
         self._raw = obj
@@ -301,51 +524,27 @@ class TrackV3Timed(TrackBase):
         for idx, item in enumerate(self._pts):
             if "pt" not in item or "duration" not in item:
                 raise ValueError(f"Each point entry must contain 'pt' and 'duration' (idx={idx})")
+        if self._raw.get("profile", DEFAULT_PROFILE) not in INTERPOLATION_PROFILES:
+            raise ValueError(f"Unknown interpolation profile '{self._raw['profile']}' in {self.path}")
 
     @property
-    def speed_up(self):
-        if self.name == 'left__open_door':
-            return 0
-        elif self.name == 'left__lopatka1':
-            return 0.15
-        elif self.name == 'right__open_door':
-            return 0.3
-        elif self.name == 'right__meat':
-            return 0.2
-        elif self.name == 'right__tomat':
-            return 0.47
-        elif self.name == 'right__salt':
-            return 0.2
-        elif self.name == 'right__lapsha':
-            return 0.3
-        elif self.name == 'right__cheese':
-            return 0.15
-        elif self.name == 'right__close_door':
-            return 0.1
-        elif self.name == 'left__close_door':
-            return 0.25
-        elif self.name == 'left__colba1':
-            return 0.3
-        elif self.name == 'left__lopatka2_open':
-            return 0.6
-        elif self.name == 'left__lopatka2_mix':
-            return 0.6
-        elif self.name == 'left__lopatka2_close':
-            return 0.6
-        elif self.name == 'left__lopatka2_open_faster':
-            return 0.6
-        elif self.name == 'left__lopatka2_mix_faster':
-            return 0.6
-        elif self.name == 'left__lopatka2_close_faster':
-            return 0.6
-        elif self.name == 'left__colba_suhtrav':
-            return 0
-        elif self.name == 'left__colba_svezhtrav':
-            return 0
-        else:
-            return 0
+    def playback(self) -> PlaybackParams:
+        """Per-track playback parameters from the sidecar registry."""
+        return PLAYBACK.get(self.name)
+
+    @property
+    def speed_up(self) -> float:
+        return float(self.playback.speed_up)
 
     # -------------------------------- helpers -----------------------
+    @property
+    def profile(self) -> str:
+        """Interpolation between control points (``linear`` for older files).
+
+        A ``profile`` set in the playback registry overrides the track file.
+        """
+        return self.playback.profile or self._raw.get("profile", DEFAULT_PROFILE)
+
     @property
     def points(self) -> List[List[int]]:
         return [item["pt"] for item in self._pts]
@@ -354,6 +553,12 @@ class TrackV3Timed(TrackBase):
     def durations(self) -> List[float]:
         return [float(item["duration"]) for item in self._pts]
 
+    @property
+    def content_hash(self) -> str:
+        """Stable hash of the track content (key for precompiled plans)."""
+        blob = json.dumps(self._raw, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(blob.encode()).hexdigest()
+
     # For compatibility generate cumulative timestamps
     @property
     def timestamps(self) -> List[float]:
@@ -365,27 +570,9 @@ class TrackV3Timed(TrackBase):
         # First timestamp usually equals first duration (could be 0)
         return ts
 
-    @property
-    def track_points(self) -> List["TrackPoint"]:
-        # Timed tracks do not store telemetry; generate stub TrackPoint objects
-        stubs: List[TrackPoint] = []
-        for ts_val, pt in zip(self.timestamps, self.points):
-            stubs.append(
-                TrackPoint(
-                    coordinates_timestamp=ts_val,
-                    coordinates=pt,
-                    details_timestamp=ts_val,
-                    motor_speed_rpm=[0]*6,
-                    motor_current_ma=[0]*6,
-                    voltage_mv=[0]*6,
-                    motor_pos_deg001=[0]*6,
-                    motor_effort_mNm=[0]*6,
-                    foc_temp_c=[0]*6,
-                    motor_temp_c=[0]*6,
-                    bus_current_ma=[0]*6,
-                )
-            )
-        return stubs
+    def _build_arrays(self) -> TrackArrays:
+        # Timed tracks do not store telemetry; channels read back as zeros
+        return TrackArrays(self.points, self.timestamps)
 
     # ----------------------------- writers --------------------------
     @classmethod
@@ -394,14 +581,278 @@ class TrackV3Timed(TrackBase):
         name: str,
         points: List[List[int]],
         durations: List[float],
+        profile: Optional[str] = None,
     ) -> None:
         if len(points) != len(durations):
             raise ValueError("points and durations must be same length")
-        path = TRACK_DIR / f"{name}.json"
-        payload = {
+        if profile is not None and profile not in INTERPOLATION_PROFILES:
+            raise ValueError(f"Unknown interpolation profile '{profile}'")
+        path = ensure_track_dir() / f"{name}.json"
+        payload: Dict[str, Any] = {"version": cls.version}
+        if profile is not None:
+            payload["profile"] = profile
+        payload["points"] = [
+            {"pt": pt, "duration": float(dur)} for pt, dur in zip(points, durations)
+        ]
+        path.write_text(json.dumps(payload, indent=2))
+        _TRACK_CACHE.invalidate(path)
+
+    def set_profile(self, profile: str) -> None:
+        """Persist a new interpolation profile in the track file (registry still overrides)."""
+        self.write_from_points(self.name, self.points, self.durations, profile=profile)
+
+# ------------------------------ Binary columnar track (v4) ------------------------------
+class TrackV4(TrackBase):
+    """Columnar binary track backed by memory-mapped NumPy arrays.
+
+    Layout on disk::
+
+        tracks/<name>.json                  – small header (auto-detection entry point)
+            {"version": "v4.0", "length": N, "dir": "<name>.v4.<gen>", "columns": {...}}
+        tracks/<dir>/coordinates.npy        – int32   (N, 7)
+        tracks/<dir>/timestamps.npy         – float64 (N,)
+        tracks/<dir>/details_ts.npy         – float64 (N,)  (only if telemetry present)
+        tracks/<dir>/<channel>.npy          – see TELEMETRY_CHANNELS, shape (N, 6)
+
+    Headers without ``dir`` (older tracks) use ``tracks/<name>.v4``.
+
+    Opening a track only parses the header; columns are mapped with
+    ``np.load(mmap_mode="r")`` on first access, so the cost does not depend on
+    the recording length.
+    """
+
+    version: str = "v4.0"
+
+    def __init__(self, name: str, raw: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(name)
+        obj = raw if raw is not None else json.loads(self.path.read_text())
+        if not (isinstance(obj, dict) and obj.get("version") == self.version):
+            raise ValueError(f"File {self.path} is not a v4.0 track")
+        self._header: Dict[str, Any] = obj
+        self._columns: Dict[str, np.ndarray] = {}
+
+    # ------------------------------------------------------------------ paths
+    @property
+    def columns_dir(self) -> Path:
+        return TRACK_DIR / self._header.get("dir", f"{self.name}.v4")
+
+    # ----------------------------------------------------------------- columns
+    def __len__(self) -> int:
+        return int(self._header.get("length", 0))
+
+    def has_column(self, column: str) -> bool:
+        return column in self._header.get("columns", {})
+
+    def column(self, column: str) -> np.ndarray:
+        """Return read-only memory-mapped column *column*.
+
+        Telemetry channels that were not recorded (e.g. SAFE or v2 tracks
+        without *.details.json) are returned as zero arrays of shape (N, 6).
+        """
+        arr = self._columns.get(column)
+        if arr is not None:
+            return arr
+        if self.has_column(column):
+            arr = np.load(self.columns_dir / f"{column}.npy", mmap_mode="r")
+        elif column in TELEMETRY_CHANNELS:
+            arr = np.zeros((len(self), 6), dtype=TELEMETRY_CHANNELS[column])
+        elif column == "details_ts":
+            arr = self.column("timestamps")
+        else:
+            raise KeyError(f"Unknown column '{column}' in v4 track {self.name}")
+        self._columns[column] = arr
+        return arr
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """Joint + gripper coordinates, int32 array of shape (N, 7)."""
+        return self.column("coordinates")
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """Free-form metadata stored in the header (may be empty)."""
+        return self._header.get("meta", {})
+
+    # -------------------------------- API ---------------------------
+    @property
+    def points(self) -> List[List[int]]:
+        return self.coordinates.tolist()
+
+    @property
+    def timestamps(self) -> List[float]:
+        return self.column("timestamps").tolist()
+
+    @property
+    def details(self) -> List[Dict[str, Any]]:
+        if not any(self.has_column(ch) for ch in TELEMETRY_CHANNELS):
+            return [{"ts": ts} for ts in self.timestamps]
+        coords = self.coordinates.tolist()
+        cols = {ch: self.column(ch).tolist() for ch in TELEMETRY_CHANNELS}
+        out: List[Dict[str, Any]] = []
+        for idx, ts in enumerate(self.column("details_ts").tolist()):
+            det: Dict[str, Any] = {
+                "ts": ts,
+                "joints_deg001": coords[idx][:6],
+                "gripper_deg001": coords[idx][6],
+            }
+            for ch in TELEMETRY_CHANNELS:
+                det[ch] = cols[ch][idx]
+            out.append(det)
+        return out
+
+    def _build_arrays(self) -> TrackArrays:
+        # Columns stay memory-mapped; telemetry channels are mapped on demand.
+        return TrackArrays(
+            self.coordinates,
+            self.column("timestamps"),
+            self.column("details_ts"),
+            lambda ch: self.column(ch) if self.has_column(ch) else None,
+        )
+
+    # ----------------------------- writers --------------------------
+    @classmethod
+    def write_columns(
+        cls,
+        name: str,
+        coordinates: np.ndarray,
+        timestamps: np.ndarray,
+        channels: Optional[Dict[str, np.ndarray]] = None,
+        details_ts: Optional[np.ndarray] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Persist already columnar data as a v4 track.
+
+        Every write goes to a fresh column directory (``<name>.v4.<gen>``)
+        and the JSON header is switched to it last with an atomic rename.
+        Column files are never rewritten in place – readers that mapped them
+        keep valid pages, and a write interrupted at any point leaves the
+        previous track (or none) intact. The directory of the previous
+        generation is kept for readers that parsed the old header but have
+        not mapped its columns yet; older ones are removed.
+        """
+        coordinates = np.asarray(coordinates, dtype=np.int32).reshape(-1, 7)
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        n = len(coordinates)
+        if len(timestamps) != n:
+            raise ValueError("coordinates and timestamps must be same length")
+
+        columns: Dict[str, np.ndarray] = {
+            "coordinates": coordinates,
+            "timestamps": timestamps,
+        }
+        if details_ts is not None:
+            columns["details_ts"] = np.asarray(details_ts, dtype=np.float64).reshape(-1)
+        for ch, arr in (channels or {}).items():
+            if ch not in TELEMETRY_CHANNELS:
+                raise ValueError(f"Unknown telemetry channel '{ch}'")
+            columns[ch] = np.asarray(arr, dtype=TELEMETRY_CHANNELS[ch]).reshape(-1, 6)
+        for col, arr in columns.items():
+            if len(arr) != n:
+                raise ValueError(f"Column '{col}' length {len(arr)} != {n}")
+
+        path = ensure_track_dir() / f"{name}.json"
+        generation, prev_dir = _v4_generation(path)
+        generation += 1
+        col_dir = TRACK_DIR / f"{name}.v4.{generation}"
+        if col_dir.exists():
+            shutil.rmtree(col_dir)  # left by a write that died before its header
+        col_dir.mkdir()
+        for col, arr in columns.items():
+            np.save(col_dir / f"{col}.npy", np.ascontiguousarray(arr))
+
+        header: Dict[str, Any] = {
             "version": cls.version,
-            "points": [
-                {"pt": pt, "duration": float(dur)} for pt, dur in zip(points, durations)
-            ],
+            "length": n,
+            "dir": col_dir.name,
+            "generation": generation,
+            "columns": {
+                col: {"dtype": str(arr.dtype), "shape": list(arr.shape)}
+                for col, arr in columns.items()
+            },
         }
-        path.write_text(json.dumps(payload, indent=2)) 
\ No newline at end of file
+        if meta:
+            header["meta"] = meta
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(header, indent=2))
+        tmp.replace(path)
+        _TRACK_CACHE.invalidate(path)
+        _drop_column_dirs(name, keep={col_dir.name, prev_dir})
+
+    @classmethod
+    def write_from_record(
+        cls,
+        name: str,
+        points_with_ts: List[Tuple[List[int], float]],
+        details: List[Dict[str, Any]],
+    ) -> None:
+        coords = np.array([pt for pt, _ in points_with_ts], dtype=np.int32).reshape(-1, 7)
+        ts = np.array([t for _, t in points_with_ts], dtype=np.float64)
+        channels: Dict[str, np.ndarray] = {}
+        details_ts = None
+        if details and len(details) == len(points_with_ts):
+            details_ts = np.array([det.get("ts", t) for det, (_, t) in zip(details, points_with_ts)])
+            for ch in TELEMETRY_CHANNELS:
+                if all(ch in det for det in details):
+                    channels[ch] = np.array([det[ch] for det in details])
+        cls.write_columns(name, coords, ts, channels, details_ts)
+
+
+def _v4_generation(path: Path) -> Tuple[int, Optional[str]]:
+    """(generation, column dir) of the v4 header at *path*; (0, None) if there is none."""
+    try:
+        header = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return 0, None
+    if not (isinstance(header, dict) and header.get("version") == TrackV4.version):
+        return 0, None
+    return int(header.get("generation", 0)), header.get("dir", f"{path.stem}.v4")
+
+
+def _drop_column_dirs(name: str, keep: set) -> None:
+    """Remove column directories of *name* not listed in *keep*."""
+    for d in TRACK_DIR.glob(f"{glob.escape(name)}.v4*"):
+        if d.name in keep or not d.is_dir():
+            continue
+        suffix = d.name[len(name):]
+        if suffix == ".v4" or (suffix.startswith(".v4.") and suffix[4:].isdigit()):
+            shutil.rmtree(d, ignore_errors=True)
+
+
+def convert_to_v4(name: str, keep_backup: bool = True) -> TrackV4:
+    """Migrate a legacy v1/v2 track *name* into the binary v4 format in place.
+
+    The original ``<name>.json`` / ``<name>.details.json`` are copied to
+    ``*.bak`` first (unless *keep_backup* is False); the JSON is then
+    replaced by the v4 header and the details file removed, so the backups
+    do not show up in track listings but can still be restored by hand.
+    """
+    src = TrackBase.read_track(name)
+    if isinstance(src, TrackV4):
+        return src
+    if not isinstance(src, (TrackV1, TrackV2)):
+        raise ValueError(f"Track {name} ({src.version}) cannot be converted to v4")
+
+    points = src.points
+    timestamps = src.timestamps
+    raw_details = TrackBase.details.fget(src)  # type: ignore[attr-defined] – external file only
+    if len(timestamps) != len(points):
+        # v1 track without details – keep nominal 50 Hz spacing
+        timestamps = [idx / 50.0 for idx in range(len(points))]
+
+    path, details_path = src.path, src.details_path
+    backups = []
+    if keep_backup:
+        for p in (path, details_path):
+            if p.exists():
+                backups.append((p, p.with_name(p.name + ".bak")))
+        for p, bak in backups:
+            bak.write_bytes(p.read_bytes())
+
+    TrackV4.write_from_record(name, list(zip(points, timestamps)), raw_details)
+    if details_path.exists():
+        details_path.unlink()
+    logging.info(
+        f"[TRACK] {name}: {src.version} → {TrackV4.version} ({len(points)} pts)"
+        + (f", backup: {', '.join(b.name for _, b in backups)}" if backups else "")
+    )
+    return TrackV4(name)
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+"""Crash-safe streaming writer for long drag-teach recordings.
+
+The acquisition loop only fills a preallocated ``sampler.SampleRing`` (never
+touches the disk); a background thread drains it in chunks and appends each
+chunk as a self-delimiting frame to ``tracks/<name>.rec``:
+
+    file   := FILE_MAGIC frame*
+    frame  := FRAME_MAGIC  u32 payload_len  u32 crc32(payload)  payload
+    payload:= u32 n  u8 has_telemetry
+              coordinates  int32[n, 7]
+              timestamps   float64[n]
+              [details_ts  float64[n]
+               <channel>   TELEMETRY_CHANNELS dtype [n, 6]   (in dict order)]
+
+Every frame is flushed + fsync-ed, so after a crash or power loss all
+complete frames survive. On close the frames are converted into a regular
+track and the ``.rec`` file is removed; a ``.rec`` left behind by a crash is
+repaired into a valid track by :func:`recover_pending` on the next start.
+"""
+
+import fcntl
+import logging
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from demo.V2.manage.track import TELEMETRY_CHANNELS, TRACK_DIR, TrackBase, TrackV4, ensure_track_dir
+
+FILE_MAGIC = b"PTRKREC1"
+FRAME_MAGIC = b"PTRF"
+_FRAME_HDR = struct.Struct("<4sII")
+_PAYLOAD_HDR = struct.Struct("<IB")
+
+# Defaults: flush every 250 samples (5 s at 50 Hz) or every second, whichever first.
+DEFAULT_CHUNK_SAMPLES = 250
+DEFAULT_CHUNK_SECONDS = 1.0
+
+
+def rec_path(name: str) -> Path:
+    """Path of the append-only stream file for track *name*."""
+    return TRACK_DIR / f"{name}.rec"
+
+
+# ------------------------------ framing helpers ------------------------------
+def _encode_chunk(
+    coords: np.ndarray,
+    ts: np.ndarray,
+    det_ts: Optional[np.ndarray],
+    channels: Optional[Dict[str, np.ndarray]],
+) -> bytes:
+    has_tel = det_ts is not None and channels is not None
+    parts = [
+        _PAYLOAD_HDR.pack(len(coords), 1 if has_tel else 0),
+        np.ascontiguousarray(coords, dtype="<i4").tobytes(),
+        np.ascontiguousarray(ts, dtype="<f8").tobytes(),
+    ]
+    if has_tel:
+        parts.append(np.ascontiguousarray(det_ts, dtype="<f8").tobytes())
+        for ch, dtype in TELEMETRY_CHANNELS.items():
+            parts.append(np.ascontiguousarray(channels[ch], dtype=np.dtype(dtype).newbyteorder("<")).tobytes())
+    payload = b"".join(parts)
+    return _FRAME_HDR.pack(FRAME_MAGIC, len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_payload(payload: bytes) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray], Optional[Dict[str, np.ndarray]]]:
+    n, has_tel = _PAYLOAD_HDR.unpack_from(payload, 0)
+    off = _PAYLOAD_HDR.size
+
+    def _take(dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+        nonlocal off
+        dt = np.dtype(dtype).newbyteorder("<")
+        count = int(np.prod(shape))
+        arr = np.frombuffer(payload, dtype=dt, count=count, offset=off).reshape(shape)
+        off += count * dt.itemsize
+        return arr
+
+    coords = _take("int32", (n, 7))
+    ts = _take("float64", (n,))
+    if not has_tel:
+        return coords, ts, None, None
+    det_ts = _take("float64", (n,))
+    channels = {ch: _take(dtype, (n, 6)) for ch, dtype in TELEMETRY_CHANNELS.items()}
+    return coords, ts, det_ts, channels
+
+
+def read_frames(path: Path) -> Tuple[List[Tuple[Any, ...]], bool]:
+    """Read all intact frames from *path*.
+
+    Returns (frames, clean) where *clean* is False if a truncated or corrupt
+    tail was found (everything after the first bad frame is discarded).
+    """
+    data = path.read_bytes()
+    if not data.startswith(FILE_MAGIC):
+        raise ValueError(f"{path} is not a track stream file")
+    frames: List[Tuple[Any, ...]] = []
+    off = len(FILE_MAGIC)
+    while off < len(data):
+        if off + _FRAME_HDR.size > len(data):
+            return frames, False
+        magic, length, crc = _FRAME_HDR.unpack_from(data, off)
+        start = off + _FRAME_HDR.size
+        payload = data[start:start + length]
+        if magic != FRAME_MAGIC or len(payload) != length or zlib.crc32(payload) != crc:
+            return frames, False
+        try:
+            frames.append(_decode_payload(payload))
+        except (struct.error, ValueError):
+            return frames, False
+        off = start + length
+    return frames, True
+
+
+# ------------------------------ writer ------------------------------
+class StreamingTrackWriter:
+    """Append-only chunked track writer with a background I/O thread.
+
+    The producer fills a preallocated ``sampler.SampleRing`` (*ring*) by
+    index and the writer thread drains whole column blocks from it
+    (``wake()`` requests an early drain once a chunk is ready).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        track_cls: Type[TrackBase] = TrackV4,
+        chunk_samples: int = DEFAULT_CHUNK_SAMPLES,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        *,
+        ring: Any,
+    ) -> None:
+        self.name = name
+        self.track_cls = track_cls
+        self.chunk_samples = max(1, int(chunk_samples))
+        self.chunk_seconds = float(chunk_seconds)
+        self.path = rec_path(name)
+        self.written = 0  # samples persisted to the .rec file
+        self.chunks = 0
+        self._error: Optional[BaseException] = None
+        self._ring = ring
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        # Opened without truncating: a second writer of the same name must
+        # fail on the lock before it touches the first one's live stream.
+        ensure_track_dir()
+        self._fh = self.path.open("ab")
+        # Held for the whole session so recover_pending() (e.g. from another
+        # arm worker starting up) never touches a stream that is still live.
+        try:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._fh.close()
+            raise RuntimeError(f"'{name}' is already being recorded ({self.path})") from None
+        self._fh.truncate(0)
+        self._fh.write(FILE_MAGIC)
+        self._fh.flush()
+        self._thread = threading.Thread(target=self._ring_loop, name=f"rec-writer-{name}", daemon=True)
+        self._thread.start()
+
+    # ---------------------------------------------------------------- producer
+    def wake(self) -> None:
+        """Ask the writer thread to drain now (cheap, non-blocking)."""
+        self._wake.set()
+
+    # ---------------------------------------------------------------- consumer
+    def _ring_loop(self) -> None:
+        while True:
+            stopping = self._stop.is_set()
+            block = self._ring.drain()
+            if block is not None:
+                self._write_block(*block)
+            if stopping:
+                break
+            self._wake.wait(self.chunk_seconds)
+            self._wake.clear()
+
+    def _write_block(
+        self,
+        coords: np.ndarray,
+        ts: np.ndarray,
+        det_ts: Optional[np.ndarray],
+        channels: Optional[Dict[str, np.ndarray]],
+    ) -> None:
+        try:
+            self._fh.write(_encode_chunk(coords, ts, det_ts, channels))
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        except Exception as exc:  # noqa: BLE001 – reported on close()
+            logging.exception("[REC-STREAM] chunk write failed: %s", exc)
+            self._error = exc
+            return
+        self.written += len(coords)
+        self.chunks += 1
+
+    # ---------------------------------------------------------------- finish
+    def close(self, finalize: bool = True, meta: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        """Flush the remaining samples, stop the thread and build the track.
+
+        *meta* is stored in the track header (v4 only). Returns the path of the
+        finished track (None if *finalize* is False or nothing was recorded).
+        """
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._fh.close()
+        if self._error is not None:
+            logging.error("[REC-STREAM] %s: stream kept for recovery (%s)", self.name, self._error)
+            return None
+        if not finalize:
+            return None
+        return finalize_stream(self.name, self.track_cls, meta)
+
+
+# ------------------------------ finalisation / recovery ------------------------------
+def finalize_stream(
+    name: str,
+    track_cls: Type[TrackBase] = TrackV4,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Optional[Path]:
+    """Convert ``<name>.rec`` into a regular track and delete the stream file."""
+    path = rec_path(name)
+    frames, clean = read_frames(path)
+    if not clean:
+        logging.warning("[REC-STREAM] %s: truncated/corrupt tail dropped", path.name)
+    if not frames:
+        logging.warning("[REC-STREAM] %s: no complete chunks – nothing to save", path.name)
+        path.unlink()
+        return None
+
+    coords = np.concatenate([f[0] for f in frames])
+    ts = np.concatenate([f[1] for f in frames])
+    with_tel = all(f[2] is not None for f in frames)
+    det_ts = np.concatenate([f[2] for f in frames]) if with_tel else None
+    channels = (
+        {ch: np.concatenate([f[3][ch] for f in frames]) for ch in TELEMETRY_CHANNELS}
+        if with_tel
+        else None
+    )
+
+    if issubclass(track_cls, TrackV4):
+        track_cls.write_columns(name, coords, ts, channels, det_ts, meta)
+    else:
+        points_ts = list(zip(coords.tolist(), ts.tolist()))
+        if with_tel:
+            details: List[Dict[str, Any]] = []
+            coords_l = coords.tolist()
+            ch_lists = {ch: arr.tolist() for ch, arr in channels.items()}  # type: ignore[union-attr]
+            for idx, t in enumerate(det_ts.tolist()):  # type: ignore[union-attr]
+                det: Dict[str, Any] = {
+                    "ts": t,
+                    "joints_deg001": coords_l[idx][:6],
+                    "gripper_deg001": coords_l[idx][6],
+                }
+                for ch in TELEMETRY_CHANNELS:
+                    det[ch] = ch_lists[ch][idx]
+                details.append(det)
+        else:
+            details = [{"ts": t} for t in ts.tolist()]
+        track_cls.write_from_record(name, points_ts, details)
+    path.unlink()
+    return TRACK_DIR / f"{name}.json"
+
+
+def recover_pending(track_cls: Type[TrackBase] = TrackV4, prefixes: Optional[Sequence[str]] = None) -> List[str]:
+    """Repair every ``*.rec`` left by an interrupted recording into a track.
+
+    *prefixes* limits recovery to track names starting with one of them
+    (an arm worker repairs only its own arm's recordings). The stream lock
+    is held while a file is repaired, so a live recording or a second
+    recoverer never sees it half-finalized.
+    """
+    recovered: List[str] = []
+    for path in sorted(TRACK_DIR.glob("*.rec")):
+        name = path.stem
+        if prefixes is not None and not name.startswith(tuple(prefixes)):
+            continue
+        try:
+            fh = path.open("rb")
+        except FileNotFoundError:
+            continue  # finalized meanwhile
+        with fh:
+            try:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                continue  # still being written by a live recording
+            try:
+                if os.fstat(fh.fileno()).st_ino != path.stat().st_ino:
+                    continue  # finalized (and maybe recorded again) before we got the lock
+                out = finalize_stream(name, track_cls)
+            except FileNotFoundError:
+                continue
+            except Exception as exc:  # noqa: BLE001
+                logging.error("[REC-STREAM] recovery of %s failed: %s", path.name, exc)
+                continue
+        if out is not None:
+            logging.info("[REC-STREAM] recovered interrupted recording → %s", out.name)
+            recovered.append(name)
+    return recovered
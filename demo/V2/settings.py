@@ -1,4 +1,8 @@
 CAN_NAME = 'can0'
 CAN_LEFT = 'can0'
 # CAN_RIGHT temporarily disabled
-CAN_RIGHT = 'can1'
\ No newline at end of file
+CAN_RIGHT = 'can1'
+
+# N-arm stations: name → CAN (overrides CAN_LEFT/CAN_RIGHT for terminal_v3),
+# or put the arms in arms.json next to this file – see manage/arm_registry.py
+# ARMS = {"left": "can0", "right": "can1", "a3": "can2"}